@@ -1,10 +1,15 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from app.models.schemas import FileUploadResponse
-from app.services.file_service import file_service
+from app.models.schemas import FileUploadResponse, FileStatusResponse
+from app.services.file_service import file_service, FileTooLargeError
+from app.services.file_registry import file_registry
+from app.services.content_store import content_store
+from app.services.cleanup_service import cleanup_service
+from app.services.ingestion_service import ingestion_service, IngestionQueueFullError, IngestionStatus
 from app.core.config import settings
+from app.core.metrics import UPLOAD_BYTES, UPLOADS, record_cache_lookup
+import asyncio
 import logging
 import os
-import httpx
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,8 +19,9 @@ router = APIRouter()
 
 async def validate_file(file: UploadFile = File(...)):
     """Validate uploaded file"""
-    # Check file size
-    if file.size > settings.MAX_FILE_SIZE:
+    # Check declared file size; it can be missing or wrong for chunked uploads,
+    # so the limit is enforced again while the body is written to disk
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=413,
             detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
@@ -37,38 +43,82 @@ async def upload_file(file: UploadFile = Depends(validate_file)):
     try:
         logger.info(f"Processing file upload: {file.filename}")
         
-        # Save uploaded file
-        file_id, file_path = await file_service.save_uploaded_file(file)
-        
-        # Extract text from file
+        # Stage uploaded file
         try:
-            extracted_text = file_service.extract_text(file_path)
-        except Exception as e:
-            logger.error(f"Text extraction failed: {str(e)}")
-            # Clean up file if text extraction fails
-            file_service.delete_file(file_path)
-            raise HTTPException(status_code=422, detail=f"Failed to extract text: {str(e)}")
+            file_id, staged_path, file_size, content_hash = await file_service.save_uploaded_file(file)
+        except FileTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
-        # Get file info
-        file_info = file_service.get_file_info(file_path)
+        file_extension = os.path.splitext(file.filename)[1].lower()
+        file_type = file_extension.lstrip('.')
+        UPLOADS.labels(file_type).inc()
+        UPLOAD_BYTES.labels(file_type).inc(file_size)
         
-        # Store extracted text for Q&A (call internal endpoint)
+        # Identical bytes share one stored blob, extraction and Q&A index
+        file_path = file_service.blob_path(content_hash, file_extension)
         try:
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    f"http://localhost:8000/api/v1/store-file-content/{file_id}",
-                    json={"text": extracted_text}
+            record, reused = await asyncio.to_thread(
+                file_registry.register,
+                file_id=file_id,
+                original_filename=file.filename,
+                stored_path=file_path,
+                size=file_size,
+                content_hash=content_hash,
+                extraction_status=IngestionStatus.QUEUED,
+                # A queued or extracting status may have been left by a job lost in a restart
+                reuse_statuses=(IngestionStatus.READY,)
+            )
+            await asyncio.to_thread(file_service.commit_upload, staged_path, file_path)
+        except Exception:
+            await asyncio.to_thread(file_service.delete_file, staged_path)
+            raise
+        
+        content_key = file_registry.content_key_for(record)
+        status = record["extraction_status"]
+        cache_hit = False
+        if reused:
+            # The text may have been evicted from the content store since
+            cache_hit = await asyncio.to_thread(content_store.exists, content_key)
+        if not cache_hit:
+            # Checked without awaiting before submit: a job of this process updates
+            # every record of the blob, this one included, when it ends
+            active_job = ingestion_service.active_job(file_path)
+            if active_job is not None:
+                cache_hit = True
+                status = active_job.status
+        record_cache_lookup("upload", hit=cache_hit)
+        
+        if cache_hit:
+            ready = status == IngestionStatus.READY
+            return FileUploadResponse(
+                file_id=file_id,
+                filename=file.filename,
+                file_type=file_extension,
+                file_size=file_size,
+                status=status,
+                cache_hit=True,
+                success=True,
+                message=(
+                    "Identical file already processed; ready for Q&A" if ready
+                    else f"Identical file is already being processed; poll /file-status/{file_id} for progress"
                 )
-        except Exception as e:
-            logger.warning(f"Failed to store file content for Q&A: {str(e)}")
+            )
+        
+        # Hand extraction, storage and indexing to the background pipeline
+        try:
+            job = ingestion_service.submit(file_id, file_path, file.filename, content_key)
+        except IngestionQueueFullError as e:
+            await asyncio.to_thread(cleanup_service.delete_upload, file_id)
+            raise HTTPException(status_code=503, detail=str(e))
         
         return FileUploadResponse(
             file_id=file_id,
             filename=file.filename,
-            file_type=file_info["extension"],
-            file_size=file_info["size"],
-            extracted_text=extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text,
-            success=True
+            file_type=file_extension,
+            file_size=file_size,
+            status=job.status,
+            success=True,
+            message=f"File queued for processing; poll /file-status/{file_id} for progress"
         )
         
     except HTTPException:
@@ -77,29 +127,46 @@ async def upload_file(file: UploadFile = Depends(validate_file)):
         logger.error(f"Error in file upload: {str(e)}")
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
+@router.get("/file-status/{file_id}", response_model=FileStatusResponse)
+async def get_file_status(file_id: str):
+    """Get the ingestion status of an uploaded file"""
+    job = ingestion_service.get_job(file_id)
+    if job is not None:
+        return FileStatusResponse(**job.to_dict())
+    
+    # Ingested by another worker process, or the job record has expired
+    record = await asyncio.to_thread(file_registry.get, file_id, False)
+    if record is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return FileStatusResponse(
+        file_id=file_id,
+        status=record["extraction_status"],
+        filename=record["original_filename"],
+        progress=1.0 if record["extraction_status"] == IngestionStatus.READY else None,
+        error=record["error"]
+    )
+
 @router.get("/file-info/{file_id}")
 async def get_file_info(file_id: str):
     """Get information about an uploaded file"""
     try:
-        # Find file by ID (in a real app, you'd store this mapping in a database)
-        upload_dir = settings.UPLOAD_DIR
-        
-        # Look for file with this ID
-        for filename in os.listdir(upload_dir):
-            if filename.startswith(file_id):
-                file_path = os.path.join(upload_dir, filename)
-                file_info = file_service.get_file_info(file_path)
-                
-                if file_info["exists"]:
-                    return {
-                        "file_id": file_id,
-                        "filename": filename,
-                        "file_type": file_info["extension"],
-                        "file_size": file_info["size"],
-                        "exists": True
-                    }
+        record = await asyncio.to_thread(file_registry.get, file_id)
+        if record is None or not os.path.exists(record["stored_path"]):
+            raise HTTPException(status_code=404, detail="File not found")
         
-        raise HTTPException(status_code=404, detail="File not found")
+        return {
+            "file_id": file_id,
+            "filename": os.path.basename(record["stored_path"]),
+            "original_filename": record["original_filename"],
+            "file_type": record["extension"],
+            "file_size": record["size"],
+            "content_hash": record["content_hash"],
+            "extraction_status": record["extraction_status"],
+            "created_at": record["created_at"],
+            "last_access": record["last_access"],
+            "exists": True
+        }
         
     except HTTPException:
         raise
@@ -111,20 +178,11 @@ async def get_file_info(file_id: str):
 async def delete_file(file_id: str):
     """Delete an uploaded file"""
     try:
-        upload_dir = settings.UPLOAD_DIR
-        
-        # Find and delete file
-        for filename in os.listdir(upload_dir):
-            if filename.startswith(file_id):
-                file_path = os.path.join(upload_dir, filename)
-                success = file_service.delete_file(file_path)
-                
-                if success:
-                    return {"success": True, "message": "File deleted successfully"}
-                else:
-                    raise HTTPException(status_code=500, detail="Failed to delete file")
+        deleted = await asyncio.to_thread(cleanup_service.delete_upload, file_id)
+        if not deleted:
+            raise HTTPException(status_code=404, detail="File not found")
         
-        raise HTTPException(status_code=404, detail="File not found")
+        return {"success": True, "message": "File deleted successfully"}
         
     except HTTPException:
         raise
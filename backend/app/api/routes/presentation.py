@@ -1,8 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from app.models.schemas import PresentationRequest, PresentationResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from app.api.sse import format_sse, sse_response
+from app.models.schemas import PresentationRequest, PresentationResponse, PresentationJobStatusResponse
 from app.services.gemini_service import gemini_service
-from app.services.presentation_service import presentation_service
+from app.services.presentation_service import presentation_service, PPTX_MEDIA_TYPE
+from app.services.resilience import UpstreamUnavailableError
+from app.services.token_budget import TokenBudgetExceededError, track_token_usage
+from app.services.presentation_job_service import (
+    presentation_job_service,
+    PresentationJob,
+    PresentationJobStatus,
+    PresentationJobQueueFullError,
+)
+from urllib.parse import quote
+import asyncio
 import logging
 import os
 
@@ -12,6 +23,16 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Comment lines sent on idle job streams so proxies don't time them out
+SSE_KEEPALIVE_SECONDS = 15.0
+
+def attachment_header(filename: str) -> str:
+    """Content-Disposition for a download: an ASCII filename plus the UTF-8 one (RFC 5987)"""
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace("?", "_")
+    if fallback == filename:
+        return f'attachment; filename="{filename}"'
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
 @router.post("/generate-presentation", response_model=PresentationResponse)
 async def generate_presentation(request: PresentationRequest):
     """Generate PowerPoint presentation from text"""
@@ -25,41 +46,123 @@ async def generate_presentation(request: PresentationRequest):
         if request.slide_count < 1 or request.slide_count > 20:
             raise HTTPException(status_code=400, detail="Slide count must be between 1 and 20")
         
-        # Generate presentation content using Gemini
-        presentation_data = await gemini_service.generate_presentation_content(
-            text=request.text,
-            title=request.title,
-            slide_count=request.slide_count
-        )
+        # Generate presentation content using Gemini, rendering slides as they arrive
+        streaming_deck = presentation_service.start_deck()
+        with track_token_usage() as usage:
+            presentation_data = await gemini_service.generate_presentation_content(
+                text=request.text,
+                title=request.title,
+                slide_count=request.slide_count,
+                on_slide=streaming_deck.add_slide
+            )
         
         # Create PowerPoint file
-        filename = f"{request.title or 'presentation'}_{presentation_data.get('title', 'generated').replace(' ', '_').lower()}"
-        file_path = presentation_service.create_presentation(
-            presentation_data=presentation_data,
-            filename=filename
-        )
-        
-        # Get presentation info
-        pres_info = presentation_service.get_presentation_info(file_path)
+        filename = presentation_service.default_filename(request.title, presentation_data)
+        deck = await streaming_deck.finish(presentation_data, filename)
         
         return PresentationResponse(
-            file_path=file_path,
-            slide_count=pres_info.get("slide_count", request.slide_count),
+            file_path=deck.file_path,
+            slide_count=deck.slide_count,
             title=presentation_data.get("title", request.title or "Generated Presentation"),
+            **usage.to_dict(),
             success=True
         )
         
+    except HTTPException:
+        raise
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UpstreamUnavailableError:
+        # Answered with 503 and Retry-After by the app's exception handler
+        raise
     except Exception as e:
         logger.error(f"Error generating presentation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Presentation generation failed: {str(e)}")
 
+def job_status(http_request: Request, state: dict) -> dict:
+    """Job state plus a download link once the deck is ready"""
+    if state["filename"]:
+        state["download_url"] = http_request.app.url_path_for("download_presentation", filename=state["filename"])
+    return state
+
+def get_job_or_404(job_id: str) -> PresentationJob:
+    job = presentation_job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Presentation job not found")
+    return job
+
+@router.post("/presentation-jobs", response_model=PresentationJobStatusResponse, status_code=202)
+async def submit_presentation_job(request: PresentationRequest, http_request: Request):
+    """Queue presentation generation and return immediately with a job id"""
+    try:
+        if not request.text.strip():
+            raise HTTPException(status_code=400, detail="Text cannot be empty")
+        gemini_service.check_presentation_budget(request.text, request.title, request.slide_count)
+        
+        job = presentation_job_service.submit(
+            text=request.text,
+            title=request.title,
+            slide_count=request.slide_count
+        )
+        logger.info(f"Queued presentation job {job.job_id} with {request.slide_count} slides")
+        
+        return PresentationJobStatusResponse(**job_status(http_request, job.to_dict()))
+        
+    except HTTPException:
+        raise
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PresentationJobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting presentation job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit presentation job: {str(e)}")
+
+@router.get("/presentation-jobs/{job_id}", response_model=PresentationJobStatusResponse)
+async def get_presentation_job(job_id: str, http_request: Request):
+    """Poll the stage and progress of a presentation job"""
+    job = get_job_or_404(job_id)
+    return PresentationJobStatusResponse(**job_status(http_request, job.to_dict()))
+
+@router.get("/presentation-jobs/{job_id}/events")
+async def stream_presentation_job(job_id: str, http_request: Request):
+    """Server-Sent Events: one "progress" event per stage change, then "ready" or "error" """
+    job = get_job_or_404(job_id)
+    
+    async def events():
+        async for state in job.watch(keepalive=SSE_KEEPALIVE_SECONDS):
+            if await http_request.is_disconnected():
+                return
+            if state is None:
+                yield ": keepalive\n\n"
+            elif state["status"] == PresentationJobStatus.READY:
+                yield format_sse("ready", job_status(http_request, state))
+            elif state["status"] == PresentationJobStatus.FAILED:
+                yield format_sse("error", {"message": state["error"] or "Presentation generation failed"})
+            else:
+                yield format_sse("progress", state)
+    
+    return sse_response(events())
+
 @router.get("/download-presentation/{filename}")
 async def download_presentation(filename: str):
     """Download generated presentation file"""
     try:
-        # Construct file path
-        presentations_dir = os.path.join("uploads", "presentations")
-        file_path = os.path.join(presentations_dir, filename)
+        # Serve straight from the render cache when possible
+        deck = presentation_service.get_cached_deck(filename)
+        if deck is not None:
+            return Response(
+                content=deck.content,
+                media_type=PPTX_MEDIA_TYPE,
+                headers={
+                    "Content-Disposition": attachment_header(deck.filename),
+                    "Content-Length": str(deck.size),
+                    "ETag": f'"{deck.deck_id}"'
+                }
+            )
+        
+        # Fall back to a persisted copy
+        file_path = presentation_service.get_file_path(filename)
         
         # Check if file exists
         if not os.path.exists(file_path):
@@ -68,8 +171,8 @@ async def download_presentation(filename: str):
         # Return file for download
         return FileResponse(
             path=file_path,
-            filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+            filename=os.path.basename(file_path),
+            media_type=PPTX_MEDIA_TYPE
         )
         
     except HTTPException:
@@ -82,10 +185,9 @@ async def download_presentation(filename: str):
 async def get_presentation_info(filename: str):
     """Get information about a generated presentation"""
     try:
-        presentations_dir = os.path.join("uploads", "presentations")
-        file_path = os.path.join(presentations_dir, filename)
+        file_path = presentation_service.get_file_path(filename)
         
-        info = presentation_service.get_presentation_info(file_path)
+        info = await asyncio.to_thread(presentation_service.get_presentation_info, file_path)
         
         if not info.get("exists"):
             raise HTTPException(status_code=404, detail="Presentation not found")
@@ -1,9 +1,30 @@
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import QARequest, QAResponse
+from app.models.schemas import (
+    BatchQAItemResult,
+    BatchQARequest,
+    BatchQAResponse,
+    QARequest,
+    QAResponse,
+    QASessionAnswerResponse,
+    QASessionCreateRequest,
+    QASessionQuestionRequest,
+    QASessionResponse,
+    ErrorResponse,
+)
 from app.services.gemini_service import gemini_service
-from app.services.file_service import file_service
+from app.services.retrieval_service import BM25Index, retrieval_service
+from app.services.content_store import content_store
+from app.services.file_registry import file_registry
+from app.services.batch_qa_service import batch_qa_service
+from app.services.ingestion_service import ingestion_service, IngestionQueueFullError
+from app.core.config import settings
+from app.services.qa_session_service import QASession, qa_session_service
+from app.services.resilience import UpstreamUnavailableError
+from app.services.token_budget import TokenBudgetExceededError, track_token_usage
+from app.api.sse import format_sse, sse_response
+from typing import List, Optional, Tuple
+import asyncio
 import logging
-import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,8 +32,49 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory storage for uploaded file content (in production, use a database)
-file_content_cache = {}
+# Suggested wait while an evicted file's text is extracted again
+REINGEST_RETRY_AFTER_SECONDS = 5
+
+async def load_file_index(file_id: str) -> BM25Index:
+    index = await asyncio.to_thread(retrieval_service.load_index, file_id)
+    if index is None:
+        # A ready upload whose text was evicted from the content store is extracted again
+        try:
+            job = await ingestion_service.reingest(file_id)
+        except IngestionQueueFullError:
+            job = None
+        if job is not None:
+            raise HTTPException(
+                status_code=503,
+                detail=f"File text is being extracted again; poll /file-status/{file_id} and retry",
+                headers={"Retry-After": str(REINGEST_RETRY_AFTER_SECONDS)}
+            )
+        raise HTTPException(status_code=404, detail="File not found or text not extracted")
+    return index
+
+async def resolve_context(request: QARequest) -> Tuple[str, Optional[List[int]]]:
+    """Validate a Q&A request and return its context text plus the chunk ids used
+
+    For uploaded files only the chunks most relevant to the question are sent,
+    so prompt size no longer grows with the document.
+    """
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    # If file_id is provided, retrieve the relevant chunks of the uploaded file
+    if request.file_id:
+        index = await load_file_index(request.file_id)
+        
+        chunks = retrieval_service.retrieve(index, request.question)
+        return retrieval_service.format_context(chunks), [chunk.chunk_id for chunk in chunks]
+    
+    # Use provided text as context
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Either text or file_id must be provided")
+    return request.text, None
+
+def preview_context(context_text: str) -> str:
+    return context_text[:200] + "..." if len(context_text) > 200 else context_text
 
 @router.post("/ask-question", response_model=QAResponse)
 async def ask_question(request: QARequest):
@@ -20,48 +82,244 @@ async def ask_question(request: QARequest):
     try:
         logger.info(f"Processing Q&A request: {request.question[:50]}...")
         
-        # Validate input
-        if not request.question.strip():
-            raise HTTPException(status_code=400, detail="Question cannot be empty")
-        
-        context_text = ""
-        
-        # If file_id is provided, get text from uploaded file
-        if request.file_id:
-            if request.file_id in file_content_cache:
-                context_text = file_content_cache[request.file_id]
-            else:
-                raise HTTPException(status_code=404, detail="File not found or text not extracted")
-        else:
-            # Use provided text as context
-            if not request.text.strip():
-                raise HTTPException(status_code=400, detail="Either text or file_id must be provided")
-            context_text = request.text
+        context_text, chunk_ids = await resolve_context(request)
         
         # Get answer from Gemini
-        answer = await gemini_service.answer_question(
-            context=context_text,
-            question=request.question
-        )
+        with track_token_usage() as usage:
+            answer = await gemini_service.answer_question(
+                context=context_text,
+                question=request.question
+            )
         
         return QAResponse(
             question=request.question,
             answer=answer,
-            context_used=context_text[:200] + "..." if len(context_text) > 200 else context_text,
+            context_used=preview_context(context_text),
+            chunk_ids=chunk_ids,
+            **usage.to_dict(),
             success=True
         )
         
     except HTTPException:
         raise
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UpstreamUnavailableError:
+        # Answered with 503 and Retry-After by the app's exception handler
+        raise
     except Exception as e:
         logger.error(f"Error in Q&A: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Q&A processing failed: {str(e)}")
 
+@router.post("/ask-question/stream")
+async def ask_question_stream(request: QARequest):
+    """Ask a question, relaying the answer as Server-Sent Events while it is generated
+
+    Emits ``token`` events with partial text, then a single ``done`` event
+    carrying a ``QAResponse`` (or an ``error`` event on failure).
+    """
+    logger.info(f"Processing streaming Q&A request: {request.question[:50]}...")
+    
+    context_text, chunk_ids = await resolve_context(request)
+    
+    # Once the 200 is sent errors can only be events: reject an open circuit (503 with
+    # Retry-After) and over-budget input (413) before the stream starts
+    gemini_service.check_available()
+    try:
+        gemini_service.check_qa_budget(context_text, request.question)
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    async def events():
+        fragments = []
+        try:
+            with track_token_usage() as usage:
+                async for fragment in gemini_service.stream_answer_question(
+                    context=context_text,
+                    question=request.question
+                ):
+                    if not fragments:
+                        fragment = fragment.lstrip()
+                        if not fragment:
+                            continue
+                    fragments.append(fragment)
+                    yield format_sse("token", {"text": fragment})
+            
+            response = QAResponse(
+                question=request.question,
+                answer="".join(fragments).strip(),
+                context_used=preview_context(context_text),
+                chunk_ids=chunk_ids,
+                **usage.to_dict(),
+                success=True
+            )
+            yield format_sse("done", response.model_dump(mode="json"))
+            
+        except Exception as e:
+            logger.error(f"Error in streaming Q&A: {str(e)}")
+            error = ErrorResponse(message=f"Q&A processing failed: {str(e)}")
+            yield format_sse("error", error.model_dump(mode="json"))
+    
+    return sse_response(events())
+
+@router.post("/ask-question/batch", response_model=BatchQAResponse)
+async def ask_question_batch(request: BatchQARequest):
+    """Answer many questions about one text or uploaded file
+
+    The shared context is sent once per group of related questions, and each
+    question reports its own answer or error instead of failing the batch.
+    """
+    try:
+        if not request.questions:
+            raise HTTPException(status_code=400, detail="At least one question must be provided")
+        if len(request.questions) > settings.QA_BATCH_MAX_QUESTIONS:
+            raise HTTPException(status_code=400, detail=f"Batch size cannot exceed {settings.QA_BATCH_MAX_QUESTIONS} questions")
+        
+        index = None
+        if request.file_id:
+            index = await load_file_index(request.file_id)
+        elif not request.text.strip():
+            raise HTTPException(status_code=400, detail="Either text or file_id must be provided")
+        
+        logger.info(f"Processing batch Q&A request: {len(request.questions)} questions")
+        
+        # Empty questions fail individually without reaching the model
+        valid_indexes = [position for position, question in enumerate(request.questions) if question.strip()]
+        with track_token_usage() as usage:
+            answers, stats = await batch_qa_service.answer_batch(
+                [request.questions[position] for position in valid_indexes],
+                context=request.text,
+                index=index
+            )
+        answers_by_index = dict(zip(valid_indexes, answers))
+        
+        item_results = []
+        for position, question in enumerate(request.questions):
+            answer = answers_by_index.get(position)
+            if answer is None:
+                item_results.append(BatchQAItemResult(
+                    index=position, question=question, batched=False,
+                    success=False, message="Question cannot be empty"
+                ))
+            elif answer.error is not None:
+                item_results.append(BatchQAItemResult(
+                    index=position, question=question, chunk_ids=answer.chunk_ids, batched=answer.batched,
+                    success=False, message=answer.error
+                ))
+            else:
+                item_results.append(BatchQAItemResult(
+                    index=position, question=question, answer=answer.answer,
+                    chunk_ids=answer.chunk_ids, batched=answer.batched
+                ))
+        
+        succeeded = sum(1 for result in item_results if result.success)
+        return BatchQAResponse(
+            results=item_results,
+            total=len(item_results),
+            unique=stats.unique,
+            llm_calls=stats.llm_calls,
+            fallbacks=stats.fallbacks,
+            succeeded=succeeded,
+            failed=len(item_results) - succeeded,
+            **usage.to_dict(),
+            success=True
+        )
+        
+    except HTTPException:
+        raise
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UpstreamUnavailableError:
+        # Answered with 503 and Retry-After by the app's exception handler
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch Q&A: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch Q&A processing failed: {str(e)}")
+
+def get_session_or_404(session_id: str) -> QASession:
+    session = qa_session_service.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Q&A session not found or expired")
+    return session
+
+@router.post("/qa-sessions", response_model=QASessionResponse, status_code=201)
+async def create_qa_session(request: QASessionCreateRequest):
+    """Start a conversation about an uploaded file or a text
+
+    Follow-up questions go to /qa-sessions/{session_id}/questions without
+    re-sending the context; the server keeps the document's index and a
+    compacted history of the conversation.
+    """
+    try:
+        if request.file_id:
+            index = await load_file_index(request.file_id)
+            session = await qa_session_service.create_session(file_id=request.file_id, index=index)
+        elif request.text.strip():
+            session = await qa_session_service.create_session(text=request.text)
+        else:
+            raise HTTPException(status_code=400, detail="Either text or file_id must be provided")
+        
+        return QASessionResponse(**session.to_dict())
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating Q&A session: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to create Q&A session: {str(e)}")
+
+@router.get("/qa-sessions/{session_id}", response_model=QASessionResponse)
+async def get_qa_session(session_id: str):
+    """Get a conversation's summary and the turns kept verbatim"""
+    return QASessionResponse(**get_session_or_404(session_id).to_dict())
+
+@router.post("/qa-sessions/{session_id}/questions", response_model=QASessionAnswerResponse)
+async def ask_session_question(session_id: str, request: QASessionQuestionRequest):
+    """Ask the next question in a conversation"""
+    session = get_session_or_404(session_id)
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    try:
+        logger.info(f"Processing Q&A session question: {request.question[:50]}...")
+        
+        with track_token_usage() as usage:
+            turn, context_text = await qa_session_service.ask(session, request.question)
+        
+        return QASessionAnswerResponse(
+            session_id=session.session_id,
+            turn_number=len(session.turns),
+            question=turn.question,
+            answer=turn.answer,
+            context_used=preview_context(context_text),
+            chunk_ids=turn.chunk_ids,
+            **usage.to_dict(),
+            success=True
+        )
+        
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UpstreamUnavailableError:
+        # Answered with 503 and Retry-After by the app's exception handler
+        raise
+    except Exception as e:
+        logger.error(f"Error in Q&A session: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Q&A processing failed: {str(e)}")
+
+@router.delete("/qa-sessions/{session_id}")
+async def delete_qa_session(session_id: str):
+    """End a conversation and discard its history"""
+    if not qa_session_service.delete_session(session_id):
+        raise HTTPException(status_code=404, detail="Q&A session not found or expired")
+    return {"success": True, "message": "Q&A session deleted"}
+
 @router.post("/store-file-content/{file_id}")
 async def store_file_content(file_id: str, content: dict):
     """Store extracted file content for Q&A (internal endpoint)"""
     try:
-        file_content_cache[file_id] = content.get("text", "")
+        text = content.get("text", "")
+        content_key = await asyncio.to_thread(file_registry.content_key, file_id)
+        await asyncio.to_thread(content_store.put, content_key, text)
+        await asyncio.to_thread(retrieval_service.build_index, content_key, text)
         return {"success": True, "message": "Content stored successfully"}
     except Exception as e:
         logger.error(f"Error storing file content: {str(e)}")
@@ -70,11 +328,13 @@ async def store_file_content(file_id: str, content: dict):
 @router.get("/file-content/{file_id}")
 async def get_file_content(file_id: str):
     """Get stored file content"""
-    if file_id not in file_content_cache:
+    content_key = await asyncio.to_thread(file_registry.content_key, file_id)
+    text = await asyncio.to_thread(content_store.get, content_key)
+    if text is None:
         raise HTTPException(status_code=404, detail="File content not found")
     
     return {
         "file_id": file_id,
-        "content": file_content_cache[file_id][:500] + "..." if len(file_content_cache[file_id]) > 500 else file_content_cache[file_id],
-        "full_length": len(file_content_cache[file_id])
+        "content": text[:500] + "..." if len(text) > 500 else text,
+        "full_length": len(text)
     }
@@ -1,6 +1,14 @@
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import TextTransformRequest, TextTransformResponse, ErrorResponse
+from app.models.schemas import (
+    TextTransformRequest, TextTransformResponse, ErrorResponse,
+    BatchTextTransformRequest, BatchTextTransformResponse, BatchTextTransformItemResult
+)
 from app.services.gemini_service import gemini_service
+from app.services.batch_transform_service import batch_transform_service
+from app.services.resilience import UpstreamUnavailableError
+from app.services.token_budget import TokenBudgetExceededError, track_token_usage
+from app.core.config import settings
+from app.api.sse import format_sse, sse_response
 import logging
 
 # Configure logging
@@ -20,23 +28,156 @@ async def transform_text(request: TextTransformRequest):
             raise HTTPException(status_code=400, detail="Text cannot be empty")
         
         # Transform text using Gemini
-        transformed_text = await gemini_service.transform_text(
-            text=request.text,
-            tone=request.tone.value,
-            additional_instructions=request.additional_instructions
-        )
+        with track_token_usage() as usage:
+            transformed_text = await gemini_service.transform_text(
+                text=request.text,
+                tone=request.tone.value,
+                additional_instructions=request.additional_instructions
+            )
         
         return TextTransformResponse(
             original_text=request.text,
             transformed_text=transformed_text,
             tone=request.tone,
+            **usage.to_dict(),
             success=True
         )
         
+    except HTTPException:
+        raise
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UpstreamUnavailableError:
+        # Answered with 503 and Retry-After by the app's exception handler
+        raise
     except Exception as e:
         logger.error(f"Error in text transformation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Text transformation failed: {str(e)}")
 
+@router.post("/transform-text/batch", response_model=BatchTextTransformResponse)
+async def transform_text_batch(request: BatchTextTransformRequest):
+    """Transform many texts (or one text into many tones) concurrently
+
+    Identical items are transformed once, and each item reports its own
+    success or error instead of failing the whole batch.
+    """
+    try:
+        items = list(request.items or [])
+        if request.text is not None:
+            if not request.tones:
+                raise HTTPException(status_code=400, detail="tones must be provided with text")
+            items += [
+                TextTransformRequest(text=request.text, tone=tone, additional_instructions=request.additional_instructions)
+                for tone in request.tones
+            ]
+        
+        # Validate input
+        if not items:
+            raise HTTPException(status_code=400, detail="Provide items, or text with tones")
+        if len(items) > settings.BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"Batch size cannot exceed {settings.BATCH_MAX_ITEMS} items")
+        
+        logger.info(f"Transforming batch of {len(items)} items")
+        
+        # Empty texts fail individually without reaching the model
+        valid_indexes = [index for index, item in enumerate(items) if item.text.strip()]
+        with track_token_usage() as usage:
+            results, unique = await batch_transform_service.transform_batch(
+                [(items[index].text, items[index].tone.value, items[index].additional_instructions) for index in valid_indexes],
+                pack=request.pack_short_texts,
+                max_concurrency=request.max_concurrency
+            )
+        results_by_index = dict(zip(valid_indexes, results))
+        
+        item_results = []
+        for index, item in enumerate(items):
+            result = results_by_index.get(index)
+            if result is None:
+                item_results.append(BatchTextTransformItemResult(
+                    index=index, original_text=item.text, tone=item.tone,
+                    success=False, message="Text cannot be empty"
+                ))
+            elif result.error is not None:
+                item_results.append(BatchTextTransformItemResult(
+                    index=index, original_text=item.text, tone=item.tone,
+                    success=False, message=result.error
+                ))
+            else:
+                item_results.append(BatchTextTransformItemResult(
+                    index=index, original_text=item.text, tone=item.tone,
+                    transformed_text=result.transformed_text
+                ))
+        
+        succeeded = sum(1 for result in item_results if result.success)
+        return BatchTextTransformResponse(
+            results=item_results,
+            total=len(item_results),
+            unique=unique,
+            succeeded=succeeded,
+            failed=len(item_results) - succeeded,
+            **usage.to_dict(),
+            success=True
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch text transformation: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch text transformation failed: {str(e)}")
+
+@router.post("/transform-text/stream")
+async def transform_text_stream(request: TextTransformRequest):
+    """Transform text, relaying output as Server-Sent Events while it is generated
+
+    Emits ``token`` events with partial text, then a single ``done`` event
+    carrying a ``TextTransformResponse`` (or an ``error`` event on failure).
+    """
+    logger.info(f"Streaming text transformation to {request.tone} tone")
+    
+    # Validate input
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    
+    # Once the 200 is sent errors can only be events: reject an open circuit (503 with
+    # Retry-After) and over-budget input (413) before the stream starts
+    gemini_service.check_available()
+    try:
+        gemini_service.check_transform_budget(request.text, request.tone.value, request.additional_instructions)
+    except TokenBudgetExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    async def events():
+        fragments = []
+        try:
+            with track_token_usage() as usage:
+                async for fragment in gemini_service.stream_transform_text(
+                    text=request.text,
+                    tone=request.tone.value,
+                    additional_instructions=request.additional_instructions
+                ):
+                    if not fragments:
+                        fragment = fragment.lstrip()
+                        if not fragment:
+                            continue
+                    fragments.append(fragment)
+                    yield format_sse("token", {"text": fragment})
+            
+            response = TextTransformResponse(
+                original_text=request.text,
+                transformed_text="".join(fragments).strip(),
+                tone=request.tone,
+                **usage.to_dict(),
+                success=True
+            )
+            yield format_sse("done", response.model_dump(mode="json"))
+            
+        except Exception as e:
+            logger.error(f"Error in streaming text transformation: {str(e)}")
+            error = ErrorResponse(message=f"Text transformation failed: {str(e)}")
+            yield format_sse("error", error.model_dump(mode="json"))
+    
+    return sse_response(events())
+
 @router.get("/supported-tones")
 async def get_supported_tones():
     """Get list of supported tone transformations"""
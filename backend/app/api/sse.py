@@ -0,0 +1,17 @@
+import json
+from typing import Any, AsyncIterator
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop reverse proxies (nginx) from buffering the event stream
+    "X-Accel-Buffering": "no",
+}
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async iterator of encoded events in a text/event-stream response"""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
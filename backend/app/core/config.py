@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 
@@ -10,6 +10,13 @@ class Settings(BaseSettings):
     # File Upload Configuration
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 65536  # bytes read per write while streaming uploads
+
+    # Local state (caches, stores) lives outside the publicly mounted UPLOAD_DIR
+    DATA_DIR: str = "data"
+
+    # Startup Configuration
+    PRELOAD_LIBRARIES: bool = True  # import Gemini/PDF/DOCX/PPTX libraries in the background after startup
 
     # CORS Configuration
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
@@ -22,6 +29,109 @@ class Settings(BaseSettings):
     MAX_TOKENS: int = 8192
     TEMPERATURE: float = 0.7
 
+    # PDF Extraction Configuration
+    PDF_PARALLEL_MIN_PAGES: int = 40  # smaller PDFs are extracted serially
+    PDF_PAGE_BATCH_SIZE: int = 16  # pages per process-pool task
+    PDF_EXTRACTION_PROCESSES: int = 0  # 0 = one per CPU core
+
+    # Upload Ingestion Configuration
+    INGESTION_WORKERS: int = 2
+    INGESTION_QUEUE_SIZE: int = 100
+    INGESTION_JOB_TTL_SECONDS: int = 3600
+
+    # Upload Registry and Garbage Collection Configuration
+    FILE_REGISTRY_PATH: str = ""  # defaults to DATA_DIR/file_registry.db
+    UPLOAD_TTL_SECONDS: int = 604800  # delete uploads idle for 7 days
+    UPLOAD_QUOTA_BYTES: int = 5368709120  # 5GB of uploads in total
+    PRESENTATION_TTL_SECONDS: int = 86400
+    GC_INTERVAL_SECONDS: int = 600  # 0 disables the background sweep
+
+    # Extracted Content Store Configuration
+    CONTENT_STORE_PATH: str = ""  # defaults to DATA_DIR/content_store.db
+    CONTENT_STORE_HOT_CHARS: int = 16000000  # per-process in-memory tier
+    CONTENT_STORE_MAX_BYTES: int = 1073741824  # 1GB compressed
+    CONTENT_STORE_MAX_AGE_SECONDS: int = 604800  # 7 days without access
+    CONTENT_STORE_COMPRESSION_LEVEL: int = 6
+
+    # Q&A Retrieval Configuration
+    QA_CHUNK_SIZE: int = 1200  # characters per indexed chunk
+    QA_TOP_K: int = 5
+    QA_INDEX_CACHE_SIZE: int = 128  # number of per-file indexes kept in memory
+
+    # Q&A Session Configuration
+    QA_SESSION_TTL_SECONDS: int = 3600  # idle sessions expire
+    QA_SESSION_MAX_SESSIONS: int = 1000
+    QA_SESSION_FULL_CONTEXT_CHARS: int = 6000  # longer session texts are indexed and retrieved from
+    QA_SESSION_HISTORY_TOKENS: int = 1500  # verbatim history allowed before older turns are summarized
+    QA_SESSION_RECENT_TURNS: int = 2  # latest turns always kept verbatim
+    QA_SESSION_SUMMARY_TOKENS: int = 400
+
+    # Batch Q&A Configuration
+    QA_BATCH_MAX_QUESTIONS: int = 50
+    QA_BATCH_GROUP_SIZE: int = 15  # questions answered per model call
+    QA_BATCH_MAX_CHUNKS: int = 12  # document chunks shared by one call's questions
+
+    # LLM Concurrency Configuration
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_DEFAULT_ENDPOINT_CONCURRENCY: int = 8
+    # Per-endpoint overrides; presentation slides fan out up to 20 calls per deck
+    LLM_ENDPOINT_CONCURRENCY: Dict[str, int] = {"generate_presentation_content": 20}
+
+    # LLM Resilience Configuration (see app/services/resilience.py)
+    LLM_TIMEOUT_SECONDS: float = 60.0  # per model call attempt
+    LLM_ENDPOINT_TIMEOUTS: Dict[str, float] = {"generate_presentation_content": 120.0}
+    LLM_MAX_RETRIES: int = 2  # extra attempts after timeouts, throttling and 5xx errors
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    LLM_HEDGE_ENABLED: bool = False  # send a duplicate request when a call runs past the hedge delay
+    LLM_HEDGE_PERCENTILE: float = 0.95  # hedge delay = this percentile of recent call latency
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive upstream failures before failing fast
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Token Budget Configuration (estimated locally, see app/services/token_budget.py)
+    TOKEN_ESTIMATE_CHARS_PER_TOKEN: float = 4.0
+    LLM_DEFAULT_INPUT_TOKEN_BUDGET: int = 32000
+    LLM_INPUT_TOKEN_BUDGETS: Dict[str, int] = {}  # per endpoint overrides
+    LLM_OUTPUT_TOKEN_BUDGETS: Dict[str, int] = {}  # per endpoint; defaults to MAX_TOKENS
+
+    # Long Text (map-reduce) Transform Configuration
+    LONG_TEXT_THRESHOLD_CHARS: int = 12000  # longer inputs are rewritten in sections
+    LONG_TEXT_CHUNK_CHARS: int = 6000
+    LONG_TEXT_CONTEXT_CHARS: int = 400  # neighbouring text shown for continuity
+    LONG_TEXT_CONCURRENCY: int = 8
+
+    # Batch Text Transform Configuration
+    BATCH_MAX_ITEMS: int = 500
+    BATCH_MAX_CONCURRENCY: int = 8
+    BATCH_PACK_SIZE: int = 10  # short texts per packed model call
+    BATCH_PACK_MAX_CHARS: int = 600  # only texts up to this length are packed
+
+    # LLM Response Cache Configuration
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_DISK_ENABLED: bool = False
+    LLM_CACHE_DISK_PATH: str = ""  # defaults to DATA_DIR/llm_cache.db
+    LLM_CACHE_DISK_TTL_SECONDS: int = 604800  # 7 days
+
+    # Presentation Rendering Configuration
+    PRESENTATION_PERSIST_TO_DISK: bool = True  # also write decks to UPLOAD_DIR/presentations
+    PRESENTATION_CACHE_MAX_BYTES: int = 268435456  # 256MB of rendered decks per process
+    PRESENTATION_CACHE_TTL_SECONDS: int = 3600
+    PRESENTATION_STREAM_RENDERING: bool = True  # render slides while the rest of the deck is generated
+
+    # Two-phase (outline, then per-slide) Presentation Generation Configuration
+    PRESENTATION_TWO_PHASE_MIN_SLIDES: int = 6  # smaller decks use a single call; 0 disables two-phase
+    PRESENTATION_SLIDE_CONCURRENCY: int = 20
+    PRESENTATION_GENERATION_ATTEMPTS: int = 3  # per outline / per slide
+    PRESENTATION_SLIDE_CONTEXT_CHUNKS: int = 4  # source chunks shown per slide for long texts
+
+    # Presentation Job Configuration
+    PRESENTATION_JOB_WORKERS: int = 4  # generations running at once
+    PRESENTATION_JOB_QUEUE_SIZE: int = 100
+    PRESENTATION_JOB_TTL_SECONDS: int = 3600
+
     @field_validator('CORS_ORIGINS')
     @classmethod
     def parse_cors_origins(cls, v):
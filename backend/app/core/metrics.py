@@ -0,0 +1,309 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Lightweight, dependency-free metrics in the Prometheus text exposition format.
+# Metric objects are module-level; services import and update them directly.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Child for one combination of label values (created on first use)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+class _GaugeChild:
+    __slots__ = ("value", "function", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value at scrape time instead of tracking it"""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            try:
+                value = child.get()
+            except Exception:
+                continue
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for upper_bound, count in zip(self.upper_bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(upper_bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+REGISTRY = Registry()
+
+def timed(histogram: Histogram, *label_values: str):
+    """Decorator observing a synchronous function's duration in histogram"""
+    child = histogram.labels(*label_values)
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with child.time():
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def size_bucket(size: int) -> str:
+    """Coarse size label, so per-size series stay few"""
+    for limit, label in ((100 * 1024, "<100KB"), (1024 * 1024, "<1MB"), (10 * 1024 * 1024, "<10MB")):
+        if size < limit:
+            return label
+    return ">=10MB"
+
+# Process
+APP_STARTUP_SECONDS = Gauge("app_startup_seconds", "Time from importing main to the end of the startup hook")
+
+# HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route, until the response completes", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+# Gemini
+LLM_REQUESTS = Counter("llm_requests_total", "Model calls by endpoint and outcome", ("endpoint", "outcome"))
+LLM_REQUEST_DURATION = Histogram("llm_request_duration_seconds", "Model call latency by endpoint", ("endpoint",))
+LLM_TOKENS = Counter("llm_tokens_total", "Estimated model tokens by endpoint and direction", ("endpoint", "direction"))
+LLM_RETRIES = Counter("llm_retries_total", "Model call attempts retried after a transient failure", ("endpoint",))
+LLM_HEDGES = Counter("llm_hedged_requests_total", "Duplicate requests sent past the hedge delay, by which attempt won", ("endpoint", "winner"))
+LLM_CIRCUIT_OPEN = Gauge("llm_circuit_open", "1 while the circuit breaker fails model calls fast")
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "Model calls currently in flight")
+LLM_QUEUED = Gauge("llm_requests_queued", "Model calls waiting for a concurrency slot")
+
+# Files and presentations
+EXTRACTION_DURATION = Histogram(
+    "text_extraction_duration_seconds", "Text extraction time by file type and size", ("file_type", "size")
+)
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes received in file uploads", ("file_type",))
+UPLOADS = Counter("uploads_total", "Completed file uploads", ("file_type",))
+PPTX_RENDER_DURATION = Histogram(
+    "pptx_render_duration_seconds", "Deck rendering time (build and serialise)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# Caches
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result"))
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Hits / lookups since start, by cache", ("cache",))
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+    ratio = CACHE_HIT_RATIO.labels(cache)
+    if ratio.function is None:
+        hits = CACHE_LOOKUPS.labels(cache, "hit")
+        misses = CACHE_LOOKUPS.labels(cache, "miss")
+        ratio.set_function(lambda: hits.value / ((hits.value + misses.value) or 1))
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status counts and in-flight requests.
+
+    Routes are labelled by their path template (e.g. /api/v1/file-status/{file_id}),
+    so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            # Mounted apps (static uploads) have no route but set root_path
+            path = route.path if route is not None else (scope.get("root_path") or "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, path).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
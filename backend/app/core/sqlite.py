@@ -0,0 +1,32 @@
+import os
+import sqlite3
+import threading
+
+class ThreadLocalSQLite:
+    """One SQLite connection per thread for a WAL-mode database file.
+
+    WAL lets several uvicorn worker processes read while one writes;
+    sqlite3 connections themselves must not be shared between threads.
+    """
+
+    def __init__(self, path: str, schema: str = ""):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        if schema:
+            conn.executescript(schema)
+        conn.commit()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,38 @@
+import logging
+from starlette.responses import JSONResponse
+from app.core.config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 65536
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware rejecting oversized uploads from their Content-Length, before the body is read.
+
+    Form parsing spools the whole multipart body before any route code runs,
+    so without this a 413 would only come after the full upload. Bodies sent
+    without a Content-Length (chunked) are still checked as the file is
+    written, by FileService.save_uploaded_file.
+    """
+
+    def __init__(self, app, paths=("/upload-file",)):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"].endswith(self.paths):
+            content_length = dict(scope["headers"]).get(b"content-length")
+            limit = settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD_BYTES
+            if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+                logger.info(f"Rejected upload of {int(content_length)} bytes before reading it")
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"File too large. Maximum size is {settings.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"},
+                    headers={"Connection": "close"},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -18,6 +18,35 @@ class TextTransformResponse(BaseModel):
     original_text: str
     transformed_text: str
     tone: ToneType
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens sent to the model")
+    output_tokens: Optional[int] = Field(None, description="Estimated tokens generated by the model")
+    success: bool = True
+    message: Optional[str] = None
+
+class BatchTextTransformRequest(BaseModel):
+    items: Optional[List[TextTransformRequest]] = Field(None, description="Independent text/tone pairs to transform")
+    text: Optional[str] = Field(None, description="Single text to transform into each of `tones`")
+    tones: Optional[List[ToneType]] = Field(None, description="Target tones for `text`")
+    additional_instructions: Optional[str] = Field(None, description="Additional instructions applied with `text`/`tones`")
+    pack_short_texts: bool = Field(False, description="Transform several short texts per model call")
+    max_concurrency: Optional[int] = Field(None, description="Upper bound on concurrent model calls for this batch, capped at the server's BATCH_MAX_CONCURRENCY", ge=1)
+
+class BatchTextTransformItemResult(BaseModel):
+    index: int
+    original_text: str
+    tone: ToneType
+    transformed_text: Optional[str] = None
+    success: bool = True
+    message: Optional[str] = None
+
+class BatchTextTransformResponse(BaseModel):
+    results: List[BatchTextTransformItemResult]
+    total: int
+    unique: int
+    succeeded: int
+    failed: int
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens sent to the model")
+    output_tokens: Optional[int] = Field(None, description="Estimated tokens generated by the model")
     success: bool = True
     message: Optional[str] = None
 
@@ -30,9 +59,63 @@ class QAResponse(BaseModel):
     question: str
     answer: str
     context_used: str
+    chunk_ids: Optional[List[int]] = Field(None, description="Document chunks sent to the model (file Q&A only)")
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens sent to the model")
+    output_tokens: Optional[int] = Field(None, description="Estimated tokens generated by the model")
+    success: bool = True
+    message: Optional[str] = None
+
+class BatchQARequest(BaseModel):
+    questions: List[str] = Field(..., description="Questions to answer about the same text or file")
+    text: str = Field("", description="Context text (ignored when file_id is provided)")
+    file_id: Optional[str] = Field(None, description="Optional file ID if the questions are about an uploaded file")
+
+class BatchQAItemResult(BaseModel):
+    index: int
+    question: str
+    answer: Optional[str] = None
+    chunk_ids: Optional[List[int]] = Field(None, description="Document chunks sent with this question (file Q&A only)")
+    batched: bool = Field(True, description="Answered by a multi-question call rather than an individual fallback call")
     success: bool = True
     message: Optional[str] = None
 
+class BatchQAResponse(BaseModel):
+    results: List[BatchQAItemResult]
+    total: int
+    unique: int
+    llm_calls: int = Field(..., description="Model calls made: multi-question calls plus single-question calls")
+    fallbacks: int = Field(..., description="Questions the multi-question responses did not answer")
+    succeeded: int
+    failed: int
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens sent to the model")
+    output_tokens: Optional[int] = Field(None, description="Estimated tokens generated by the model")
+    success: bool = True
+    message: Optional[str] = None
+
+class QASessionCreateRequest(BaseModel):
+    text: str = Field("", description="Context text for the conversation")
+    file_id: Optional[str] = Field(None, description="Uploaded file the conversation is about (takes precedence over text)")
+
+class QASessionQuestionRequest(BaseModel):
+    question: str = Field(..., description="Next question in the conversation")
+
+class QATurnResponse(BaseModel):
+    question: str
+    answer: str
+
+class QASessionResponse(BaseModel):
+    session_id: str
+    file_id: Optional[str] = None
+    turn_count: int
+    summarized_turns: int = Field(..., description="Older turns folded into the running summary")
+    summary: Optional[str] = None
+    turns: List[QATurnResponse] = Field(default_factory=list, description="Turns kept verbatim, oldest first")
+    success: bool = True
+
+class QASessionAnswerResponse(QAResponse):
+    session_id: str
+    turn_number: int
+
 class PresentationRequest(BaseModel):
     text: str = Field(..., description="Text to convert to presentation")
     title: Optional[str] = Field(None, description="Presentation title")
@@ -43,18 +126,47 @@ class PresentationResponse(BaseModel):
     file_path: str
     slide_count: int
     title: str
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens sent to the model")
+    output_tokens: Optional[int] = Field(None, description="Estimated tokens generated by the model")
     success: bool = True
     message: Optional[str] = None
 
+class PresentationJobStatusResponse(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, outline, slides, rendering, ready or failed")
+    slides_completed: int = 0
+    slides_total: Optional[int] = None
+    title: Optional[str] = None
+    filename: Optional[str] = None
+    file_path: Optional[str] = None
+    slide_count: Optional[int] = None
+    download_url: Optional[str] = None
+    input_tokens: Optional[int] = Field(None, description="Estimated tokens sent to the model")
+    output_tokens: Optional[int] = Field(None, description="Estimated tokens generated by the model")
+    error: Optional[str] = None
+
 class FileUploadResponse(BaseModel):
     file_id: str
     filename: str
     file_type: str
     file_size: int
     extracted_text: Optional[str] = None
+    status: Optional[str] = Field(None, description="Ingestion status: queued, extracting, ready or failed")
+    cache_hit: bool = Field(False, description="Identical content was uploaded before, so its extraction is reused")
     success: bool = True
     message: Optional[str] = None
 
+class FileStatusResponse(BaseModel):
+    file_id: str
+    status: str
+    filename: Optional[str] = None
+    pages_processed: int = 0
+    pages_total: Optional[int] = None
+    progress: Optional[float] = Field(None, description="Fraction of pages processed, when known")
+    text_length: Optional[int] = None
+    extracted_text: Optional[str] = Field(None, description="Preview of the extracted text once ready")
+    error: Optional[str] = None
+
 class ErrorResponse(BaseModel):
     success: bool = False
     message: str
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.services.gemini_service import gemini_service
+from app.services.retrieval_service import BM25Index, retrieval_service
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BatchAnswer:
+    __slots__ = ("answer", "chunk_ids", "batched", "error")
+
+    def __init__(
+        self,
+        answer: Optional[str] = None,
+        chunk_ids: Optional[List[int]] = None,
+        batched: bool = True,
+        error: Optional[str] = None,
+    ):
+        self.answer = answer
+        self.chunk_ids = chunk_ids
+        self.batched = batched
+        self.error = error
+
+class QuestionGroup:
+    """Questions answered together, sharing the union of their retrieved chunks"""
+    __slots__ = ("questions", "chunk_ids")
+
+    def __init__(self):
+        self.questions: List[int] = []
+        self.chunk_ids: Set[int] = set()
+
+class BatchQAStats:
+    __slots__ = ("unique", "llm_calls", "fallbacks")
+
+    def __init__(self, unique: int, llm_calls: int, fallbacks: int):
+        self.unique = unique
+        self.llm_calls = llm_calls
+        self.fallbacks = fallbacks
+
+class BatchQAService:
+    """Answer many questions about one document with few model calls.
+
+    Questions are grouped so that each group's shared context is sent once:
+    for uploaded files, questions whose retrieved chunks overlap go together,
+    up to QA_BATCH_MAX_CHUNKS chunks and QA_BATCH_GROUP_SIZE questions per
+    call. Questions a group's response leaves unanswered are retried as
+    concurrent single-question calls.
+    """
+
+    def _group(self, question_chunks: List[List[int]]) -> List[QuestionGroup]:
+        """Place each question in the open group it adds the fewest new chunks to"""
+        groups: List[QuestionGroup] = []
+        for question, chunk_ids in enumerate(question_chunks):
+            best: Optional[QuestionGroup] = None
+            best_added = 0
+            for group in groups:
+                if len(group.questions) >= settings.QA_BATCH_GROUP_SIZE:
+                    continue
+                added = len(set(chunk_ids) - group.chunk_ids)
+                if len(group.chunk_ids) + added > settings.QA_BATCH_MAX_CHUNKS:
+                    continue
+                if best is None or added < best_added:
+                    best, best_added = group, added
+            if best is None:
+                best = QuestionGroup()
+                groups.append(best)
+            best.questions.append(question)
+            best.chunk_ids.update(chunk_ids)
+        return groups
+
+    async def _answer_one(
+        self, question: str, context: str, chunk_ids: Optional[List[int]], semaphore: asyncio.Semaphore
+    ) -> BatchAnswer:
+        async with semaphore:
+            try:
+                answer = await gemini_service.answer_question(context=context, question=question)
+                return BatchAnswer(answer=answer, chunk_ids=chunk_ids, batched=False)
+            except Exception as e:
+                return BatchAnswer(chunk_ids=chunk_ids, batched=False, error=str(e))
+
+    async def answer_batch(
+        self,
+        questions: List[str],
+        context: Optional[str] = None,
+        index: Optional[BM25Index] = None,
+    ) -> Tuple[List[BatchAnswer], BatchQAStats]:
+        """Answer questions about a text (context) or an indexed file (index), one result per question"""
+        unique_index: Dict[str, int] = {}
+        unique_questions: List[str] = []
+        positions = []
+        for question in questions:
+            if question not in unique_index:
+                unique_index[question] = len(unique_questions)
+                unique_questions.append(question)
+            positions.append(unique_index[question])
+
+        if index is not None:
+            question_chunks = [
+                [chunk.chunk_id for chunk in retrieval_service.retrieve(index, question)]
+                for question in unique_questions
+            ]
+        else:
+            question_chunks = [[] for _ in unique_questions]
+        groups = self._group(question_chunks)
+
+        def group_context(chunk_ids) -> str:
+            if index is None:
+                return context
+            return retrieval_service.format_context([index.chunks[chunk_id] for chunk_id in sorted(chunk_ids)])
+
+        semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+        results: List[Optional[BatchAnswer]] = [None] * len(unique_questions)
+
+        def answer_alone(question: int):
+            # Single-question calls use the question's own retrieved context
+            return self._answer_one(
+                unique_questions[question],
+                group_context(question_chunks[question]),
+                question_chunks[question] if index is not None else None,
+                semaphore,
+            )
+
+        async def run(group: QuestionGroup) -> int:
+            """Answer a group, returning how many of its questions needed a fallback call"""
+            if len(group.questions) == 1:
+                results[group.questions[0]] = await answer_alone(group.questions[0])
+                return 0
+
+            async with semaphore:
+                try:
+                    answers = await gemini_service.answer_questions_packed(
+                        group_context(group.chunk_ids), [unique_questions[q] for q in group.questions]
+                    )
+                except Exception as e:
+                    logger.warning(f"Batch Q&A call for {len(group.questions)} questions failed, answering individually: {str(e)}")
+                    answers = [None] * len(group.questions)
+
+            chunk_ids = sorted(group.chunk_ids) if index is not None else None
+            retries = []
+            for question, answer in zip(group.questions, answers):
+                if answer is not None:
+                    results[question] = BatchAnswer(answer=answer, chunk_ids=chunk_ids)
+                else:
+                    retries.append(question)
+            for question, result in zip(retries, await asyncio.gather(*(answer_alone(q) for q in retries))):
+                results[question] = result
+            return len(retries)
+
+        fallbacks = sum(await asyncio.gather(*(run(group) for group in groups)))
+        batch_calls = sum(1 for group in groups if len(group.questions) > 1)
+        single_calls = len(groups) - batch_calls + fallbacks
+        stats = BatchQAStats(len(unique_questions), batch_calls + single_calls, fallbacks)
+        logger.info(
+            f"Batch Q&A: {len(questions)} questions, {stats.unique} unique, "
+            f"{batch_calls} multi-question calls, {single_calls} single-question calls"
+        )
+        return [results[position] for position in positions], stats
+
+# Global service instance
+batch_qa_service = BatchQAService()
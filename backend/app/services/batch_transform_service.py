@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.gemini_service import gemini_service
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (text, tone, additional_instructions)
+BatchItem = Tuple[str, str, Optional[str]]
+
+class BatchItemResult:
+    __slots__ = ("transformed_text", "error")
+
+    def __init__(self, transformed_text: Optional[str] = None, error: Optional[str] = None):
+        self.transformed_text = transformed_text
+        self.error = error
+
+class BatchTransformService:
+    """Fan a list of transform requests out to Gemini.
+
+    Identical (text, tone, instructions) items are transformed once, unique
+    items run concurrently under a per-batch limit, and a failing item only
+    fails itself. Optionally, short texts sharing a tone and instructions are
+    packed several to a prompt; a pack whose response cannot be matched back
+    to its inputs is retried item by item.
+    """
+
+    async def _transform_one(self, item: BatchItem, semaphore: asyncio.Semaphore) -> BatchItemResult:
+        text, tone, additional_instructions = item
+        async with semaphore:
+            try:
+                transformed = await gemini_service.transform_text(
+                    text=text,
+                    tone=tone,
+                    additional_instructions=additional_instructions
+                )
+                return BatchItemResult(transformed_text=transformed)
+            except Exception as e:
+                return BatchItemResult(error=str(e))
+
+    async def _transform_pack(self, items: List[BatchItem], semaphore: asyncio.Semaphore) -> List[BatchItemResult]:
+        _, tone, additional_instructions = items[0]
+        async with semaphore:
+            try:
+                transformed = await gemini_service.transform_texts_packed(
+                    texts=[text for text, _, _ in items],
+                    tone=tone,
+                    additional_instructions=additional_instructions
+                )
+                return [BatchItemResult(transformed_text=text) for text in transformed]
+            except Exception as e:
+                logger.warning(f"Packed transform of {len(items)} texts failed, retrying individually: {str(e)}")
+
+        return list(await asyncio.gather(*(self._transform_one(item, semaphore) for item in items)))
+
+    def _plan(self, unique_items: List[BatchItem], pack: bool) -> List[List[int]]:
+        """Group unique item indexes into units of work (single items or packs)"""
+        if not pack:
+            return [[index] for index in range(len(unique_items))]
+
+        units: List[List[int]] = []
+        open_packs: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        for index, (text, tone, additional_instructions) in enumerate(unique_items):
+            if len(text) > settings.BATCH_PACK_MAX_CHARS:
+                units.append([index])
+                continue
+            group = open_packs.setdefault((tone, additional_instructions), [])
+            group.append(index)
+            if len(group) == settings.BATCH_PACK_SIZE:
+                units.append(group)
+                open_packs[(tone, additional_instructions)] = []
+
+        units.extend(group for group in open_packs.values() if group)
+        return units
+
+    async def transform_batch(
+        self,
+        items: List[BatchItem],
+        pack: bool = False,
+        max_concurrency: Optional[int] = None,
+    ) -> Tuple[List[BatchItemResult], int]:
+        """Transform items, returning one result per input item and the number of unique items"""
+        unique_index: Dict[BatchItem, int] = {}
+        unique_items: List[BatchItem] = []
+        positions = []
+        for item in items:
+            if item not in unique_index:
+                unique_index[item] = len(unique_items)
+                unique_items.append(item)
+            positions.append(unique_index[item])
+
+        # Clients may lower the fan-out, never raise it past the server's limit
+        semaphore = asyncio.Semaphore(min(max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY))
+        units = self._plan(unique_items, pack)
+
+        async def run(unit: List[int]) -> List[BatchItemResult]:
+            if len(unit) == 1:
+                return [await self._transform_one(unique_items[unit[0]], semaphore)]
+            return await self._transform_pack([unique_items[index] for index in unit], semaphore)
+
+        unique_results: List[Optional[BatchItemResult]] = [None] * len(unique_items)
+        for unit, results in zip(units, await asyncio.gather(*(run(unit) for unit in units))):
+            for index, result in zip(unit, results):
+                unique_results[index] = result
+
+        logger.info(f"Batch transform: {len(items)} items, {len(unique_items)} unique, {len(units)} model calls planned")
+        return [unique_results[position] for position in positions], len(unique_items)
+
+# Global service instance
+batch_transform_service = BatchTransformService()
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Optional
+from app.core.config import settings
+from app.services.file_service import file_service
+from app.services.file_registry import file_registry
+from app.services.content_store import content_store
+from app.services.retrieval_service import retrieval_service
+from app.services.ingestion_service import ingestion_service
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Interrupted uploads leave ".<file_id><ext>.part" files behind
+STALE_PART_FILE_SECONDS = 3600
+
+class CleanupService:
+    """Removes uploads and everything derived from them, on demand or on a timer.
+
+    The periodic sweep drops uploads idle for longer than UPLOAD_TTL_SECONDS,
+    then the least recently used ones until the upload total fits within
+    UPLOAD_QUOTA_BYTES, and finally generated decks older than
+    PRESENTATION_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def _remove_blob(self, record: dict):
+        """Drop a blob nothing references any more, with its stored content and index"""
+        content_key = file_registry.content_key_for(record)
+        file_service.delete_file(record["stored_path"])
+        content_store.delete(content_key)
+        retrieval_service.remove_index(content_key)
+
+    def _release_upload(self, file_id: str) -> Optional[int]:
+        """Delete an upload's record; returns how many uploads still share its blob, or None if unknown"""
+        ingestion_service.jobs.pop(file_id, None)
+        return file_registry.release(file_id, self._remove_blob)
+
+    def delete_upload(self, file_id: str) -> bool:
+        """Delete an upload, and its file, stored content and index once no other upload shares them"""
+        return self._release_upload(file_id) is not None
+
+    def _remove_old_files(self, directory: str, max_age: float, predicate) -> int:
+        if not os.path.isdir(directory):
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for entry in os.scandir(directory):
+            if entry.is_file() and predicate(entry.name) and entry.stat().st_mtime < cutoff:
+                if file_service.delete_file(entry.path):
+                    removed += 1
+        return removed
+
+    def collect_garbage(self) -> dict:
+        """Run one sweep; returns how many items of each kind were removed"""
+        expired = 0
+        for record in file_registry.expired(settings.UPLOAD_TTL_SECONDS):
+            expired += self.delete_upload(record["file_id"])
+
+        over_quota = 0
+        total = file_registry.total_size()
+        if total > settings.UPLOAD_QUOTA_BYTES:
+            for record in file_registry.least_recently_used():
+                if total <= settings.UPLOAD_QUOTA_BYTES:
+                    break
+                remaining = self._release_upload(record["file_id"])
+                if remaining is not None:
+                    over_quota += 1
+                    # Only the last reference to a blob frees its bytes
+                    if remaining == 0:
+                        total -= record["size"]
+
+        presentations = self._remove_old_files(
+            os.path.join(settings.UPLOAD_DIR, "presentations"),
+            settings.PRESENTATION_TTL_SECONDS,
+            lambda name: name.endswith(".pptx"),
+        )
+        part_files = self._remove_old_files(
+            settings.UPLOAD_DIR, STALE_PART_FILE_SECONDS, lambda name: name.endswith(".part")
+        )
+
+        result = {
+            "expired_uploads": expired,
+            "over_quota_uploads": over_quota,
+            "presentations": presentations,
+            "part_files": part_files,
+        }
+        if any(result.values()):
+            logger.info(f"Garbage collection removed {result}")
+        return result
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.collect_garbage)
+            except Exception as e:
+                logger.error(f"Garbage collection failed: {str(e)}")
+            await asyncio.sleep(settings.GC_INTERVAL_SECONDS)
+
+    def start(self):
+        if self._task is None and settings.GC_INTERVAL_SECONDS > 0:
+            self._task = asyncio.create_task(self._run(), name="upload-gc")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+# Global service instance
+cleanup_service = CleanupService()
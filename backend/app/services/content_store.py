@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+from typing import Optional
+from cachetools import LRUCache, TTLCache
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.core.sqlite import ThreadLocalSQLite
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_contents (
+    file_id TEXT PRIMARY KEY,
+    content BLOB NOT NULL,
+    text_length INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_file_contents_last_access ON file_contents (last_access);
+"""
+
+# Reads refresh an entry's last_access at most this often
+TOUCH_INTERVAL_SECONDS = 60
+
+class ContentStore:
+    """Persistent store for extracted file text.
+
+    Text is zlib-compressed into an SQLite database in WAL mode, so any number
+    of uvicorn worker processes can read it concurrently while one writes.
+    A small per-process LRU (bounded by characters, not entries) keeps hot
+    documents decompressed. Entries are evicted once unused for max_age and,
+    once the stored total exceeds the configured size, least-recently-accessed
+    first. Reads served from memory still refresh last_access, at most once per
+    TOUCH_INTERVAL_SECONDS per entry.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        hot_size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[int] = None,
+    ):
+        self.path = path or settings.CONTENT_STORE_PATH or os.path.join(settings.DATA_DIR, "content_store.db")
+        self.max_bytes = max_bytes or settings.CONTENT_STORE_MAX_BYTES
+        self.max_age = max_age or settings.CONTENT_STORE_MAX_AGE_SECONDS
+        self.hot = LRUCache(maxsize=hot_size or settings.CONTENT_STORE_HOT_CHARS, getsizeof=len)
+        self._hot_lock = threading.Lock()
+        # Entries whose last_access was written recently; guarded by _hot_lock
+        self._touched = TTLCache(maxsize=10000, ttl=TOUCH_INTERVAL_SECONDS)
+        self._db = ThreadLocalSQLite(self.path, SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._db.connection()
+
+    def _cache_hot(self, file_id: str, text: str):
+        with self._hot_lock:
+            try:
+                self.hot[file_id] = text
+            except ValueError:
+                # Larger than the whole hot tier; serve it from disk only
+                pass
+
+    def put(self, file_id: str, text: str):
+        """Store (or replace) the extracted text for a file"""
+        content = zlib.compress(text.encode("utf-8"), settings.CONTENT_STORE_COMPRESSION_LEVEL)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO file_contents "
+                "(file_id, content, text_length, stored_size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (file_id, content, len(text), len(content), now, now),
+            )
+        self._cache_hot(file_id, text)
+        self.evict()
+
+    def get(self, file_id: str) -> Optional[str]:
+        """Return the stored text for a file, or None if it is unknown"""
+        with self._hot_lock:
+            text = self.hot.get(file_id)
+        record_cache_lookup("content_store_hot", hit=text is not None)
+        if text is not None:
+            self.touch(file_id)
+            return text
+
+        conn = self._connection()
+        row = conn.execute("SELECT content FROM file_contents WHERE file_id = ?", (file_id,)).fetchone()
+        if row is None:
+            return None
+
+        self.touch(file_id, force=True)
+        text = zlib.decompress(row[0]).decode("utf-8")
+        self._cache_hot(file_id, text)
+        return text
+
+    def touch(self, file_id: str, force: bool = False):
+        """Mark an entry as used so it is not evicted for age; rate-limited unless forced"""
+        with self._hot_lock:
+            if not force and file_id in self._touched:
+                return
+            self._touched[file_id] = True
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE file_contents SET last_access = ? WHERE file_id = ?", (time.time(), file_id))
+
+    def text_length(self, file_id: str) -> Optional[int]:
+        """Length of the stored text without decompressing it"""
+        row = self._connection().execute(
+            "SELECT text_length FROM file_contents WHERE file_id = ?", (file_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def exists(self, file_id: str) -> bool:
+        return self.text_length(file_id) is not None
+
+    def delete(self, file_id: str) -> bool:
+        with self._hot_lock:
+            self.hot.pop(file_id, None)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM file_contents WHERE file_id = ?", (file_id,))
+        return cursor.rowcount > 0
+
+    def evict(self) -> int:
+        """Drop entries unused for max_age, then least-recently-used ones over max_bytes"""
+        conn = self._connection()
+        removed = []
+        with conn:
+            cutoff = time.time() - self.max_age
+            removed += [row[0] for row in conn.execute(
+                "SELECT file_id FROM file_contents WHERE last_access < ?", (cutoff,)
+            )]
+            conn.execute("DELETE FROM file_contents WHERE last_access < ?", (cutoff,))
+
+            total = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM file_contents").fetchone()[0]
+            if total > self.max_bytes:
+                for file_id, stored_size in conn.execute(
+                    "SELECT file_id, stored_size FROM file_contents ORDER BY last_access"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM file_contents WHERE file_id = ?", (file_id,))
+                    removed.append(file_id)
+                    total -= stored_size
+
+        if removed:
+            with self._hot_lock:
+                for file_id in removed:
+                    self.hot.pop(file_id, None)
+            logger.info(f"Evicted {len(removed)} entries from content store")
+        return len(removed)
+
+    def stats(self) -> dict:
+        count, stored, original = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(stored_size), 0), COALESCE(SUM(text_length), 0) FROM file_contents"
+        ).fetchone()
+        return {
+            "entries": count,
+            "stored_bytes": stored,
+            "text_chars": original,
+            "hot_entries": len(self.hot),
+            "hot_chars": self.hot.currsize,
+        }
+
+# Global service instance
+content_store = ContentStore()
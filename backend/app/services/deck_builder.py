@@ -0,0 +1,158 @@
+import copy
+import re
+import logging
+from typing import Dict, Optional
+from lxml import etree
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml.ns import qn
+from pptx.parts.slide import NotesSlidePart, SlidePart
+from pptx.util import Inches
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# XML 1.0 forbids most control characters; model output occasionally contains them
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+TITLE_SLIDE_LAYOUT = 0
+BULLET_SLIDE_LAYOUT = 1
+
+def _paragraph_template(
+    size_pt: int,
+    color: str,
+    bold: bool = False,
+    align: Optional[str] = None,
+    space_after_pt: Optional[int] = None,
+) -> etree._Element:
+    """Build a styled <a:p><a:r><a:t/></a:r></a:p> once, to be deep-copied per paragraph"""
+    def run_properties(tag: str) -> etree._Element:
+        properties = etree.Element(qn(tag), sz=str(size_pt * 100))
+        if bold:
+            properties.set("b", "1")
+        fill = etree.SubElement(properties, qn("a:solidFill"))
+        etree.SubElement(fill, qn("a:srgbClr"), val=color)
+        return properties
+
+    paragraph = etree.Element(qn("a:p"))
+    paragraph_properties = etree.SubElement(paragraph, qn("a:pPr"))
+    if align:
+        paragraph_properties.set("algn", align)
+    if space_after_pt is not None:
+        space_after = etree.SubElement(paragraph_properties, qn("a:spcAft"))
+        etree.SubElement(space_after, qn("a:spcPts"), val=str(space_after_pt * 100))
+    paragraph_properties.append(run_properties("a:defRPr"))
+
+    run = etree.SubElement(paragraph, qn("a:r"))
+    run.append(run_properties("a:rPr"))
+    etree.SubElement(run, qn("a:t"))
+    return paragraph
+
+class DeckBuilder:
+    """Renders presentation_data dicts into python-pptx Presentations.
+
+    Everything that is identical across decks is done once at startup: the
+    default template is parsed, resized to 16:9 and given its notes master,
+    and one slide per layout plus one notes slide are created through
+    python-pptx to serve as prototypes. Each deck then starts from a deep
+    copy of the base, each slide and notes slide from a deep copy of its
+    prototype XML, and text is styled by copying pre-built paragraph XML
+    rather than by setting font properties one at a time.
+    """
+
+    def __init__(self):
+        base = Presentation()
+        base.slide_width = Inches(13.33)
+        base.slide_height = Inches(7.5)
+        # Creating the notes master is expensive; do it once in the base
+        base.notes_master
+        self._base = base
+
+        scratch = copy.deepcopy(base)
+        self._slide_prototypes = {}
+        for layout_index in (TITLE_SLIDE_LAYOUT, BULLET_SLIDE_LAYOUT):
+            slide = scratch.slides.add_slide(scratch.slide_layouts[layout_index])
+            self._slide_prototypes[layout_index] = copy.deepcopy(slide._element)
+        self._notes_prototype = copy.deepcopy(slide.notes_slide._element)
+
+        self._title_paragraph = _paragraph_template(44, "1F497D", bold=True, align="ctr")
+        self._subtitle_paragraph = _paragraph_template(20, "595959", align="ctr")
+        self._slide_title_paragraph = _paragraph_template(32, "1F497D", bold=True)
+        self._bullet_paragraph = _paragraph_template(18, "404040", space_after_pt=12)
+
+    @staticmethod
+    def _clean(text) -> str:
+        return INVALID_XML_CHARS.sub("", str(text))
+
+    def _fill(self, text_body: etree._Element, template: etree._Element, *texts):
+        """Replace a text body's paragraphs with styled copies of template"""
+        for paragraph in text_body.findall(qn("a:p")):
+            text_body.remove(paragraph)
+        for text in texts:
+            paragraph = copy.deepcopy(template)
+            paragraph.find(f"{qn('a:r')}/{qn('a:t')}").text = self._clean(text)
+            text_body.append(paragraph)
+
+    def _add_slide(self, prs: Presentation, layout_index: int):
+        """Append a slide cloned from the layout's prototype; returns (slide part, [txBody, ...])"""
+        presentation_part = prs.part
+        slide_id_list = presentation_part._element.get_or_add_sldIdLst()
+        slide_part = SlidePart(
+            PackURI(f"/ppt/slides/slide{len(slide_id_list) + 1}.xml"),
+            CT.PML_SLIDE,
+            presentation_part.package,
+            copy.deepcopy(self._slide_prototypes[layout_index]),
+        )
+        slide_part.relate_to(prs.slide_layouts[layout_index].part, RT.SLIDE_LAYOUT)
+        slide_id_list.add_sldId(presentation_part.relate_to(slide_part, RT.SLIDE))
+        return slide_part, list(slide_part._element.iter(qn("p:txBody")))
+
+    def _add_notes(self, prs: Presentation, slide_part: SlidePart, text: str):
+        # Notes slides are numbered like their slides; the base deck has none
+        notes_part = NotesSlidePart(
+            PackURI(slide_part.partname.replace("/slides/slide", "/notesSlides/notesSlide")),
+            CT.PML_NOTES_SLIDE,
+            slide_part.package,
+            copy.deepcopy(self._notes_prototype),
+        )
+        notes_part.relate_to(prs.part.notes_master_part, RT.NOTES_MASTER)
+        notes_part.relate_to(slide_part, RT.SLIDE)
+        slide_part.relate_to(notes_part, RT.NOTES_SLIDE)
+        notes_part.notes_slide.notes_text_frame.text = self._clean(text)
+
+    def new_presentation(self) -> Presentation:
+        return copy.deepcopy(self._base)
+
+    def add_title_slide(self, prs: Presentation, title: str, subtitle: str = "Generated by TextIQ"):
+        slide_part, (title_body, subtitle_body) = self._add_slide(prs, TITLE_SLIDE_LAYOUT)
+        self._fill(title_body, self._title_paragraph, title)
+        self._fill(subtitle_body, self._subtitle_paragraph, subtitle)
+        return slide_part.slide
+
+    def add_content_slide(self, prs: Presentation, slide_data: Dict):
+        slide_part, (title_body, content_body) = self._add_slide(prs, BULLET_SLIDE_LAYOUT)
+        self._fill(
+            title_body,
+            self._slide_title_paragraph,
+            slide_data.get("title", f"Slide {slide_data.get('slide_number', 1)}")
+        )
+        # An empty body keeps a single empty paragraph, as the schema requires one
+        self._fill(content_body, self._bullet_paragraph, *(slide_data.get("content") or [""]))
+
+        speaker_notes = slide_data.get("speaker_notes", "")
+        if speaker_notes:
+            self._add_notes(prs, slide_part, speaker_notes)
+        return slide_part.slide
+
+    def build(self, presentation_data: Dict) -> Presentation:
+        """Render a full deck: title slide followed by one slide per entry in "slides" """
+        prs = self.new_presentation()
+        self.add_title_slide(prs, presentation_data.get("title", "Generated Presentation"))
+        for slide_data in presentation_data.get("slides", []):
+            self.add_content_slide(prs, slide_data)
+        return prs
+
+# Global service instance
+deck_builder = DeckBuilder()
@@ -0,0 +1,157 @@
+import posixpath
+import zipfile
+import logging
+from typing import IO, Iterator, List, Optional, Tuple
+from lxml import etree
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+PACKAGE_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+REL_TYPE_PREFIX = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+
+P, T, TAB, BR, CR, TBL, TR, TC = (f"{{{W}}}{tag}" for tag in ("p", "t", "tab", "br", "cr", "tbl", "tr", "tc"))
+NO_BREAK_HYPHEN = f"{{{W}}}noBreakHyphen"
+FALLBACK = f"{{{MC}}}Fallback"
+EVENT_TAGS = (P, T, TAB, BR, CR, NO_BREAK_HYPHEN, TBL, TR, TC, FALLBACK)
+
+# Parts read after the body, in this order; headers and footers repeat per section
+SUPPLEMENTARY_PARTS = ("footnotes", "endnotes", "header", "footer")
+TABLE_CELL_SEPARATOR = " | "
+
+class _TableRow:
+    __slots__ = ("cells", "cell")
+
+    def __init__(self):
+        self.cells: List[str] = []
+        self.cell: Optional[List[str]] = None
+
+def _main_document_part(package: zipfile.ZipFile) -> str:
+    try:
+        rels = etree.fromstring(package.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(f"{{{PACKAGE_RELS}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+def _related_parts(package: zipfile.ZipFile, document_part: str) -> List[Tuple[str, str]]:
+    """(kind, part name) of the main document's footnotes, endnotes, headers and footers, in SUPPLEMENTARY_PARTS order"""
+    folder, name = posixpath.split(document_part)
+    try:
+        rels = etree.fromstring(package.read(posixpath.join(folder, "_rels", f"{name}.rels")))
+    except KeyError:
+        return []
+    parts = {kind: [] for kind in SUPPLEMENTARY_PARTS}
+    for rel in rels.iter(f"{{{PACKAGE_RELS}}}Relationship"):
+        kind = (rel.get("Type") or "")[len(REL_TYPE_PREFIX):]
+        if kind in parts and rel.get("TargetMode") != "External":
+            parts[kind].append(posixpath.normpath(posixpath.join(folder, rel.get("Target"))))
+    # header1.xml, header2.xml, ... rather than relationship id order
+    return [(kind, part) for kind in SUPPLEMENTARY_PARTS for part in sorted(parts[kind])]
+
+def iter_part_lines(stream: IO[bytes]) -> Iterator[str]:
+    """Lines of one WordprocessingML part in document order.
+
+    Each paragraph is a line and each table row is one line with its cells
+    joined by TABLE_CELL_SEPARATOR (a nested table's rows are folded into the
+    enclosing cell). Elements are cleared as soon as they have been read, so
+    memory stays flat however long the document is.
+    """
+    paragraphs: List[List[str]] = []
+    rows: List[_TableRow] = []
+    fallback_depth = 0
+
+    def emit(text: str) -> Optional[str]:
+        """Route finished text into the enclosing table cell, or return it as a line"""
+        if rows and rows[-1].cell is not None:
+            if text:
+                rows[-1].cell.append(text)
+            return None
+        return text
+
+    for event, element in etree.iterparse(stream, events=("start", "end"), tag=EVENT_TAGS, huge_tree=True):
+        tag = element.tag
+        if tag == FALLBACK:
+            # Alternate content repeats what its Choice branch already said (e.g. text boxes)
+            fallback_depth += 1 if event == "start" else -1
+            continue
+        if fallback_depth:
+            continue
+
+        if event == "start":
+            if tag == P:
+                paragraphs.append([])
+            elif tag == TR:
+                rows.append(_TableRow())
+            elif tag == TC and rows:
+                rows[-1].cell = []
+            continue
+
+        if tag == T:
+            if paragraphs and element.text:
+                paragraphs[-1].append(element.text)
+        elif tag == TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (BR, CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == NO_BREAK_HYPHEN:
+            if paragraphs:
+                paragraphs[-1].append("-")
+        elif tag == P:
+            line = emit("".join(paragraphs.pop()) if paragraphs else "")
+            if line is not None:
+                yield line
+        elif tag == TC:
+            if rows and rows[-1].cell is not None:
+                rows[-1].cells.append(" ".join(rows[-1].cell))
+                rows[-1].cell = None
+        elif tag == TR:
+            row = rows.pop() if rows else None
+            if row is not None and any(row.cells):
+                line = emit(TABLE_CELL_SEPARATOR.join(row.cells))
+                if line is not None:
+                    yield line
+
+        if tag in (P, TBL):
+            # Drop what has been read, including earlier siblings the tree still references
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+def iter_docx_lines(file_path: str) -> Iterator[str]:
+    """Lines of a .docx: the body, then footnotes, endnotes, headers and footers"""
+    with zipfile.ZipFile(file_path) as package:
+        document_part = _main_document_part(package)
+        with package.open(document_part) as stream:
+            yield from iter_part_lines(stream)
+
+        seen = set()
+        for kind, part in _related_parts(package, document_part):
+            try:
+                stream = package.open(part)
+            except KeyError:
+                logger.warning(f"DOCX relationship points to a missing part: {part}")
+                continue
+            with stream:
+                for line in iter_part_lines(stream):
+                    if not line.strip():
+                        continue
+                    if kind in ("header", "footer"):
+                        # Sections often repeat the same header or footer
+                        if line in seen:
+                            continue
+                        seen.add(line)
+                    yield line
+
+def extract_docx_text(file_path: str) -> str:
+    return "\n".join(iter_docx_lines(file_path)).strip()
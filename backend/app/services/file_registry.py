@@ -0,0 +1,196 @@
+import os
+import time
+import logging
+from typing import Callable, Collection, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.core.sqlite import ThreadLocalSQLite
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id TEXT PRIMARY KEY,
+    original_filename TEXT NOT NULL,
+    stored_path TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    extraction_status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_last_access ON files (last_access);
+CREATE INDEX IF NOT EXISTS idx_files_stored_path ON files (stored_path);
+"""
+
+COLUMNS = (
+    "file_id", "original_filename", "stored_path", "extension", "size",
+    "content_hash", "extraction_status", "error", "created_at", "last_access",
+)
+
+# Uses of a file refresh its last-access time at most this often, sparing a write per question
+TOUCH_INTERVAL_SECONDS = 60
+
+class FileRegistry:
+    """Metadata for every upload, looked up by file_id in O(1).
+
+    Backed by SQLite (WAL) so all worker processes share one view, including
+    the extraction status written by whichever worker ran the ingestion job.
+
+    Uploads are content-addressed: every file_id with the same bytes points at
+    one stored blob and shares its extraction status, stored text and Q&A
+    index. The rows referencing a blob are its reference count; register and
+    release take the database write lock, so a blob is never removed while
+    another upload is registering against it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.FILE_REGISTRY_PATH or os.path.join(settings.DATA_DIR, "file_registry.db")
+        self._db = ThreadLocalSQLite(self.path, SCHEMA)
+
+    @staticmethod
+    def content_key_for(record: dict) -> str:
+        """Key of the extracted text and Q&A index shared by every upload of a blob"""
+        return f"{record['content_hash']}{record['extension']}"
+
+    def register(
+        self,
+        file_id: str,
+        original_filename: str,
+        stored_path: str,
+        size: int,
+        content_hash: str,
+        extraction_status: str,
+        reuse_statuses: Collection[str] = (),
+    ) -> Tuple[dict, bool]:
+        """Record an upload; returns the record and whether it reuses an existing blob's status
+
+        If other uploads already reference stored_path with a status in
+        reuse_statuses, the new record takes that status instead of
+        extraction_status.
+        """
+        now = time.time()
+        record = {
+            "file_id": file_id,
+            "original_filename": original_filename,
+            "stored_path": stored_path,
+            "extension": os.path.splitext(stored_path)[1].lower(),
+            "size": size,
+            "content_hash": content_hash,
+            "extraction_status": extraction_status,
+            "error": None,
+            "created_at": now,
+            "last_access": now,
+        }
+        reused = False
+        conn = self._db.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if reuse_statuses:
+                existing = conn.execute(
+                    "SELECT extraction_status, error FROM files WHERE stored_path = ? ORDER BY last_access DESC LIMIT 1",
+                    (stored_path,),
+                ).fetchone()
+                if existing is not None and existing[0] in reuse_statuses:
+                    record["extraction_status"], record["error"] = existing
+                    reused = True
+            conn.execute(
+                f"INSERT OR REPLACE INTO files ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                tuple(record[column] for column in COLUMNS),
+            )
+        return record, reused
+
+    def get(self, file_id: str, touch: bool = True) -> Optional[dict]:
+        """Return the record for file_id, refreshing its last-access time"""
+        conn = self._db.connection()
+        row = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM files WHERE file_id = ?", (file_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(COLUMNS, row))
+        if touch:
+            record["last_access"] = time.time()
+            with conn:
+                conn.execute("UPDATE files SET last_access = ? WHERE file_id = ?", (record["last_access"], file_id))
+        return record
+
+    def content_key(self, file_id: str, touch: bool = True) -> str:
+        """Content key of an upload; ids that were never registered are their own key
+
+        Looking an upload up for use (Q&A, content reads) counts as access, so
+        files in use are not expired; last_access is written at most once per
+        TOUCH_INTERVAL_SECONDS.
+        """
+        conn = self._db.connection()
+        row = conn.execute(
+            "SELECT content_hash, extension, last_access FROM files WHERE file_id = ?", (file_id,)
+        ).fetchone()
+        if row is None:
+            return file_id
+        now = time.time()
+        if touch and now - row[2] >= TOUCH_INTERVAL_SECONDS:
+            with conn:
+                conn.execute("UPDATE files SET last_access = ? WHERE file_id = ?", (now, file_id))
+        return self.content_key_for({"content_hash": row[0], "extension": row[1]})
+
+    def set_blob_status(self, stored_path: str, extraction_status: str, error: Optional[str] = None):
+        """Update the status of every upload sharing a blob"""
+        conn = self._db.connection()
+        with conn:
+            conn.execute(
+                "UPDATE files SET extraction_status = ?, error = ? WHERE stored_path = ?",
+                (extraction_status, error, stored_path),
+            )
+
+    def release(self, file_id: str, on_last_reference: Callable[[dict], None]) -> Optional[int]:
+        """Delete an upload's record; returns how many uploads still share its blob, or None if unknown
+
+        on_last_reference(record) runs before the write lock is released when
+        no other upload references the blob, so it can remove the blob and what
+        was derived from it without racing a new upload of the same bytes.
+        """
+        conn = self._db.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM files WHERE file_id = ?", (file_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            record = dict(zip(COLUMNS, row))
+            conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+            remaining = conn.execute(
+                "SELECT COUNT(*) FROM files WHERE stored_path = ?", (record["stored_path"],)
+            ).fetchone()[0]
+            if remaining == 0:
+                on_last_reference(record)
+        return remaining
+
+    def expired(self, max_idle: float) -> List[dict]:
+        """Records not accessed within max_idle seconds"""
+        cutoff = time.time() - max_idle
+        rows = self._db.connection().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM files WHERE last_access < ?", (cutoff,)
+        ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def least_recently_used(self) -> Iterator[dict]:
+        rows = self._db.connection().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM files ORDER BY last_access"
+        ).fetchall()
+        for row in rows:
+            yield dict(zip(COLUMNS, row))
+
+    def total_size(self) -> int:
+        """Bytes of stored blobs, counting each shared blob once"""
+        return self._db.connection().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT stored_path, size FROM files)"
+        ).fetchone()[0]
+
+# Global service instance
+file_registry = FileRegistry()
@@ -1,24 +1,65 @@
 import os
+import time
 import uuid
+import threading
+import hashlib
+import multiprocessing
 import aiofiles
-from typing import Optional, Tuple
-import PyPDF2
-from docx import Document
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
 from fastapi import UploadFile
 import logging
 from app.core.config import settings
+from app.core.metrics import EXTRACTION_DURATION, size_bucket
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_FILE_SIZE while it is being written"""
+
+# Called with (pages_done, pages_total) while text is extracted
+ProgressCallback = Callable[[int, int], None]
+
+class ExtractedPage:
+    __slots__ = ("number", "total", "text", "seconds")
+    
+    def __init__(self, number: int, total: int, text: str, seconds: float):
+        self.number = number
+        self.total = total
+        self.text = text
+        self.seconds = seconds
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int) -> List[Tuple[int, str, float]]:
+    """Extract pages [start, stop) as (page_number, text, seconds); runs in pool workers"""
+    import PyPDF2
+    
+    pages = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for index in range(start, stop):
+            page_started = time.perf_counter()
+            text = pdf_reader.pages[index].extract_text() or ""
+            pages.append((index + 1, text, time.perf_counter() - page_started))
+    return pages
+
 class FileService:
     def __init__(self):
         self.upload_dir = settings.UPLOAD_DIR
         os.makedirs(self.upload_dir, exist_ok=True)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Ingestion threads may ask for the pool at the same time
+        self._process_pool_lock = threading.Lock()
     
-    async def save_uploaded_file(self, file: UploadFile) -> Tuple[str, str]:
-        """Save uploaded file and return file_id and file_path"""
+    async def save_uploaded_file(self, file: UploadFile) -> Tuple[str, str, int, str]:
+        """Stream an uploaded file to a staging path and return file_id, staged_path, size and SHA-256
+
+        The body is copied in UPLOAD_CHUNK_SIZE pieces and hashed in the same
+        pass, so memory use is bounded by the chunk size. The staged file is
+        moved to its content-addressed location by commit_upload once the
+        upload has been registered.
+        """
         try:
             # Generate unique file ID
             file_id = str(uuid.uuid4())
@@ -30,44 +71,149 @@ class FileService:
             if file_extension not in settings.SUPPORTED_FILE_TYPES:
                 raise ValueError(f"Unsupported file type: {file_extension}")
             
-            # Create file path
-            filename = f"{file_id}{file_extension}"
-            file_path = os.path.join(self.upload_dir, filename)
+            # Stream file to a temporary path, enforcing the size limit as we go
+            temp_path = os.path.join(self.upload_dir, f".{file_id}{file_extension}.part")
+            digest = hashlib.sha256()
+            file_size = 0
+            try:
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    while True:
+                        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        file_size += len(chunk)
+                        if file_size > settings.MAX_FILE_SIZE:
+                            raise FileTooLargeError(
+                                f"File too large. Maximum size is {settings.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
+                            )
+                        digest.update(chunk)
+                        await f.write(chunk)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
             
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
-            
-            logger.info(f"File saved: {filename}")
-            return file_id, file_path
+            logger.info(f"File staged: {file_id}{file_extension} ({file_size} bytes, sha256 {digest.hexdigest()[:12]})")
+            return file_id, temp_path, file_size, digest.hexdigest()
             
+        except FileTooLargeError:
+            raise
         except Exception as e:
             logger.error(f"Error saving file: {str(e)}")
             raise Exception(f"Failed to save file: {str(e)}")
     
-    def extract_text_from_pdf(self, file_path: str) -> str:
+    def blob_path(self, content_hash: str, extension: str) -> str:
+        """Where uploads with these bytes are stored; identical uploads share one file"""
+        return os.path.join(self.upload_dir, f"{content_hash}{extension}")
+    
+    def commit_upload(self, staged_path: str, stored_path: str):
+        """Move a staged upload into place, replacing an identical copy if one is already stored
+
+        A rename is atomic, so readers never see a partial file, and it also
+        restores the blob if the last upload sharing it was deleted meanwhile.
+        """
+        os.replace(staged_path, stored_path)
+    
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        workers = settings.PDF_EXTRACTION_PROCESSES or os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                # spawn, not fork: the parent runs threads (event loop, thread pools)
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+    
+    def shutdown(self):
+        """Stop the PDF extraction processes; the pool is created again on next use"""
+        with self._process_pool_lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def iter_pdf_pages(self, file_path: str) -> Iterator[ExtractedPage]:
+        """Yield a PDF's pages in order as their text becomes available
+
+        Small documents are read serially. From PDF_PARALLEL_MIN_PAGES pages on,
+        page ranges are fanned out across a process pool; results are still
+        yielded in page order, so consumers can start on the first pages while
+        later ranges are being extracted.
+        """
+        # PDF and DOCX libraries are imported on first use, keeping app startup fast
+        import PyPDF2
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            
+            pool = self._get_process_pool() if page_count >= settings.PDF_PARALLEL_MIN_PAGES else None
+            if pool is None:
+                # Serially, one page at a time, so progress and the preview start with page 1
+                for index, page in enumerate(pdf_reader.pages):
+                    page_started = time.perf_counter()
+                    text = page.extract_text() or ""
+                    yield ExtractedPage(index + 1, page_count, text, time.perf_counter() - page_started)
+                return
+        
+        batch_size = settings.PDF_PAGE_BATCH_SIZE
+        futures = [
+            pool.submit(_extract_pdf_page_range, file_path, start, min(start + batch_size, page_count))
+            for start in range(0, page_count, batch_size)
+        ]
+        try:
+            for future in futures:
+                for number, text, seconds in future.result():
+                    yield ExtractedPage(number, page_count, text, seconds)
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    def extract_text_from_pdf(self, file_path: str, progress: Optional[ProgressCallback] = None) -> str:
         """Extract text from PDF file"""
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
+            started = time.perf_counter()
+            texts = []
+            slowest = None
+            for page in self.iter_pdf_pages(file_path):
+                texts.append(page.text)
+                if slowest is None or page.seconds > slowest.seconds:
+                    slowest = page
+                if progress:
+                    progress(page.number, page.total)
+            
+            if slowest is not None:
+                logger.info(
+                    f"Extracted {slowest.total} PDF pages in {time.perf_counter() - started:.2f}s "
+                    f"(slowest: page {slowest.number}, {slowest.seconds * 1000:.0f}ms)"
+                )
+            return "\n".join(texts).strip()
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
     
     def extract_text_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file"""
+        """Extract text from DOCX file
+
+        The document XML is streamed straight out of the zip (see
+        docx_extractor), covering tables, footnotes, headers and footers.
+        Packages it cannot read fall back to python-docx, body paragraphs only.
+        """
         try:
+            from lxml import etree
+            from app.services.docx_extractor import extract_docx_text
+            
+            try:
+                return extract_docx_text(file_path)
+            except (KeyError, etree.XMLSyntaxError) as e:
+                logger.warning(f"Streaming DOCX extraction failed, falling back to python-docx: {str(e)}")
+            
+            from docx import Document
+            
             doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
             
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {str(e)}")
@@ -83,18 +229,53 @@ class FileService:
             logger.error(f"Error extracting text from TXT: {str(e)}")
             raise Exception(f"Failed to extract text from TXT: {str(e)}")
     
-    def extract_text(self, file_path: str) -> str:
-        """Extract text based on file extension"""
+    def extract_text(self, file_path: str, progress: Optional[ProgressCallback] = None) -> str:
+        """Extract text based on file extension
+
+        ``progress(done, total)`` is called as pages are processed (once at the
+        end for single-part formats); it may be invoked from a worker thread.
+        """
         file_extension = os.path.splitext(file_path)[1].lower()
         
         if file_extension == '.pdf':
-            return self.extract_text_from_pdf(file_path)
-        elif file_extension == '.docx':
+            with self.extraction_timer(file_path):
+                return self.extract_text_from_pdf(file_path, progress)
+        
+        with self.extraction_timer(file_path):
+            text = self._extract_single_part(file_path, file_extension)
+        
+        if progress:
+            progress(1, 1)
+        return text
+    
+    def _extract_single_part(self, file_path: str, file_extension: str) -> str:
+        if file_extension == '.docx':
             return self.extract_text_from_docx(file_path)
         elif file_extension == '.txt':
             return self.extract_text_from_txt(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_extension}")
+        raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    @staticmethod
+    def extraction_timer(file_path: str):
+        """Context manager recording extraction time by file type and size bucket"""
+        file_type = os.path.splitext(file_path)[1].lower().lstrip('.') or "unknown"
+        return EXTRACTION_DURATION.labels(file_type, size_bucket(os.path.getsize(file_path))).time()
+    
+    def iter_pages(self, file_path: str) -> Iterator[ExtractedPage]:
+        """Yield extracted text page by page (single-part formats yield one page)"""
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        if file_extension == '.pdf':
+            try:
+                yield from self.iter_pdf_pages(file_path)
+            except Exception as e:
+                logger.error(f"Error extracting text from PDF: {str(e)}")
+                raise Exception(f"Failed to extract text from PDF: {str(e)}")
+            return
+        
+        started = time.perf_counter()
+        text = self._extract_single_part(file_path, file_extension)
+        yield ExtractedPage(1, 1, text, time.perf_counter() - started)
     
     def get_file_info(self, file_path: str) -> dict:
         """Get file information"""
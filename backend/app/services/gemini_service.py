@@ -1,68 +1,576 @@
-import google.generativeai as genai
-from typing import Optional
+from typing import AsyncIterator, Callable, List, Optional, Tuple, TypeVar
+import asyncio
+import json
 import logging
+import os
 from app.core.config import settings
+from app.services.llm_client import LLMClient
+from app.services.llm_cache import LLMCache
+from app.services.json_stream import SlideStreamParser, loads_tolerant
+from app.services.resilience import UpstreamUnavailableError
+from app.services.retrieval_service import BM25Index, chunk_text
+from app.services.token_budget import (
+    TokenBudgetExceededError,
+    check_input_budget,
+    estimate_tokens,
+    input_budget,
+    trim_to_tokens,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TONE_PROMPTS = {
+    "formal": "Rewrite the following text in a formal, professional tone suitable for business communication:",
+    "casual": "Rewrite the following text in a casual, conversational tone that's friendly and approachable:",
+    "persuasive": "Rewrite the following text in a persuasive tone that convinces and motivates the reader:",
+    "academic": "Rewrite the following text in an academic tone suitable for scholarly writing:",
+    "friendly": "Rewrite the following text in a warm, friendly tone that builds rapport:"
+}
+
+# Called with (slides completed, slides total) as presentation slides are generated
+SlideProgressCallback = Callable[[int, int], None]
+
+# Called with (deck title, slide index, slide) as each slide is ready; slides may arrive out of order
+SlideCallback = Callable[[str, int, dict], None]
+
+T = TypeVar("T")
+
+def strip_code_fences(response_text: str) -> str:
+    """Remove a surrounding markdown code block (```json ... ```) if present"""
+    response_text = response_text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text[7:]
+    if response_text.startswith("```"):
+        response_text = response_text[3:]
+    if response_text.endswith("```"):
+        response_text = response_text[:-3]
+    return response_text.strip()
+
+def _clean_string(value) -> str:
+    if not isinstance(value, (str, int, float)):
+        raise ValueError(f"expected a string, got {type(value).__name__}")
+    return str(value).strip()
+
+def parse_outline(response_text: str, slide_count: int) -> dict:
+    """Validate an outline response: {"title": str, "slides": [{"title": str, "summary": str}]}"""
+    data = loads_tolerant(response_text)
+    if not isinstance(data, dict) or not isinstance(data.get("slides"), list):
+        raise ValueError("outline must be an object with a slides list")
+
+    slides = []
+    for entry in data["slides"][:slide_count]:
+        if not isinstance(entry, dict) or not _clean_string(entry.get("title", "")):
+            raise ValueError("every outline entry needs a title")
+        slides.append({
+            "title": _clean_string(entry["title"]),
+            "summary": _clean_string(entry.get("summary", "")),
+        })
+    if not slides:
+        raise ValueError("outline has no slides")
+
+    return {"title": _clean_string(data.get("title", "")), "slides": slides}
+
+def _validate_slide(data) -> dict:
+    if not isinstance(data, dict) or not isinstance(data.get("content"), list):
+        raise ValueError("slide must be an object with a content list")
+
+    content = [item for item in (_clean_string(item) for item in data["content"]) if item]
+    if not content:
+        raise ValueError("slide has no bullet points")
+
+    return {"content": content[:8], "speaker_notes": _clean_string(data.get("speaker_notes", ""))}
+
+def parse_slide(response_text: str) -> dict:
+    """Validate a slide response: {"content": [str, ...], "speaker_notes": str}"""
+    return _validate_slide(loads_tolerant(response_text))
+
+def parse_presentation_slide(entry, slide_number: int) -> dict:
+    """Validate one slide of a single-call presentation, numbering it slide_number"""
+    slide = _validate_slide(entry)
+    title = _clean_string(entry.get("title", "")) or f"Slide {slide_number}"
+    return {"slide_number": slide_number, "title": title, **slide}
+
+def parse_packed_answers(response_text: str, count: int) -> List[Optional[str]]:
+    """Answers from a multi-question response, matched by id (or by position for a plain list)"""
+    answers: List[Optional[str]] = [None] * count
+    try:
+        items = json.loads(strip_code_fences(response_text))
+    except json.JSONDecodeError:
+        return answers
+    if not isinstance(items, list):
+        return answers
+
+    for position, item in enumerate(items):
+        if isinstance(item, dict):
+            number, answer = item.get("id"), item.get("answer")
+            try:
+                index = int(number) - 1
+            except (TypeError, ValueError):
+                continue
+        else:
+            index, answer = position, item
+        if 0 <= index < count and isinstance(answer, str) and answer.strip():
+            answers[index] = answer.strip()
+    return answers
+
 class GeminiService:
-    def __init__(self):
+    """Gemini-backed text operations.
+
+    Construction is cheap: the model (and the google.generativeai import
+    behind it) and the LLM client are created on first use, so the app can
+    start without an API key; only Gemini-backed requests fail then.
+    """
+    
+    def __init__(self, model=None):
+        self._model = model
+        self._client: Optional[LLMClient] = None
+    
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._create_model()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+    
+    @property
+    def client(self) -> LLMClient:
+        if self._client is None:
+            self._client = LLMClient(self.model, cache=self._create_cache())
+        return self._client
+    
+    @client.setter
+    def client(self, client: LLMClient):
+        self._client = client
+    
+    @property
+    def is_initialized(self) -> bool:
+        return self._client is not None
+    
+    def check_available(self):
+        """Raise UpstreamUnavailableError while the circuit is open, e.g. before committing to a streamed response"""
+        if self.is_initialized:
+            self._client.breaker.check()
+    
+    def _create_model(self):
         if not settings.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY is required")
         
+        # Imported on demand: google.generativeai alone takes most of the app's import time
+        import google.generativeai as genai
+        
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        return genai.GenerativeModel(settings.GEMINI_MODEL)
+    
+    def _create_cache(self) -> Optional[LLMCache]:
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+        
+        disk_path = None
+        if settings.LLM_CACHE_DISK_ENABLED:
+            disk_path = settings.LLM_CACHE_DISK_PATH or os.path.join(settings.DATA_DIR, "llm_cache.db")
+        
+        return LLMCache(
+            model_name=settings.GEMINI_MODEL,
+            temperature=settings.TEMPERATURE,
+            disk_path=disk_path
+        )
+    
+    def _build_transform_prompt(self, text: str, tone: str, additional_instructions: Optional[str] = None) -> str:
+        base_prompt = TONE_PROMPTS.get(tone, TONE_PROMPTS["formal"])
+        
+        if additional_instructions:
+            return f"{base_prompt}\n\nAdditional instructions: {additional_instructions}\n\nText to transform:\n{text}"
+        return f"{base_prompt}\n\nText to transform:\n{text}"
+    
+    def _build_section_prompt(
+        self,
+        sections: List[str],
+        index: int,
+        tone: str,
+        additional_instructions: Optional[str] = None
+    ) -> str:
+        """Prompt for one section of a long document, with neighbouring text for continuity"""
+        base_prompt = TONE_PROMPTS.get(tone, TONE_PROMPTS["formal"])
+        instructions = f"\n\nAdditional instructions: {additional_instructions}" if additional_instructions else ""
+        context_chars = settings.LONG_TEXT_CONTEXT_CHARS
+        
+        continuity = ""
+        if index > 0:
+            continuity += f"\n\nPreceding text (for continuity only, do not rewrite it):\n...{sections[index - 1][-context_chars:]}"
+        if index < len(sections) - 1:
+            continuity += f"\n\nFollowing text (for continuity only, do not rewrite it):\n{sections[index + 1][:context_chars]}..."
+        
+        return f"""{base_prompt}{instructions}
+
+This is section {index + 1} of {len(sections)} of a longer document that is being rewritten section by section. Rewrite only the section below, keep its paragraph structure, and respond with the rewritten section only.{continuity}
+
+Text to transform:
+{sections[index]}"""
+    
+    def _section_tasks(self, text: str, tone: str, additional_instructions: Optional[str]) -> List[asyncio.Task]:
+        """Start concurrent rewrites of every section of a long text"""
+        sections = [chunk.text for chunk in chunk_text(text, settings.LONG_TEXT_CHUNK_CHARS)]
+        semaphore = asyncio.Semaphore(settings.LONG_TEXT_CONCURRENCY)
+        
+        async def rewrite(index: int) -> str:
+            async with semaphore:
+                prompt = self._build_section_prompt(sections, index, tone, additional_instructions)
+                return await self.client.generate(prompt, endpoint="transform_text")
+        
+        logger.info(f"Rewriting long text in {len(sections)} sections")
+        return [asyncio.create_task(rewrite(index)) for index in range(len(sections))]
+    
+    def is_long_text(self, text: str) -> bool:
+        return len(text) > settings.LONG_TEXT_THRESHOLD_CHARS
+    
+    async def transform_long_text(self, text: str, tone: str, additional_instructions: Optional[str] = None) -> str:
+        """Map-reduce transform: rewrite budget-sized sections concurrently and stitch them in order"""
+        tasks = self._section_tasks(text, tone, additional_instructions)
+        try:
+            return "\n\n".join(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _build_qa_prompt(self, context: str, question: str, history: str = "") -> str:
+        conversation = f"""
+
+Conversation so far (use it to interpret follow-up questions):
+{history}""" if history else ""
+        return f"""Based on the following context, please answer the question clearly and accurately.
+
+Context:
+{context}{conversation}
+
+Question: {question}
+
+Please provide a comprehensive answer based only on the information provided in the context. If the context doesn't contain enough information to answer the question, please state that clearly."""
     
     async def transform_text(self, text: str, tone: str, additional_instructions: Optional[str] = None) -> str:
         """Transform text to specified tone"""
         try:
-            tone_prompts = {
-                "formal": "Rewrite the following text in a formal, professional tone suitable for business communication:",
-                "casual": "Rewrite the following text in a casual, conversational tone that's friendly and approachable:",
-                "persuasive": "Rewrite the following text in a persuasive tone that convinces and motivates the reader:",
-                "academic": "Rewrite the following text in an academic tone suitable for scholarly writing:",
-                "friendly": "Rewrite the following text in a warm, friendly tone that builds rapport:"
-            }
+            if self.is_long_text(text):
+                return await self.transform_long_text(text, tone, additional_instructions)
+            
+            prompt = self._build_transform_prompt(text, tone, additional_instructions)
+            return await self.client.generate(prompt, endpoint="transform_text")
+            
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
+        except Exception as e:
+            logger.error(f"Error in text transformation: {str(e)}")
+            raise Exception(f"Failed to transform text: {str(e)}")
+    
+    async def transform_texts_packed(self, texts: List[str], tone: str, additional_instructions: Optional[str] = None) -> List[str]:
+        """Transform several short texts to the same tone in a single model call
+
+        Raises if the model does not return exactly one rewrite per input, so
+        callers can fall back to individual transform_text calls.
+        """
+        try:
+            base_prompt = TONE_PROMPTS.get(tone, TONE_PROMPTS["formal"]).replace("the following text", "each of the following texts")
+            instructions = f"\n\nAdditional instructions: {additional_instructions}" if additional_instructions else ""
+            prompt = f"""{base_prompt}{instructions}
+
+Rewrite every text independently. Respond with ONLY a JSON array of {len(texts)} strings containing the rewritten texts in the same order as the input, with no commentary.
+
+Texts to transform (JSON array):
+{json.dumps(texts, ensure_ascii=False)}"""
             
-            base_prompt = tone_prompts.get(tone, tone_prompts["formal"])
+            response_text = await self.client.generate(prompt, endpoint="transform_text")
+            results = json.loads(strip_code_fences(response_text))
             
-            if additional_instructions:
-                prompt = f"{base_prompt}\n\nAdditional instructions: {additional_instructions}\n\nText to transform:\n{text}"
-            else:
-                prompt = f"{base_prompt}\n\nText to transform:\n{text}"
+            if not isinstance(results, list) or len(results) != len(texts) or not all(isinstance(r, str) for r in results):
+                raise ValueError(f"expected a JSON array of {len(texts)} strings")
+            return [result.strip() for result in results]
             
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
+        except Exception as e:
+            logger.error(f"Error in packed text transformation: {str(e)}")
+            raise Exception(f"Failed to transform texts: {str(e)}")
+    
+    async def stream_transform_text(self, text: str, tone: str, additional_instructions: Optional[str] = None) -> AsyncIterator[str]:
+        """Transform text to specified tone, yielding output as it is generated
+
+        Long texts are rewritten section by section in parallel; each section
+        is yielded as soon as it and all sections before it are done.
+        """
+        try:
+            if self.is_long_text(text):
+                tasks = self._section_tasks(text, tone, additional_instructions)
+                try:
+                    for index, task in enumerate(tasks):
+                        yield ("\n\n" if index else "") + await task
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                return
             
+            prompt = self._build_transform_prompt(text, tone, additional_instructions)
+            async for fragment in self.client.stream(prompt, endpoint="transform_text"):
+                yield fragment
+            
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
         except Exception as e:
-            logger.error(f"Error in text transformation: {str(e)}")
+            logger.error(f"Error in streaming text transformation: {str(e)}")
             raise Exception(f"Failed to transform text: {str(e)}")
     
-    async def answer_question(self, context: str, question: str) -> str:
-        """Answer question based on provided context"""
+    def _fit_qa_context(self, context: str, question: str, history: str = "") -> str:
+        """Trim the context so the Q&A prompt fits the answer_question input budget"""
+        overhead = estimate_tokens(self._build_qa_prompt("", question, history))
+        trimmed = trim_to_tokens(context, input_budget("answer_question") - overhead)
+        if len(trimmed) < len(context):
+            logger.info(f"Trimmed Q&A context from {len(context)} to {len(trimmed)} characters to fit the token budget")
+        return trimmed
+    
+    async def answer_question(self, context: str, question: str, history: str = "") -> str:
+        """Answer question based on provided context and, in a conversation, its history"""
         try:
-            prompt = f"""Based on the following context, please answer the question clearly and accurately.
+            prompt = self._build_qa_prompt(self._fit_qa_context(context, question, history), question, history)
+            return await self.client.generate(prompt, endpoint="answer_question")
+            
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
+        except Exception as e:
+            logger.error(f"Error in Q&A: {str(e)}")
+            raise Exception(f"Failed to answer question: {str(e)}")
+    
+    def _build_qa_batch_prompt(self, context: str, questions: List[str]) -> str:
+        numbered = "\n".join(f"{number}. {question}" for number, question in enumerate(questions, 1))
+        return f"""Based on the following context, answer each of the {len(questions)} numbered questions clearly and accurately, using only the information provided in the context. If the context doesn't contain enough information to answer a question, state that clearly in its answer.
 
 Context:
 {context}
 
-Question: {question}
+Questions:
+{numbered}
 
-Please provide a comprehensive answer based only on the information provided in the context. If the context doesn't contain enough information to answer the question, please state that clearly."""
+Respond with ONLY a JSON array containing one object per question, in order, with no commentary:
+[{{"id": 1, "answer": "Answer to question 1"}}, {{"id": 2, "answer": "Answer to question 2"}}]"""
+    
+    async def answer_questions_packed(self, context: str, questions: List[str]) -> List[Optional[str]]:
+        """Answer several questions about one context in a single model call
 
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+        Returns one entry per question; questions the response does not
+        answer are None, so callers can ask them individually instead.
+        """
+        try:
+            overhead = estimate_tokens(self._build_qa_batch_prompt("", questions))
+            context = trim_to_tokens(context, input_budget("answer_question_batch") - overhead)
+            prompt = self._build_qa_batch_prompt(context, questions)
+            response_text = await self.client.generate(prompt, endpoint="answer_question_batch")
+            return parse_packed_answers(response_text, len(questions))
             
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
         except Exception as e:
-            logger.error(f"Error in Q&A: {str(e)}")
+            logger.error(f"Error in batch Q&A: {str(e)}")
+            raise Exception(f"Failed to answer questions: {str(e)}")
+    
+    async def summarize_conversation(self, summary: str, turns: List[Tuple[str, str]]) -> str:
+        """Fold question/answer turns into a conversation's running summary"""
+        try:
+            exchanges = "\n\n".join(f"Q: {question}\nA: {answer}" for question, answer in turns)
+            words = settings.QA_SESSION_SUMMARY_TOKENS * 3 // 4
+            prompt = f"""Update the running summary of a question-and-answer conversation about a document. Merge the earlier summary and the new exchanges into one summary of at most {words} words. Keep the facts, names and figures discussed and anything the user may refer back to.
+
+Earlier summary:
+{summary or "(none)"}
+
+New exchanges:
+{exchanges}
+
+Respond with only the updated summary."""
+            response_text = await self.client.generate(prompt, endpoint="summarize_conversation")
+            return trim_to_tokens(response_text.strip(), settings.QA_SESSION_SUMMARY_TOKENS)
+            
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {str(e)}")
+            raise Exception(f"Failed to summarize conversation: {str(e)}")
+    
+    async def stream_answer_question(self, context: str, question: str) -> AsyncIterator[str]:
+        """Answer question based on provided context, yielding output as it is generated"""
+        try:
+            prompt = self._build_qa_prompt(self._fit_qa_context(context, question), question)
+            async for fragment in self.client.stream(prompt, endpoint="answer_question"):
+                yield fragment
+            
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
+        except Exception as e:
+            logger.error(f"Error in streaming Q&A: {str(e)}")
             raise Exception(f"Failed to answer question: {str(e)}")
     
-    async def generate_presentation_content(self, text: str, title: Optional[str] = None, slide_count: int = 5) -> dict:
-        """Generate presentation content structure"""
+    async def _generate_validated(self, prompt: str, parse: Callable[[str], T], endpoint: str) -> T:
+        """Generate and parse a response, retrying bad or failed responses without the cache"""
+        attempts = max(1, settings.PRESENTATION_GENERATION_ATTEMPTS)
+        for attempt in range(attempts):
+            try:
+                response_text = await self.client.generate(prompt, endpoint=endpoint, refresh=attempt > 0)
+                return parse(response_text)
+            except UpstreamUnavailableError:
+                raise
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                logger.warning(f"Attempt {attempt + 1} of {attempts} failed, retrying: {str(e)}")
+    
+    def _build_outline_prompt(self, text: str, title: Optional[str], slide_count: int) -> str:
+        return f"""Plan a presentation with exactly {slide_count} slides for the following text. Do not write the slides yet, only the outline.
+
+Text to convert:
+{text}
+
+Please provide the output in the following JSON format:
+{{
+    "title": "Presentation Title",
+    "slides": [
+        {{
+            "title": "Slide Title",
+            "summary": "One sentence describing what this slide covers"
+        }}
+    ]
+}}
+
+Slides should follow a logical order and not overlap.
+
+{f'Use this title for the presentation: {title}' if title else 'Create an appropriate title based on the content.'}"""
+    
+    def _build_slide_prompt(self, outline: dict, index: int, context: str) -> str:
+        slide = outline["slides"][index]
+        plan = "\n".join(f"{number}. {entry['title']}" for number, entry in enumerate(outline["slides"], 1))
+        return f"""You are writing slide {index + 1} of the presentation "{outline['title']}".
+
+Full outline (for context; other slides are written separately, so avoid repeating their content):
+{plan}
+
+Slide {index + 1}: {slide['title']}
+This slide covers: {slide['summary'] or slide['title']}
+
+Source text:
+{context}
+
+Please provide the output in the following JSON format:
+{{
+    "content": ["Bullet point 1", "Bullet point 2", "Bullet point 3"],
+    "speaker_notes": "Detailed speaker notes for this slide"
+}}
+
+Use 3-5 bullet points with key information from the source text and comprehensive speaker notes."""
+    
+    async def _slide_contexts(self, text: str, outline: dict) -> List[str]:
+        """Source text for each slide; long texts only get the chunks most relevant to the slide"""
+        if not self.is_long_text(text):
+            return [text] * len(outline["slides"])
+        
+        def select() -> List[str]:
+            index = BM25Index(chunk_text(text))
+            return [
+                "\n\n".join(chunk.text for chunk in index.search(
+                    f"{slide['title']} {slide['summary']}", settings.PRESENTATION_SLIDE_CONTEXT_CHUNKS
+                ))
+                for slide in outline["slides"]
+            ]
+        
+        return await asyncio.to_thread(select)
+    
+    def check_transform_budget(self, text: str, tone: str, additional_instructions: Optional[str] = None) -> int:
+        """Estimated input tokens of a transform request; raises TokenBudgetExceededError if over budget"""
+        if self.is_long_text(text):
+            # Rewritten in sections that each fit the budget
+            return estimate_tokens(text)
+        return check_input_budget("transform_text", self._build_transform_prompt(text, tone, additional_instructions))
+    
+    def check_qa_budget(self, context: str, question: str) -> int:
+        """Estimated input tokens of a Q&A request; raises TokenBudgetExceededError if over budget"""
+        return check_input_budget("answer_question", self._build_qa_prompt(self._fit_qa_context(context, question), question))
+    
+    def check_presentation_budget(self, text: str, title: Optional[str] = None, slide_count: int = 5) -> int:
+        """Estimated input tokens of a presentation request; raises TokenBudgetExceededError if over budget"""
+        return check_input_budget("generate_presentation_content", self._build_outline_prompt(text, title, slide_count))
+    
+    async def _generate_presentation_two_phase(
+        self,
+        text: str,
+        title: Optional[str],
+        slide_count: int,
+        progress: Optional[SlideProgressCallback] = None,
+        on_slide: Optional[SlideCallback] = None
+    ) -> dict:
+        """Outline call first, then every slide concurrently; a slide that keeps failing is kept as its outline entry"""
+        outline = await self._generate_validated(
+            self._build_outline_prompt(text, title, slide_count),
+            lambda response_text: parse_outline(response_text, slide_count),
+            endpoint="generate_presentation_content"
+        )
+        outline["title"] = title or outline["title"] or "Generated Presentation"
+        total = len(outline["slides"])
+        if progress:
+            progress(0, total)
+        
+        contexts = await self._slide_contexts(text, outline)
+        semaphore = asyncio.Semaphore(settings.PRESENTATION_SLIDE_CONCURRENCY)
+        completed = 0
+        
+        async def generate_slide(index: int) -> dict:
+            nonlocal completed
+            entry = outline["slides"][index]
+            async with semaphore:
+                try:
+                    slide = await self._generate_validated(
+                        self._build_slide_prompt(outline, index, contexts[index]),
+                        parse_slide,
+                        endpoint="generate_presentation_content"
+                    )
+                except (TokenBudgetExceededError, UpstreamUnavailableError):
+                    # A deck of placeholders is no answer to an outage or an exhausted budget
+                    raise
+                except Exception as e:
+                    logger.warning(f"Slide {index + 1} could not be generated, using its outline entry: {str(e)}")
+                    slide = {"content": [entry["summary"] or entry["title"]], "speaker_notes": ""}
+            
+            slide = {"slide_number": index + 1, "title": entry["title"], **slide}
+            if on_slide:
+                on_slide(outline["title"], index, slide)
+            completed += 1
+            if progress:
+                progress(completed, total)
+            return slide
+        
+        tasks = [asyncio.create_task(generate_slide(index)) for index in range(total)]
         try:
-            prompt = f"""Convert the following text into a structured presentation with {slide_count} slides.
+            slides = await asyncio.gather(*tasks)
+        finally:
+            # Stop the remaining slides once one has failed the deck
+            for task in tasks:
+                task.cancel()
+        return {"title": outline["title"], "slides": list(slides)}
+    
+    async def _generate_presentation_single_call(
+        self,
+        text: str,
+        title: Optional[str] = None,
+        slide_count: int = 5,
+        progress: Optional[SlideProgressCallback] = None,
+        on_slide: Optional[SlideCallback] = None
+    ) -> dict:
+        """One call for the whole deck, parsed as it streams in.
+        
+        Each slide is validated and handed to on_slide as soon as its JSON
+        object is complete. Invalid slides are skipped and a truncated
+        response keeps the slides it has; only a response without any usable
+        slide is regenerated.
+        """
+        prompt = f"""Convert the following text into a structured presentation with {slide_count} slides.
 
 Text to convert:
 {text}
@@ -87,36 +595,109 @@ Make sure each slide has:
 
 {f'Use this title for the presentation: {title}' if title else 'Create an appropriate title based on the content.'}"""
 
-            response = self.model.generate_content(prompt)
+        attempts = max(1, settings.PRESENTATION_GENERATION_ATTEMPTS)
+        for attempt in range(attempts):
+            parser = SlideStreamParser()
+            slides: List[dict] = []
+            published = 0
             
-            # Try to extract JSON from response
-            response_text = response.text.strip()
+            def add(entry):
+                if len(slides) >= slide_count:
+                    return
+                try:
+                    slides.append(parse_presentation_slide(entry, len(slides) + 1))
+                except ValueError as e:
+                    logger.warning(f"Skipping invalid slide in presentation response: {str(e)}")
             
-            # Remove markdown code blocks if present
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
+            def publish(deck_title: Optional[str]):
+                # Slides can only be rendered once the title slide in front of them is known
+                nonlocal published
+                if not deck_title:
+                    return
+                while published < len(slides):
+                    if on_slide:
+                        on_slide(deck_title, published, slides[published])
+                    published += 1
+                    if progress:
+                        progress(published, slide_count)
+            
+            def header_title() -> str:
+                return (parser.title or "").strip()
+            
+            async for fragment in self.client.stream(
+                prompt, endpoint="generate_presentation_content", refresh=attempt > 0
+            ):
+                for _, entry in parser.feed(fragment):
+                    add(entry)
+                publish(title or header_title())
             
-            import json
             try:
-                return json.loads(response_text)
-            except json.JSONDecodeError:
-                # Fallback: create a simple structure
-                return {
-                    "title": title or "Generated Presentation",
-                    "slides": [
-                        {
-                            "slide_number": 1,
-                            "title": "Overview",
-                            "content": [text[:200] + "..." if len(text) > 200 else text],
-                            "speaker_notes": "This slide provides an overview of the main content."
-                        }
-                    ]
+                data = parser.close()
+            except ValueError:
+                data = {}
+            # Slides the stream didn't complete, e.g. a truncated last one
+            entries = data.get("slides")
+            for entry in entries[parser.slides_seen:] if isinstance(entries, list) else []:
+                add(entry)
+            if slides:
+                data_title = data.get("title") if isinstance(data.get("title"), str) else ""
+                deck_title = title or header_title() or data_title.strip() or "Generated Presentation"
+                publish(deck_title)
+                return {"title": deck_title, "slides": slides}
+            logger.warning(f"Attempt {attempt + 1} of {attempts} returned no usable slides")
+        
+        # Fallback: create a simple structure
+        return {
+            "title": title or "Generated Presentation",
+            "slides": [
+                {
+                    "slide_number": 1,
+                    "title": "Overview",
+                    "content": [text[:200] + "..." if len(text) > 200 else text],
+                    "speaker_notes": "This slide provides an overview of the main content."
                 }
+            ]
+        }
+    
+    async def generate_presentation_content(
+        self,
+        text: str,
+        title: Optional[str] = None,
+        slide_count: int = 5,
+        progress: Optional[SlideProgressCallback] = None,
+        on_slide: Optional[SlideCallback] = None
+    ) -> dict:
+        """Generate presentation content structure.
+        
+        Decks of PRESENTATION_TWO_PHASE_MIN_SLIDES or more are generated as an
+        outline followed by concurrent per-slide calls; smaller decks, and any
+        deck whose outline cannot be generated, use a single call. on_slide
+        receives slides as they are generated, so rendering can start early.
+        """
+        try:
+            # Reject oversized input up front rather than after an outline retry and fallback
+            self.check_presentation_budget(text, title, slide_count)
+            
+            min_slides = settings.PRESENTATION_TWO_PHASE_MIN_SLIDES
+            if min_slides and slide_count >= min_slides:
+                try:
+                    return await self._generate_presentation_two_phase(text, title, slide_count, progress, on_slide)
+                except (TokenBudgetExceededError, UpstreamUnavailableError):
+                    # A single call would hit the same outage or budget
+                    raise
+                except Exception as e:
+                    logger.warning(f"Two-phase generation failed, falling back to a single call: {str(e)}")
+            
+            presentation_data = await self._generate_presentation_single_call(
+                text, title, slide_count, progress, on_slide
+            )
+            if progress:
+                slides_total = len(presentation_data.get("slides", []))
+                progress(slides_total, slides_total)
+            return presentation_data
             
+        except (TokenBudgetExceededError, UpstreamUnavailableError):
+            raise
         except Exception as e:
             logger.error(f"Error in presentation generation: {str(e)}")
             raise Exception(f"Failed to generate presentation: {str(e)}")
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Dict, List, Optional
+from cachetools import TTLCache
+from app.core.config import settings
+from app.services.file_service import file_service
+from app.services.content_store import content_store
+from app.services.file_registry import file_registry
+from app.services.retrieval_service import retrieval_service
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Characters of extracted text exposed as a preview in the status endpoint
+PREVIEW_LENGTH = 1000
+
+class IngestionStatus:
+    QUEUED = "queued"
+    EXTRACTING = "extracting"
+    READY = "ready"
+    FAILED = "failed"
+
+class IngestionQueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept another upload"""
+
+class IngestionJob:
+    def __init__(self, file_id: str, file_path: str, filename: str, content_key: Optional[str] = None):
+        self.file_id = file_id
+        self.file_path = file_path
+        self.filename = filename
+        # Stored text and index are shared by every upload of the same bytes
+        self.content_key = content_key or file_id
+        self.status = IngestionStatus.QUEUED
+        self.pages_processed = 0
+        self.pages_total: Optional[int] = None
+        self.text_length: Optional[int] = None
+        self.preview: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    def update_progress(self, pages_processed: int, pages_total: int):
+        self.pages_processed = pages_processed
+        self.pages_total = pages_total
+        self.updated_at = time.time()
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        progress = None
+        if self.status == IngestionStatus.READY:
+            progress = 1.0
+        elif self.pages_total:
+            progress = self.pages_processed / self.pages_total
+
+        return {
+            "file_id": self.file_id,
+            "filename": self.filename,
+            "status": self.status,
+            "pages_processed": self.pages_processed,
+            "pages_total": self.pages_total,
+            "progress": progress,
+            "text_length": self.text_length,
+            "extracted_text": self.preview,
+            "error": self.error,
+        }
+
+class IngestionService:
+    """In-process background pipeline: extract -> store -> index.
+
+    Uploads are queued on a bounded asyncio queue and drained by a fixed pool
+    of worker tasks; the CPU-bound extraction itself runs in a thread so the
+    event loop stays responsive. Job state is kept for INGESTION_JOB_TTL_SECONDS
+    for the status endpoint. Queued and running jobs are also indexed by blob,
+    so a repeat upload of the same bytes can wait for the job already in
+    flight; that index lives and dies with the queue, so it never points at a
+    job lost in a restart.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.worker_count = workers or settings.INGESTION_WORKERS
+        self.queue_size = queue_size or settings.INGESTION_QUEUE_SIZE
+        self.jobs: TTLCache = TTLCache(maxsize=10000, ttl=settings.INGESTION_JOB_TTL_SECONDS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # file_path -> queued or running job for that blob
+        self._active: Dict[str, IngestionJob] = {}
+
+    def start(self):
+        """Spawn the worker pool on the running event loop (idempotent)"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"Started {self.worker_count} ingestion workers")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._active.clear()
+
+    def submit(self, file_id: str, file_path: str, filename: str, content_key: Optional[str] = None) -> IngestionJob:
+        """Queue a saved upload for processing"""
+        self.start()
+        job = IngestionJob(file_id, file_path, filename, content_key)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise IngestionQueueFullError("Ingestion queue is full, please retry shortly")
+        self.jobs[file_id] = job
+        self._active[file_path] = job
+        return job
+
+    def get_job(self, file_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(file_id)
+
+    def active_job(self, file_path: str) -> Optional[IngestionJob]:
+        """The job queued or running in this process for a stored blob, if any"""
+        return self._active.get(file_path)
+
+    async def reingest(self, file_id: str) -> Optional[IngestionJob]:
+        """Queue extraction again for a ready upload whose stored text has been evicted
+
+        Returns the job that will restore the text (possibly one already in
+        flight for the same blob), or None if the upload cannot be re-extracted.
+        """
+        record = await asyncio.to_thread(file_registry.get, file_id, False)
+        if (
+            record is None
+            or record["extraction_status"] != IngestionStatus.READY
+            or not os.path.exists(record["stored_path"])
+        ):
+            return None
+        job = self.active_job(record["stored_path"])
+        if job is None:
+            logger.info(f"Stored text of {file_id} was evicted, extracting it again")
+            job = self.submit(
+                file_id, record["stored_path"], record["original_filename"], file_registry.content_key_for(record)
+            )
+        return job
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error(f"Ingestion failed for {job.file_id}: {str(e)}")
+                job.set_status(IngestionStatus.FAILED, str(e))
+                # The blob may be shared; it goes once its last upload is deleted or expires
+                await asyncio.to_thread(file_registry.set_blob_status, job.file_path, IngestionStatus.FAILED, str(e))
+            finally:
+                if self._active.get(job.file_path) is job:
+                    del self._active[job.file_path]
+                self._queue.task_done()
+
+    def _extract(self, job: IngestionJob) -> str:
+        """Consume pages as they are produced, publishing progress and an early preview"""
+        texts = []
+        preview_length = 0
+        with file_service.extraction_timer(job.file_path):
+            for page in file_service.iter_pages(job.file_path):
+                texts.append(page.text)
+                if job.preview is None:
+                    preview_length += len(page.text)
+                    if preview_length >= PREVIEW_LENGTH:
+                        job.preview = "\n".join(texts).strip()[:PREVIEW_LENGTH] + "..."
+                job.update_progress(page.number, page.total)
+        return "\n".join(texts).strip()
+
+    async def _process(self, job: IngestionJob):
+        job.set_status(IngestionStatus.EXTRACTING)
+        await asyncio.to_thread(file_registry.set_blob_status, job.file_path, IngestionStatus.EXTRACTING)
+        text = await asyncio.to_thread(self._extract, job)
+
+        await asyncio.to_thread(content_store.put, job.content_key, text)
+        await asyncio.to_thread(retrieval_service.build_index, job.content_key, text)
+
+        job.text_length = len(text)
+        if job.preview is None:
+            job.preview = text
+        job.set_status(IngestionStatus.READY)
+        await asyncio.to_thread(file_registry.set_blob_status, job.file_path, IngestionStatus.READY)
+        logger.info(f"Ingested {job.filename} ({job.file_id}): {len(text)} characters")
+
+# Global service instance
+ingestion_service = IngestionService()
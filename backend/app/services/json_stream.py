@@ -0,0 +1,225 @@
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSERS = {"{": "}", "[": "]"}
+
+class _Container:
+    __slots__ = ("kind", "start", "key", "expect_key")
+
+    def __init__(self, kind: str, start: int, key: Optional[str]):
+        self.kind = kind
+        self.start = start
+        # Key this container is the value of, in its parent object
+        self.key = key
+        self.expect_key = kind == "{"
+
+class JSONScanner:
+    """Tracks the structure of a JSON document as its text arrives in fragments.
+
+    Model output is scanned once, character by character: text before the
+    first bracket (a code fence, a preamble sentence) is skipped, and after
+    every complete value the scanner remembers a "safe point" where the
+    document can be cut and closed, so a truncated response can still be
+    parsed up to its last complete value.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.root_start = -1
+        self.end: Optional[int] = None
+        self.stack: List[_Container] = []
+        # (position, closing brackets) such that text[root_start:position] + closing is complete
+        self.safe: Optional[Tuple[int, str]] = None
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+        self._key: Optional[str] = None
+
+    def _mark_safe(self, position: int):
+        self.safe = (position, "".join(CLOSERS[container.kind] for container in reversed(self.stack)))
+
+    def on_open(self, container: _Container):
+        """Hook for subclasses: a container just opened"""
+
+    def on_close(self, container: _Container, end: int):
+        """Hook for subclasses: a container just closed; its text is text[container.start:end]"""
+
+    def feed(self, fragment: str):
+        self.text += fragment
+        text = self.text
+        for pos in range(self._pos, len(text)):
+            if self.end is not None:
+                break
+            char = text[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        try:
+                            self._key = json.loads(text[self._string_start:pos + 1])
+                        except json.JSONDecodeError:
+                            self._key = None
+                    else:
+                        self._mark_safe(pos + 1)
+                continue
+
+            if self.root_start < 0:
+                if char in CLOSERS:
+                    self.root_start = pos
+                else:
+                    continue
+
+            parent = self.stack[-1] if self.stack else None
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+                self._string_is_key = parent is not None and parent.expect_key
+            elif char in CLOSERS:
+                container = _Container(char, pos, self._key if parent is not None and parent.kind == "{" else None)
+                self.stack.append(container)
+                self._mark_safe(pos + 1)
+                self.on_open(container)
+            elif char in "}]":
+                if parent is None or CLOSERS[parent.kind] != char:
+                    # Mismatched bracket: keep what was complete before it
+                    self.end = pos
+                    break
+                self.stack.pop()
+                self._mark_safe(pos + 1)
+                self.on_close(parent, pos + 1)
+                if not self.stack:
+                    self.end = pos + 1
+            elif char == ",":
+                self._mark_safe(pos)
+                if parent is not None and parent.kind == "{":
+                    parent.expect_key = True
+            elif char == ":":
+                if parent is not None:
+                    parent.expect_key = False
+        self._pos = len(text)
+
+    def document(self) -> str:
+        """The document text so far, cut at the last safe point and closed if it is incomplete"""
+        if self.root_start < 0:
+            return self.text
+        if self.end is not None:
+            return self.text[self.root_start:self.end]
+        if self.safe is None:
+            return self.text[self.root_start:]
+        position, closing = self.safe
+        return self.text[self.root_start:position] + closing
+
+def drop_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket, outside of strings"""
+    result = []
+    in_string = escape = False
+    pending_comma = None
+    for char in text:
+        if in_string:
+            result.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if pending_comma is not None:
+            if char.isspace():
+                pending_comma.append(char)
+                continue
+            if char not in "}]":
+                result.extend(pending_comma)
+            pending_comma = None
+        if char == ",":
+            pending_comma = [char]
+            continue
+        if char == '"':
+            in_string = True
+        result.append(char)
+    return "".join(result)
+
+def repair_json(text: str) -> str:
+    """Best-effort fix of model JSON: surrounding prose or fences, trailing commas, truncation"""
+    scanner = JSONScanner()
+    scanner.feed(text)
+    return drop_trailing_commas(scanner.document())
+
+def loads_tolerant(text: str) -> Any:
+    """json.loads, after repair_json if the text doesn't parse as it is"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(text))
+
+class SlideStreamParser(JSONScanner):
+    """Incrementally parse a presentation document: {"title": ..., "slides": [{...}, ...]}.
+
+    feed() returns the slide objects completed by each fragment, so they can
+    be rendered while the model is still writing the rest. A bare array of
+    slides is accepted too.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.title: Optional[str] = None
+        self.slides_seen = 0
+        self._slides: Optional[_Container] = None
+        self._completed: List[Tuple[int, dict]] = []
+
+    def on_open(self, container: _Container):
+        if self._slides is not None or container.kind != "[":
+            return
+        if len(self.stack) == 1:
+            self._slides = container
+        elif len(self.stack) == 2 and container.key == "slides":
+            self._slides = container
+            # Fields written before the slides (normally the title) are complete by now
+            try:
+                header = json.loads(drop_trailing_commas(self.text[self.root_start:container.start] + "[]}"))
+            except json.JSONDecodeError:
+                return
+            if isinstance(header.get("title"), str):
+                self.title = header["title"]
+
+    def on_close(self, container: _Container, end: int):
+        if container is self._slides:
+            self._slides = None
+            return
+        if self._slides is None or container.kind != "{" or self.stack[-1] is not self._slides:
+            return
+        index = self.slides_seen
+        self.slides_seen += 1
+        try:
+            slide = json.loads(drop_trailing_commas(self.text[container.start:end]))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping unparseable slide {index + 1}: {str(e)}")
+            return
+        self._completed.append((index, slide))
+
+    def feed(self, fragment: str) -> List[Tuple[int, dict]]:
+        """Scan a fragment; returns (position in the slides array, slide object) for each slide it completed"""
+        super().feed(fragment)
+        completed, self._completed = self._completed, []
+        return completed
+
+    def close(self) -> dict:
+        """The whole document, repaired; a truncated final slide is kept up to its last complete field"""
+        data = json.loads(drop_trailing_commas(self.document()))
+        if isinstance(data, list):
+            data = {"slides": data}
+        if not isinstance(data, dict):
+            raise ValueError("presentation must be a JSON object")
+        return data
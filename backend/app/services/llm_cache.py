@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from cachetools import TTLCache
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts LRU evictions and TTL expirations"""
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evictions = 0
+        self.expirations = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+class _LeaderCancelled(Exception):
+    """The call computing a coalesced key was cancelled; its waiters retry"""
+
+class DiskCacheTier:
+    """SQLite-backed persistent tier; survives restarts and is shared by workers"""
+
+    def __init__(self, path: str, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if time.time() - created_at > self.ttl:
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+class LLMCache:
+    """Content-addressed cache for model responses.
+
+    Keys are a SHA-256 of the model name, temperature and fully rendered
+    prompt. Lookups go memory (LRU + TTL) -> optional disk tier, and
+    concurrent misses on the same key share a single upstream call.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        temperature: float,
+        max_entries: Optional[int] = None,
+        ttl: Optional[int] = None,
+        disk_path: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.memory = _CountingTTLCache(
+            maxsize=max_entries or settings.LLM_CACHE_MAX_ENTRIES,
+            ttl=ttl or settings.LLM_CACHE_TTL_SECONDS,
+        )
+        self.disk = DiskCacheTier(disk_path, settings.LLM_CACHE_DISK_TTL_SECONDS) if disk_path else None
+
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def make_key(self, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (self.model_name, repr(self.temperature), prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look a key up in memory, then on disk (promoting disk hits)"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            record_cache_lookup("llm", hit=True)
+            return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory[key] = value
+                record_cache_lookup("llm", hit=True)
+                return value
+
+        self.misses += 1
+        record_cache_lookup("llm", hit=False)
+        return None
+
+    async def set(self, key: str, value: str):
+        self.memory[key] = value
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write LLM cache entry to disk: {str(e)}")
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached value for key, computing it at most once concurrently
+
+        Callers that find the key in flight wait for its leader. If the leader
+        is cancelled (client gone, sibling task cancelled, hedge lost), the
+        waiters are not: they start over and one of them computes the value.
+        """
+        while True:
+            value = await self.get(key)
+            if value is not None:
+                return value
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+            await self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": self.memory.evictions,
+            "expirations": self.memory.expirations,
+            "memory_entries": len(self.memory),
+            "memory_max_entries": self.memory.maxsize,
+            "disk_entries": self.disk.size() if self.disk is not None else None,
+        }
@@ -0,0 +1,380 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from app.core.config import settings
+from app.core.metrics import LLM_HEDGES, LLM_REQUEST_DURATION, LLM_REQUESTS, LLM_RETRIES
+from app.services.llm_cache import LLMCache
+from app.services.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    UpstreamTimeoutError,
+    backoff_delay,
+    is_retryable,
+)
+from app.services.token_budget import check_input_budget, estimate_tokens, output_budget, record_token_usage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LLMClient:
+    """Non-blocking, concurrency-limited wrapper around a generative model.
+
+    Every call first waits for a slot in its endpoint's semaphore and then for
+    a slot in the global semaphore, so one busy endpoint cannot starve the
+    others. When a cache is attached, hits are answered without taking a
+    slot at all. Prompts over their endpoint's input token budget are
+    rejected before reaching the model, and the endpoint's output budget is
+    passed as max_output_tokens. Models exposing ``generate_content_async`` are awaited directly;
+    anything else (e.g. a plain stub with only ``generate_content``) is run in
+    a dedicated thread pool sized to the global limit so the event loop is
+    never blocked.
+
+    Each attempt is bounded by its endpoint's timeout. Transient failures
+    (timeouts, throttling, 5xx) are retried with jittered exponential
+    backoff, slow calls can be hedged with a duplicate request, and a
+    circuit breaker fails calls fast while the upstream keeps failing.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_concurrency: Optional[int] = None,
+        endpoint_concurrency: Optional[Dict[str, int]] = None,
+        default_endpoint_concurrency: Optional[int] = None,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.model = model
+        self.cache = cache
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.endpoint_limits = dict(settings.LLM_ENDPOINT_CONCURRENCY)
+        if endpoint_concurrency:
+            self.endpoint_limits.update(endpoint_concurrency)
+        self.default_endpoint_concurrency = (
+            default_endpoint_concurrency or settings.LLM_DEFAULT_ENDPOINT_CONCURRENCY
+        )
+
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._endpoint_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._queued: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._completed: Dict[str, int] = {}
+        self._failed: Dict[str, int] = {}
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker()
+
+    def _endpoint_limit(self, endpoint: str) -> int:
+        return self.endpoint_limits.get(endpoint, self.default_endpoint_concurrency)
+
+    def _endpoint_semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        semaphore = self._endpoint_semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._endpoint_limit(endpoint))
+            self._endpoint_semaphores[endpoint] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str):
+        """Hold one endpoint slot and one global slot for the duration of a call"""
+        endpoint_semaphore = self._endpoint_semaphore(endpoint)
+        self._queued[endpoint] = self._queued.get(endpoint, 0) + 1
+        try:
+            await endpoint_semaphore.acquire()
+            try:
+                await self._global_semaphore.acquire()
+            except BaseException:
+                endpoint_semaphore.release()
+                raise
+        finally:
+            self._queued[endpoint] -= 1
+
+        self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+        started = time.perf_counter()
+        try:
+            yield
+            self._completed[endpoint] = self._completed.get(endpoint, 0) + 1
+            LLM_REQUESTS.labels(endpoint, "success").inc()
+        except asyncio.CancelledError:
+            # e.g. the losing side of a hedged request
+            LLM_REQUESTS.labels(endpoint, "cancelled").inc()
+            raise
+        except BaseException:
+            self._failed[endpoint] = self._failed.get(endpoint, 0) + 1
+            LLM_REQUESTS.labels(endpoint, "error").inc()
+            raise
+        finally:
+            LLM_REQUEST_DURATION.labels(endpoint).observe(time.perf_counter() - started)
+            self._in_flight[endpoint] -= 1
+            self._global_semaphore.release()
+            endpoint_semaphore.release()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="llm-client"
+            )
+        return self._executor
+
+    @staticmethod
+    def _generation_config(endpoint: str) -> dict:
+        return {"max_output_tokens": output_budget(endpoint), "temperature": settings.TEMPERATURE}
+
+    async def _call_model(self, prompt: str, endpoint: str):
+        generation_config = self._generation_config(endpoint)
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is not None:
+            return await generate_async(prompt, generation_config=generation_config)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            functools.partial(self.model.generate_content, prompt, generation_config=generation_config),
+        )
+
+    @staticmethod
+    def _timeout(endpoint: str) -> float:
+        return settings.LLM_ENDPOINT_TIMEOUTS.get(endpoint, settings.LLM_TIMEOUT_SECONDS)
+
+    async def _attempt(self, prompt: str, endpoint: str) -> str:
+        """One model call, holding a slot and bounded by the endpoint timeout"""
+        timeout = self._timeout(endpoint)
+        async with self.slot(endpoint):
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._call_model(prompt, endpoint), timeout)
+            except asyncio.TimeoutError:
+                raise UpstreamTimeoutError(f"Model call timed out after {timeout:g}s")
+            self.latency.observe(endpoint, time.perf_counter() - started)
+        return response.text.strip()
+
+    def _hedge_delay(self, endpoint: str) -> Optional[float]:
+        if not settings.LLM_HEDGE_ENABLED or self._queued.get(endpoint, 0):
+            # With requests already queued, a duplicate would only wait behind them
+            return None
+        latency = self.latency.percentile(endpoint, settings.LLM_HEDGE_PERCENTILE)
+        if latency is None:
+            return None
+        return max(latency, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    async def _hedged_attempt(self, prompt: str, endpoint: str) -> str:
+        """Attempt a call; if it outlasts the hedge delay, race a duplicate and keep the first success"""
+        delay = self._hedge_delay(endpoint)
+        if delay is None:
+            return await self._attempt(prompt, endpoint)
+
+        primary = asyncio.ensure_future(self._attempt(prompt, endpoint))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            hedge = asyncio.ensure_future(self._attempt(prompt, endpoint))
+            tasks.append(hedge)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        LLM_HEDGES.labels(endpoint, "hedge" if task is hedge else "primary").inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_uncached(self, prompt: str, endpoint: str, input_tokens: int) -> str:
+        max_retries = settings.LLM_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            self.breaker.before_call()
+            try:
+                text = await self._hedged_attempt(prompt, endpoint)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered; the request itself was rejected
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                LLM_RETRIES.labels(endpoint).inc()
+                logger.warning(f"{endpoint}: attempt {attempt + 1} failed ({str(e) or type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            record_token_usage(endpoint, input_tokens, estimate_tokens(text))
+            return text
+
+    async def generate(self, prompt: str, endpoint: str = "default", refresh: bool = False) -> str:
+        """Send a prompt to the model and return the stripped response text.
+
+        refresh skips the cache lookup and replaces any cached response, for
+        retrying after a cached answer turned out to be unusable.
+        """
+        input_tokens = check_input_budget(endpoint, prompt)
+        if self.cache is None:
+            return await self._generate_uncached(prompt, endpoint, input_tokens)
+        if refresh:
+            text = await self._generate_uncached(prompt, endpoint, input_tokens)
+            await self.cache.set(self.cache.make_key(prompt), text)
+            return text
+        return await self.cache.get_or_compute(
+            self.cache.make_key(prompt),
+            lambda: self._generate_uncached(prompt, endpoint, input_tokens),
+        )
+
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        # Chunks carrying no parts (e.g. a trailing safety-rating chunk) raise on .text
+        try:
+            return chunk.text or ""
+        except ValueError:
+            return ""
+
+    async def _iterate_in_thread(self, prompt: str, generation_config: dict) -> AsyncIterator[str]:
+        """Drive a synchronous streaming model from the thread pool
+
+        When the consumer stops early (disconnect, stall timeout, cancellation)
+        the producer stops pulling at the next chunk and closes the upstream
+        stream, instead of holding an executor thread until the model is done.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def produce():
+            chunks = None
+            try:
+                chunks = iter(self.model.generate_content(prompt, stream=True, generation_config=generation_config))
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, self._chunk_text(chunk))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                if stop.is_set() and hasattr(chunks, "close"):
+                    chunks.close()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        loop.run_in_executor(self._get_executor(), produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    async def _stream_attempt(self, prompt: str, endpoint: str) -> AsyncIterator[str]:
+        """Text fragments of one streaming call; each must arrive within the endpoint timeout"""
+        timeout = self._timeout(endpoint)
+        generation_config = self._generation_config(endpoint)
+        generate_async = getattr(self.model, "generate_content_async", None)
+        try:
+            if generate_async is not None:
+                response = await asyncio.wait_for(
+                    generate_async(prompt, stream=True, generation_config=generation_config), timeout
+                )
+                chunks = response.__aiter__()
+            else:
+                chunks = self._iterate_in_thread(prompt, generation_config).__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                    except StopAsyncIteration:
+                        return
+                    yield self._chunk_text(chunk) if generate_async is not None else chunk
+            finally:
+                # Release the upstream stream now rather than when the iterator is collected
+                if hasattr(chunks, "aclose"):
+                    await chunks.aclose()
+        except asyncio.TimeoutError:
+            raise UpstreamTimeoutError(f"Model stream stalled for more than {timeout:g}s")
+
+    async def stream(self, prompt: str, endpoint: str = "default", refresh: bool = False) -> AsyncIterator[str]:
+        """Yield response text fragments as the model produces them (refresh as for generate)"""
+        input_tokens = check_input_budget(endpoint, prompt)
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(prompt)
+            cached = None if refresh else await self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        fragments = []
+        max_retries = settings.LLM_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            self.breaker.before_call()
+            try:
+                async with self.slot(endpoint):
+                    async for text in self._stream_attempt(prompt, endpoint):
+                        if text:
+                            fragments.append(text)
+                            yield text
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                # Fragments already relayed can't be taken back, so only a stream that
+                # failed before producing anything is retried
+                if fragments or not retryable or attempt == max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                LLM_RETRIES.labels(endpoint).inc()
+                logger.warning(f"{endpoint}: stream attempt {attempt + 1} failed ({str(e) or type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Client went away (generator closed) or the request was cancelled
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            break
+
+        text = "".join(fragments).strip()
+        record_token_usage(endpoint, input_tokens, estimate_tokens(text))
+        # Only a fully consumed stream is a complete response worth caching
+        if key is not None:
+            await self.cache.set(key, text)
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth and in-flight counters"""
+        endpoints = {}
+        for endpoint in sorted(set(self._queued) | set(self._in_flight)):
+            endpoints[endpoint] = {
+                "limit": self._endpoint_limit(endpoint),
+                "queued": self._queued.get(endpoint, 0),
+                "in_flight": self._in_flight.get(endpoint, 0),
+                "completed": self._completed.get(endpoint, 0),
+                "failed": self._failed.get(endpoint, 0),
+            }
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queued": sum(self._queued.values()),
+            "in_flight": sum(self._in_flight.values()),
+            "endpoints": endpoints,
+            "circuit": self.breaker.state,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
@@ -0,0 +1,194 @@
+import asyncio
+import time
+import uuid
+import logging
+from typing import AsyncIterator, List, Optional
+from cachetools import TTLCache
+from app.core.config import settings
+from app.services.gemini_service import gemini_service
+from app.services.presentation_service import presentation_service
+from app.services.token_budget import TokenUsage, track_token_usage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PresentationJobStatus:
+    QUEUED = "queued"
+    OUTLINE = "outline"
+    SLIDES = "slides"
+    RENDERING = "rendering"
+    READY = "ready"
+    FAILED = "failed"
+
+TERMINAL_STATUSES = (PresentationJobStatus.READY, PresentationJobStatus.FAILED)
+
+class PresentationJobQueueFullError(Exception):
+    """Raised when the presentation job queue cannot accept another job"""
+
+class PresentationJob:
+    def __init__(self, text: str, title: Optional[str], slide_count: int):
+        self.job_id = uuid.uuid4().hex
+        self.text = text
+        self.title = title
+        self.slide_count = slide_count
+        self.status = PresentationJobStatus.QUEUED
+        self.slides_completed = 0
+        self.slides_total: Optional[int] = None
+        self.result_title: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.file_path: Optional[str] = None
+        self.rendered_slide_count: Optional[int] = None
+        self.error: Optional[str] = None
+        self.token_usage: Optional[TokenUsage] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._subscribers: List[asyncio.Queue] = []
+
+    def _publish(self):
+        self.updated_at = time.time()
+        # Each subscriber gets its own snapshot of every change, so no stage is skipped
+        state = self.to_dict()
+        for queue in self._subscribers:
+            queue.put_nowait(state)
+
+    def update_slides(self, completed: int, total: int):
+        self.slides_completed = completed
+        self.slides_total = total
+        self._publish()
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self._publish()
+
+    async def watch(self, keepalive: float) -> AsyncIterator[Optional[dict]]:
+        """Yield the current state, then every change until the job finishes.
+
+        Yields None when keepalive seconds pass without a change, so callers
+        can keep idle connections open through proxies.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            state = self.to_dict()
+            yield state
+            while state["status"] not in TERMINAL_STATUSES:
+                try:
+                    state = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield state
+        finally:
+            self._subscribers.remove(queue)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "slides_completed": self.slides_completed,
+            "slides_total": self.slides_total,
+            "title": self.result_title,
+            "filename": self.filename,
+            "file_path": self.file_path,
+            "slide_count": self.rendered_slide_count,
+            "input_tokens": self.token_usage.input_tokens if self.token_usage else None,
+            "output_tokens": self.token_usage.output_tokens if self.token_usage else None,
+            "error": self.error,
+        }
+
+class PresentationJobService:
+    """Background presentation generation: outline -> slides -> rendering.
+
+    Jobs are queued on a bounded asyncio queue and drained by a fixed number
+    of worker tasks, which bounds how many generations run at once. Progress
+    is published on the job object for polling and SSE subscribers, and job
+    state is kept for PRESENTATION_JOB_TTL_SECONDS.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.worker_count = workers or settings.PRESENTATION_JOB_WORKERS
+        self.queue_size = queue_size or settings.PRESENTATION_JOB_QUEUE_SIZE
+        self.jobs: TTLCache = TTLCache(maxsize=10000, ttl=settings.PRESENTATION_JOB_TTL_SECONDS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """Spawn the worker pool on the running event loop (idempotent)"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"presentation-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"Started {self.worker_count} presentation workers")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def submit(self, text: str, title: Optional[str], slide_count: int) -> PresentationJob:
+        """Queue a presentation for generation"""
+        self.start()
+        job = PresentationJob(text, title, slide_count)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise PresentationJobQueueFullError("Presentation queue is full, please retry shortly")
+        self.jobs[job.job_id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[PresentationJob]:
+        return self.jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error(f"Presentation job {job.job_id} failed: {str(e)}")
+                job.set_status(PresentationJobStatus.FAILED, str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: PresentationJob):
+        def on_slide_progress(completed: int, total: int):
+            if job.status != PresentationJobStatus.SLIDES:
+                job.set_status(PresentationJobStatus.SLIDES)
+            job.update_slides(completed, total)
+
+        job.set_status(PresentationJobStatus.OUTLINE)
+        streaming_deck = presentation_service.start_deck()
+        with track_token_usage() as job.token_usage:
+            presentation_data = await gemini_service.generate_presentation_content(
+                text=job.text,
+                title=job.title,
+                slide_count=job.slide_count,
+                progress=on_slide_progress,
+                on_slide=streaming_deck.add_slide
+            )
+
+        job.result_title = presentation_data.get("title", job.title or "Generated Presentation")
+
+        job.set_status(PresentationJobStatus.RENDERING)
+        deck = await streaming_deck.finish(
+            presentation_data, presentation_service.default_filename(job.title, presentation_data)
+        )
+
+        job.filename = deck.filename
+        job.file_path = deck.file_path
+        job.rendered_slide_count = deck.slide_count
+        job.set_status(PresentationJobStatus.READY)
+        logger.info(f"Presentation job {job.job_id} ready: {deck.filename}")
+
+# Global service instance
+presentation_job_service = PresentationJobService()
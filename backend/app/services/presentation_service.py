@@ -1,134 +1,250 @@
+import io
 import os
-import uuid
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor
+import re
+import json
+import asyncio
+import hashlib
+import threading
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from cachetools import TTLCache
 from app.core.config import settings
+from app.core.metrics import PPTX_RENDER_DURATION, record_cache_lookup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Deck filenames end in "_<deck_id>.pptx", so a download can be mapped back to its cache entry
+DECK_ID_LENGTH = 16
+DECK_FILENAME = re.compile(rf"_([0-9a-f]{{{DECK_ID_LENGTH}}})\.pptx$")
+UNSAFE_FILENAME_CHARS = re.compile(r"[^\w\-. ]")
+
+class RenderedDeck:
+    __slots__ = ("deck_id", "filename", "file_path", "content", "slide_count")
+
+    def __init__(self, deck_id: str, filename: str, file_path: str, content: bytes, slide_count: int):
+        self.deck_id = deck_id
+        self.filename = filename
+        self.file_path = file_path
+        self.content = content
+        self.slide_count = slide_count
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+class StreamingDeck:
+    """Renders slides into a deck while the rest of the deck is still being generated.
+
+    add_slide matches gemini_service's SlideCallback. Slides may arrive in
+    any order; each is rendered on a worker thread as soon as every slide
+    before it has been. finish() then only has to render what is left and
+    save, instead of the whole deck.
+    """
+
+    def __init__(self, service: "PresentationService"):
+        self._service = service
+        self._title: Optional[str] = None
+        self._slides: Dict[int, Dict] = {}
+        self._prs = None
+        self._rendered: List[Dict] = []
+        self._failed = False
+        self._lock = threading.Lock()
+        self._pending: List[asyncio.Future] = []
+
+    def add_slide(self, title: str, index: int, slide: Dict):
+        if not settings.PRESENTATION_STREAM_RENDERING:
+            return
+        if self._title is None:
+            self._title = title
+        self._slides[index] = slide
+        self._pending.append(asyncio.get_running_loop().run_in_executor(None, self._render_ready))
+
+    def _render_ready(self):
+        from app.services.deck_builder import deck_builder
+        
+        with self._lock:
+            if self._failed:
+                return
+            try:
+                if self._prs is None:
+                    self._prs = deck_builder.new_presentation()
+                    deck_builder.add_title_slide(self._prs, self._title)
+                while len(self._rendered) in self._slides:
+                    slide = self._slides[len(self._rendered)]
+                    deck_builder.add_content_slide(self._prs, slide)
+                    self._rendered.append(slide)
+            except Exception as e:
+                # finish() renders the whole deck from scratch instead
+                logger.warning(f"Could not render streamed slides: {str(e)}")
+                self._failed = True
+
+    def complete(self, presentation_data: Dict) -> Optional[Tuple[bytes, int]]:
+        """Render the remaining slides and save; None if the early slides don't match presentation_data"""
+        from app.services.deck_builder import deck_builder
+        
+        with self._lock:
+            if self._prs is None or self._failed:
+                return None
+            slides = presentation_data.get("slides", [])
+            if (
+                self._title != presentation_data.get("title", "Generated Presentation")
+                or slides[:len(self._rendered)] != self._rendered
+            ):
+                logger.warning("Streamed slides don't match the final presentation, rendering it again")
+                return None
+            with PPTX_RENDER_DURATION.time():
+                for slide in slides[len(self._rendered):]:
+                    deck_builder.add_content_slide(self._prs, slide)
+                buffer = io.BytesIO()
+                self._prs.save(buffer)
+            return buffer.getvalue(), len(self._prs.slides)
+
+    async def finish(self, presentation_data: Dict, filename: str = None) -> RenderedDeck:
+        """create_presentation, reusing the slides rendered so far"""
+        if self._pending:
+            await asyncio.gather(*self._pending)
+        return await asyncio.to_thread(self._service.create_presentation, presentation_data, filename, self)
+
 class PresentationService:
+    """Renders decks in memory and keeps them in a content-addressed cache.
+
+    A deck's id is a hash of its presentation_data, so regenerating identical
+    content skips rendering entirely. Rendered bytes are served from the
+    cache; writing them to UPLOAD_DIR/presentations as well is optional and
+    lets downloads survive cache eviction or land on another worker.
+    """
+
     def __init__(self):
         self.output_dir = os.path.join(settings.UPLOAD_DIR, "presentations")
         os.makedirs(self.output_dir, exist_ok=True)
-    
-    def create_presentation(self, presentation_data: Dict, filename: str = None) -> str:
+        # deck_id -> (content, slide_count), bounded by total rendered bytes
+        self.cache = TTLCache(
+            maxsize=settings.PRESENTATION_CACHE_MAX_BYTES,
+            ttl=settings.PRESENTATION_CACHE_TTL_SECONDS,
+            getsizeof=lambda entry: len(entry[0]),
+        )
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def deck_id(presentation_data: Dict) -> str:
+        canonical = json.dumps(presentation_data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:DECK_ID_LENGTH]
+
+    @staticmethod
+    def default_filename(title: Optional[str], presentation_data: Dict) -> str:
+        """Base filename from the requested title and the generated deck title"""
+        return f"{title or 'presentation'}_{presentation_data.get('title', 'generated').replace(' ', '_').lower()}"
+
+    @staticmethod
+    def _filename(filename: Optional[str], deck_id: str) -> str:
+        stem = filename or "presentation"
+        if stem.endswith('.pptx'):
+            stem = stem[:-len('.pptx')]
+        stem = UNSAFE_FILENAME_CHARS.sub("_", os.path.basename(stem)).strip() or "presentation"
+        return f"{stem}_{deck_id}.pptx"
+
+    def _render(self, presentation_data: Dict):
+        # python-pptx (and the deck builder's base presentation) load on the first render
+        from app.services.deck_builder import deck_builder
+        
+        with PPTX_RENDER_DURATION.time():
+            prs = deck_builder.build(presentation_data)
+            buffer = io.BytesIO()
+            prs.save(buffer)
+        return buffer.getvalue(), len(prs.slides)
+
+    def _persist(self, file_path: str, content: bytes):
+        if os.path.exists(file_path):
+            return
+        temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+
+    def start_deck(self) -> StreamingDeck:
+        """A deck to feed slides into as they are generated, finished with StreamingDeck.finish"""
+        return StreamingDeck(self)
+
+    def create_presentation(
+        self, presentation_data: Dict, filename: str = None, streaming_deck: Optional[StreamingDeck] = None
+    ) -> RenderedDeck:
         """Create PowerPoint presentation from structured data"""
         try:
-            # Create presentation
-            prs = Presentation()
-            
-            # Set slide size (16:9 aspect ratio)
-            prs.slide_width = Inches(13.33)
-            prs.slide_height = Inches(7.5)
-            
-            # Create title slide
-            title_slide_layout = prs.slide_layouts[0]  # Title slide layout
-            title_slide = prs.slides.add_slide(title_slide_layout)
-            
-            # Set title
-            title = title_slide.shapes.title
-            title.text = presentation_data.get("title", "Generated Presentation")
-            
-            # Style title
-            title_paragraph = title.text_frame.paragraphs[0]
-            title_paragraph.font.size = Pt(44)
-            title_paragraph.font.bold = True
-            title_paragraph.font.color.rgb = RGBColor(31, 73, 125)  # Dark blue
-            title_paragraph.alignment = PP_ALIGN.CENTER
-            
-            # Add subtitle if available
-            if title_slide.shapes.placeholders[1]:
-                subtitle = title_slide.shapes.placeholders[1]
-                subtitle.text = "Generated by TextIQ"
-                subtitle_paragraph = subtitle.text_frame.paragraphs[0]
-                subtitle_paragraph.font.size = Pt(20)
-                subtitle_paragraph.font.color.rgb = RGBColor(89, 89, 89)  # Gray
-                subtitle_paragraph.alignment = PP_ALIGN.CENTER
-            
-            # Create content slides
-            slides_data = presentation_data.get("slides", [])
-            
-            for slide_data in slides_data:
-                # Use bullet slide layout
-                bullet_slide_layout = prs.slide_layouts[1]
-                slide = prs.slides.add_slide(bullet_slide_layout)
-                
-                # Set slide title
-                slide_title = slide.shapes.title
-                slide_title.text = slide_data.get("title", f"Slide {slide_data.get('slide_number', 1)}")
-                
-                # Style slide title
-                title_paragraph = slide_title.text_frame.paragraphs[0]
-                title_paragraph.font.size = Pt(32)
-                title_paragraph.font.bold = True
-                title_paragraph.font.color.rgb = RGBColor(31, 73, 125)
-                
-                # Add content
-                content_placeholder = slide.shapes.placeholders[1]
-                text_frame = content_placeholder.text_frame
-                text_frame.clear()  # Clear default text
-                
-                content_items = slide_data.get("content", [])
-                
-                for i, item in enumerate(content_items):
-                    if i == 0:
-                        # First paragraph
-                        p = text_frame.paragraphs[0]
-                    else:
-                        # Add new paragraph
-                        p = text_frame.add_paragraph()
-                    
-                    p.text = item
-                    p.level = 0  # Main bullet point
-                    p.font.size = Pt(18)
-                    p.font.color.rgb = RGBColor(64, 64, 64)  # Dark gray
-                    p.space_after = Pt(12)
-                
-                # Add speaker notes if available
-                speaker_notes = slide_data.get("speaker_notes", "")
-                if speaker_notes:
-                    notes_slide = slide.notes_slide
-                    notes_text_frame = notes_slide.notes_text_frame
-                    notes_text_frame.text = speaker_notes
-            
-            # Generate filename if not provided
-            if not filename:
-                filename = f"presentation_{uuid.uuid4().hex[:8]}.pptx"
-            elif not filename.endswith('.pptx'):
-                filename += '.pptx'
-            
-            # Save presentation
+            deck_id = self.deck_id(presentation_data)
+            with self._cache_lock:
+                entry = self.cache.get(deck_id)
+            record_cache_lookup("presentation", hit=entry is not None)
+
+            if entry is None:
+                entry = streaming_deck.complete(presentation_data) if streaming_deck is not None else None
+                if entry is None:
+                    entry = self._render(presentation_data)
+                with self._cache_lock:
+                    try:
+                        self.cache[deck_id] = entry
+                    except ValueError:
+                        # Larger than the whole cache; serve it from disk only
+                        pass
+                logger.info(f"Presentation rendered: {deck_id} ({entry[1]} slides, {len(entry[0])} bytes)")
+            else:
+                logger.info(f"Presentation served from cache: {deck_id}")
+
+            filename = self._filename(filename, deck_id)
             file_path = os.path.join(self.output_dir, filename)
-            prs.save(file_path)
-            
-            logger.info(f"Presentation created: {filename}")
-            return file_path
-            
+            if settings.PRESENTATION_PERSIST_TO_DISK:
+                self._persist(file_path, entry[0])
+
+            return RenderedDeck(deck_id, filename, file_path, entry[0], entry[1])
+
         except Exception as e:
             logger.error(f"Error creating presentation: {str(e)}")
             raise Exception(f"Failed to create presentation: {str(e)}")
-    
+
+    def get_cached_deck(self, filename: str) -> Optional[RenderedDeck]:
+        """Look up a deck by its download filename without touching the disk"""
+        match = DECK_FILENAME.search(filename)
+        if not match:
+            return None
+        with self._cache_lock:
+            entry = self.cache.get(match.group(1))
+        if entry is None:
+            return None
+        return RenderedDeck(match.group(1), filename, os.path.join(self.output_dir, filename), entry[0], entry[1])
+
+    def get_file_path(self, filename: str) -> str:
+        """Path of a persisted deck, confined to the presentations directory"""
+        return os.path.join(self.output_dir, os.path.basename(filename))
+
     def get_presentation_info(self, file_path: str) -> Dict:
         """Get information about a presentation file"""
         try:
+            deck = self.get_cached_deck(os.path.basename(file_path))
+            if deck is not None:
+                return {
+                    "exists": True,
+                    "slide_count": deck.slide_count,
+                    "file_size": deck.size,
+                    "filename": deck.filename
+                }
+
             if not os.path.exists(file_path):
                 return {"exists": False}
+
+            from pptx import Presentation
             
             prs = Presentation(file_path)
-            
+
             return {
                 "exists": True,
                 "slide_count": len(prs.slides),
                 "file_size": os.path.getsize(file_path),
                 "filename": os.path.basename(file_path)
             }
-            
+
         except Exception as e:
             logger.error(f"Error getting presentation info: {str(e)}")
             return {"exists": False, "error": str(e)}
@@ -0,0 +1,167 @@
+import asyncio
+import time
+import uuid
+import logging
+from typing import List, Optional, Tuple
+from cachetools import TTLCache
+from app.core.config import settings
+from app.services.gemini_service import gemini_service
+from app.services.retrieval_service import BM25Index, chunk_text, retrieval_service
+from app.services.token_budget import estimate_tokens, track_token_usage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class QATurn:
+    __slots__ = ("question", "answer", "chunk_ids", "tokens")
+
+    def __init__(self, question: str, answer: str, chunk_ids: Optional[List[int]]):
+        self.question = question
+        self.answer = answer
+        self.chunk_ids = chunk_ids
+        self.tokens = estimate_tokens(self.format())
+
+    def format(self) -> str:
+        return f"Q: {self.question}\nA: {self.answer}"
+
+class QASession:
+    """One conversation about a document: its retrieval state and turn history.
+
+    Older turns are folded into ``summary``; ``summarized_turns`` counts the
+    leading turns it covers, the rest are kept verbatim.
+    """
+
+    def __init__(self, file_id: Optional[str], text: Optional[str], index: Optional[BM25Index]):
+        self.session_id = uuid.uuid4().hex
+        self.file_id = file_id
+        self.text = text
+        self.index = index
+        self.turns: List[QATurn] = []
+        self.summary = ""
+        self.summarized_turns = 0
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.compaction: Optional[asyncio.Task] = None
+        # Questions in one session are answered in order, each seeing the previous turns
+        self.lock = asyncio.Lock()
+
+    @property
+    def recent_turns(self) -> List[QATurn]:
+        return self.turns[self.summarized_turns:]
+
+    def recent_tokens(self) -> int:
+        return sum(turn.tokens for turn in self.recent_turns)
+
+    def history(self) -> str:
+        """Summary plus the newest verbatim turns, capped at twice the history budget
+
+        The cap only matters while a compaction is pending or after one failed.
+        """
+        budget = settings.QA_SESSION_HISTORY_TOKENS * 2
+        recent: List[str] = []
+        for turn in reversed(self.recent_turns):
+            if recent and turn.tokens > budget:
+                break
+            budget -= turn.tokens
+            recent.append(turn.format())
+        parts = [f"Summary of the earlier conversation: {self.summary}"] if self.summary else []
+        parts.extend(reversed(recent))
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "file_id": self.file_id,
+            "turn_count": len(self.turns),
+            "summarized_turns": self.summarized_turns,
+            "summary": self.summary or None,
+            "turns": [{"question": turn.question, "answer": turn.answer} for turn in self.recent_turns],
+        }
+
+class QASessionService:
+    """Server-side Q&A conversations with bounded prompt size.
+
+    Each session keeps its document's retrieval index, so follow-up questions
+    only send the chunks relevant to them. Once the verbatim history exceeds
+    QA_SESSION_HISTORY_TOKENS, all but the latest QA_SESSION_RECENT_TURNS
+    turns are summarized in the background, keeping each question's prompt
+    roughly constant in size however long the conversation runs.
+    """
+
+    def __init__(self):
+        self.sessions: TTLCache = TTLCache(
+            maxsize=settings.QA_SESSION_MAX_SESSIONS, ttl=settings.QA_SESSION_TTL_SECONDS
+        )
+
+    async def create_session(self, text: str = "", file_id: Optional[str] = None, index: Optional[BM25Index] = None) -> QASession:
+        """Start a conversation over an uploaded file's index or over a text blob"""
+        if index is None and len(text) > settings.QA_SESSION_FULL_CONTEXT_CHARS:
+            index = await asyncio.to_thread(lambda: BM25Index(chunk_text(text)))
+        session = QASession(file_id, None if index is not None else text, index)
+        self.sessions[session.session_id] = session
+        logger.info(f"Started Q&A session {session.session_id}")
+        return session
+
+    def get_session(self, session_id: str) -> Optional[QASession]:
+        session = self.sessions.get(session_id)
+        if session is not None:
+            # Reading refreshes the TTL, so active conversations don't expire
+            self.sessions[session_id] = session
+        return session
+
+    def delete_session(self, session_id: str) -> bool:
+        session = self.sessions.pop(session_id, None)
+        if session is not None and session.compaction is not None:
+            session.compaction.cancel()
+        return session is not None
+
+    def _context(self, session: QASession, question: str) -> Tuple[str, Optional[List[int]]]:
+        if session.index is None:
+            return session.text, None
+        # Follow-ups often lean on the previous question ("and in 2023?"), so it joins the query
+        query = f"{session.turns[-1].question} {question}" if session.turns else question
+        chunks = retrieval_service.retrieve(session.index, query)
+        return retrieval_service.format_context(chunks), [chunk.chunk_id for chunk in chunks]
+
+    async def ask(self, session: QASession, question: str) -> Tuple[QATurn, str]:
+        """Answer the next question and record the turn; returns it with the context used"""
+        async with session.lock:
+            context, chunk_ids = self._context(session, question)
+            answer = await gemini_service.answer_question(context, question, session.history())
+
+            turn = QATurn(question, answer, chunk_ids)
+            session.turns.append(turn)
+            session.updated_at = time.time()
+
+            if self._needs_compaction(session):
+                session.compaction = asyncio.create_task(self._compact(session))
+        return turn, context
+
+    def _needs_compaction(self, session: QASession) -> bool:
+        if session.compaction is not None and not session.compaction.done():
+            return False
+        return (
+            len(session.recent_turns) > settings.QA_SESSION_RECENT_TURNS
+            and session.recent_tokens() > settings.QA_SESSION_HISTORY_TOKENS
+        )
+
+    async def _compact(self, session: QASession):
+        """Fold all but the latest turns into the summary (turns added meanwhile stay verbatim)"""
+        upto = len(session.turns) - settings.QA_SESSION_RECENT_TURNS
+        turns = session.turns[session.summarized_turns:upto]
+        try:
+            # Tracked separately, so the tokens aren't billed to the question that triggered it
+            with track_token_usage():
+                summary = await gemini_service.summarize_conversation(
+                    session.summary, [(turn.question, turn.answer) for turn in turns]
+                )
+        except Exception as e:
+            logger.warning(f"Could not compact Q&A session {session.session_id}, keeping full history: {str(e)}")
+            return
+        session.summary = summary
+        session.summarized_turns = upto
+        logger.info(f"Compacted Q&A session {session.session_id}: {upto} turns summarized")
+
+# Global service instance
+qa_session_service = QASessionService()
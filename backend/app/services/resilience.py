@@ -0,0 +1,125 @@
+import random
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+from app.core.config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; google.api_core exceptions carry theirs as ``code``
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+class UpstreamTimeoutError(Exception):
+    """Raised when one model call takes longer than its endpoint's timeout"""
+
+class UpstreamUnavailableError(Exception):
+    """Raised without calling the model while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"The AI service is temporarily unavailable, please retry in {retry_after:.0f}s")
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient upstream failures (timeouts, throttling, 5xx) as opposed to bad requests"""
+    if isinstance(error, (UpstreamTimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(max, base * 2^attempt))"""
+    ceiling = min(settings.LLM_RETRY_MAX_DELAY_SECONDS, settings.LLM_RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+class CircuitState:
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+class CircuitBreaker:
+    """Stop calling an upstream that keeps failing.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls fail immediately with UpstreamUnavailableError. Once
+    ``reset_seconds`` have passed, a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_seconds: Optional[float] = None):
+        self.failure_threshold = failure_threshold or settings.LLM_CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = reset_seconds or settings.LLM_CIRCUIT_RESET_SECONDS
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(1.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def before_call(self):
+        """Raise if the call must not reach the upstream"""
+        if self.state == CircuitState.CLOSED:
+            return
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                raise UpstreamUnavailableError(self.retry_after())
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        # Half-open: one trial call at a time
+        if self._trial_in_flight:
+            raise UpstreamUnavailableError(1.0)
+        self._trial_in_flight = True
+
+    def check(self):
+        """Raise as before_call would while the circuit is open, without claiming the trial call"""
+        if self.state == CircuitState.OPEN and time.monotonic() - self.opened_at < self.reset_seconds:
+            raise UpstreamUnavailableError(self.retry_after())
+
+    def record_success(self):
+        if self.state != CircuitState.CLOSED:
+            logger.info("Circuit breaker closed: upstream calls are succeeding again")
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                logger.warning(f"Circuit breaker opened after {self.failures} consecutive upstream failures")
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """Forget a call that was cancelled before it succeeded or failed"""
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN
+
+class LatencyTracker:
+    """Recent successful call durations per endpoint, for picking hedge delays"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, endpoint: str, seconds: float):
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, endpoint: str, fraction: float) -> Optional[float]:
+        """None until enough samples have been seen"""
+        samples = self._samples.get(endpoint)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,180 @@
+import math
+import re
+import threading
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from cachetools import LRUCache
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.services.content_store import content_store
+from app.services.file_registry import file_registry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n|\f")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i in is it its of on or "
+    "that the this to was were what when where which who why will with".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with common stopwords removed"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class Chunk:
+    __slots__ = ("chunk_id", "text")
+
+    def __init__(self, chunk_id: int, text: str):
+        self.chunk_id = chunk_id
+        self.text = text
+
+def _split_long_paragraph(paragraph: str, chunk_size: int) -> List[str]:
+    """Break an oversized paragraph on sentence boundaries (hard-wrap as a last resort)"""
+    pieces = []
+    current = ""
+    for sentence in SENTENCE_SPLIT.split(paragraph):
+        while len(sentence) > chunk_size:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:chunk_size])
+            sentence = sentence[chunk_size:]
+        if current and len(current) + len(sentence) + 1 > chunk_size:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_text(text: str, chunk_size: Optional[int] = None) -> List[Chunk]:
+    """Split text into roughly chunk_size-character chunks along paragraph boundaries"""
+    chunk_size = chunk_size or settings.QA_CHUNK_SIZE
+    chunks: List[Chunk] = []
+    current: List[str] = []
+    current_length = 0
+
+    def flush():
+        nonlocal current, current_length
+        if current:
+            chunks.append(Chunk(len(chunks), "\n\n".join(current)))
+            current = []
+            current_length = 0
+
+    for paragraph in PARAGRAPH_SPLIT.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        pieces = [paragraph] if len(paragraph) <= chunk_size else _split_long_paragraph(paragraph, chunk_size)
+        for piece in pieces:
+            if current and current_length + len(piece) > chunk_size:
+                flush()
+            current.append(piece)
+            current_length += len(piece) + 2
+
+    flush()
+    return chunks
+
+class BM25Index:
+    """Okapi BM25 over a document's chunks, built once and queried many times"""
+
+    def __init__(self, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.chunk_lengths: List[int] = []
+
+        for chunk in chunks:
+            term_counts = Counter(tokenize(chunk.text))
+            self.chunk_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                self.postings.setdefault(term, []).append((chunk.chunk_id, count))
+
+        total = len(chunks)
+        self.average_length = sum(self.chunk_lengths) / total if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[Chunk]:
+        """Return the top_k best-matching chunks in document order"""
+        if len(self.chunks) <= top_k:
+            return list(self.chunks)
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for chunk_id, frequency in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.chunk_lengths[chunk_id] / (self.average_length or 1)
+                score = idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + score
+
+        if not scores:
+            # Nothing matched lexically; fall back to the start of the document
+            return self.chunks[:top_k]
+
+        best = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        return [self.chunks[chunk_id] for chunk_id in sorted(best)]
+
+class RetrievalService:
+    def __init__(self):
+        self.indexes: LRUCache = LRUCache(maxsize=settings.QA_INDEX_CACHE_SIZE)
+        # Indexes are built and looked up from asyncio.to_thread workers; LRUCache is not thread-safe
+        self._indexes_lock = threading.Lock()
+
+    def build_index(self, file_id: str, text: str) -> BM25Index:
+        """Chunk and index a document's text"""
+        index = BM25Index(chunk_text(text))
+        with self._indexes_lock:
+            self.indexes[file_id] = index
+        logger.info(f"Indexed file {file_id}: {len(index.chunks)} chunks")
+        return index
+
+    def get_index(self, file_id: str) -> Optional[BM25Index]:
+        with self._indexes_lock:
+            index = self.indexes.get(file_id)
+        record_cache_lookup("retrieval_index", hit=index is not None)
+        return index
+
+    def load_index(self, file_id: str) -> Optional[BM25Index]:
+        """Index of an uploaded file, rebuilt from the content store if this process has none"""
+        # Uploads of identical bytes share one index
+        content_key = file_registry.content_key(file_id)
+        index = self.get_index(content_key)
+        if index is not None:
+            # Served without reading the text; keep it from being evicted as unused
+            content_store.touch(content_key)
+        else:
+            # Stored by another worker, or evicted from this one's index cache
+            text = content_store.get(content_key)
+            if text is None:
+                return None
+            index = self.build_index(content_key, text)
+        return index
+
+    def remove_index(self, file_id: str):
+        with self._indexes_lock:
+            self.indexes.pop(file_id, None)
+
+    def retrieve(self, index: BM25Index, question: str, top_k: Optional[int] = None) -> List[Chunk]:
+        return index.search(question, top_k or settings.QA_TOP_K)
+
+    @staticmethod
+    def format_context(chunks: List[Chunk]) -> str:
+        """Render retrieved chunks as a labelled prompt context"""
+        return "\n\n".join(f"[Chunk {chunk.chunk_id}]\n{chunk.text}" for chunk in chunks)
+
+# Global service instance
+retrieval_service = RetrievalService()
@@ -0,0 +1,102 @@
+import math
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from app.core.config import settings
+from app.core.metrics import LLM_TOKENS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TokenBudgetExceededError(ValueError):
+    """Raised before a model call whose prompt exceeds its endpoint's input budget"""
+
+    def __init__(self, endpoint: str, tokens: int, budget: int):
+        self.endpoint = endpoint
+        self.tokens = tokens
+        self.budget = budget
+        super().__init__(
+            f"Input is too large: about {tokens} tokens, the limit for {endpoint} is {budget}"
+        )
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate.
+
+    ASCII text averages about TOKEN_ESTIMATE_CHARS_PER_TOKEN characters per
+    token; other scripts (CJK in particular) are closer to one token per
+    character, so non-ASCII characters are counted individually.
+    """
+    if not text:
+        return 0
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return math.ceil((len(text) - non_ascii) / settings.TOKEN_ESTIMATE_CHARS_PER_TOKEN) + non_ascii
+
+def input_budget(endpoint: str) -> int:
+    return settings.LLM_INPUT_TOKEN_BUDGETS.get(endpoint, settings.LLM_DEFAULT_INPUT_TOKEN_BUDGET)
+
+def output_budget(endpoint: str) -> int:
+    return settings.LLM_OUTPUT_TOKEN_BUDGETS.get(endpoint, settings.MAX_TOKENS)
+
+def check_input_budget(endpoint: str, prompt: str) -> int:
+    """Return the prompt's estimated tokens, raising if it exceeds the endpoint budget"""
+    tokens = estimate_tokens(prompt)
+    budget = input_budget(endpoint)
+    if tokens > budget:
+        raise TokenBudgetExceededError(endpoint, tokens, budget)
+    return tokens
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so that its estimate fits within max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+
+    # Shrink proportionally, then by 5% steps in case the estimate is uneven across the text
+    length = int(len(text) * max_tokens / tokens)
+    while length > 0 and estimate_tokens(text[:length]) > max_tokens:
+        length = int(length * 0.95)
+    cut = text.rfind(" ", 0, length)
+    return text[:cut if cut > length // 2 else length].rstrip()
+
+class TokenUsage:
+    """Estimated tokens sent to and received from the model by one request"""
+    __slots__ = ("input_tokens", "output_tokens", "calls")
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.calls = 0
+
+    def add(self, input_tokens: int, output_tokens: int):
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.calls += 1
+
+    def to_dict(self) -> dict:
+        return {"input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+
+# Tasks spawned inside a tracked request inherit the same (mutable) accumulator
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
+
+@contextmanager
+def track_token_usage() -> Iterator[TokenUsage]:
+    """Accumulate the estimated tokens of every model call made inside the block"""
+    usage = TokenUsage()
+    reset_token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(reset_token)
+
+def record_token_usage(endpoint: str, input_tokens: int, output_tokens: int):
+    """Log one model call and add it to the current request's usage, if tracked"""
+    logger.info(f"{endpoint}: ~{input_tokens} input tokens, ~{output_tokens} output tokens")
+    LLM_TOKENS.labels(endpoint, "input").inc(input_tokens)
+    LLM_TOKENS.labels(endpoint, "output").inc(output_tokens)
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add(input_tokens, output_tokens)
@@ -0,0 +1,125 @@
+"""Micro-benchmark: legacy python-pptx deck rendering vs DeckBuilder.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_deck_builder --slides 20 --iterations 30
+"""
+import argparse
+import io
+import statistics
+import time
+import tracemalloc
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.enum.text import PP_ALIGN
+from pptx.dml.color import RGBColor
+from app.services.deck_builder import DeckBuilder
+from benchmarks.common import write_results
+
+def sample_presentation(slide_count: int) -> dict:
+    return {
+        "title": "Quarterly Review",
+        "slides": [
+            {
+                "slide_number": number,
+                "title": f"Topic {number}",
+                "content": [f"Point {item} about topic {number} with some supporting detail" for item in range(5)],
+                "speaker_notes": f"Notes for slide {number}.",
+            }
+            for number in range(1, slide_count + 1)
+        ],
+    }
+
+def legacy_build(presentation_data: dict) -> Presentation:
+    """The original PresentationService.create_presentation rendering, kept for comparison"""
+    prs = Presentation()
+    prs.slide_width = Inches(13.33)
+    prs.slide_height = Inches(7.5)
+
+    title_slide = prs.slides.add_slide(prs.slide_layouts[0])
+    title = title_slide.shapes.title
+    title.text = presentation_data.get("title", "Generated Presentation")
+    title_paragraph = title.text_frame.paragraphs[0]
+    title_paragraph.font.size = Pt(44)
+    title_paragraph.font.bold = True
+    title_paragraph.font.color.rgb = RGBColor(31, 73, 125)
+    title_paragraph.alignment = PP_ALIGN.CENTER
+
+    subtitle = title_slide.shapes.placeholders[1]
+    subtitle.text = "Generated by TextIQ"
+    subtitle_paragraph = subtitle.text_frame.paragraphs[0]
+    subtitle_paragraph.font.size = Pt(20)
+    subtitle_paragraph.font.color.rgb = RGBColor(89, 89, 89)
+    subtitle_paragraph.alignment = PP_ALIGN.CENTER
+
+    for slide_data in presentation_data.get("slides", []):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide_title = slide.shapes.title
+        slide_title.text = slide_data.get("title", f"Slide {slide_data.get('slide_number', 1)}")
+        title_paragraph = slide_title.text_frame.paragraphs[0]
+        title_paragraph.font.size = Pt(32)
+        title_paragraph.font.bold = True
+        title_paragraph.font.color.rgb = RGBColor(31, 73, 125)
+
+        text_frame = slide.shapes.placeholders[1].text_frame
+        text_frame.clear()
+        for i, item in enumerate(slide_data.get("content", [])):
+            p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+            p.text = item
+            p.level = 0
+            p.font.size = Pt(18)
+            p.font.color.rgb = RGBColor(64, 64, 64)
+            p.space_after = Pt(12)
+
+        speaker_notes = slide_data.get("speaker_notes", "")
+        if speaker_notes:
+            slide.notes_slide.notes_text_frame.text = speaker_notes
+    return prs
+
+def measure(render, presentation_data: dict, iterations: int) -> dict:
+    """Time render + save to memory, then measure peak allocation of one run"""
+    render(presentation_data).save(io.BytesIO())  # warm-up
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        render(presentation_data).save(io.BytesIO())
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    render(presentation_data).save(io.BytesIO())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mean_ms": statistics.mean(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "peak_alloc_kb": peak / 1024,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    presentation_data = sample_presentation(args.slides)
+    builder = DeckBuilder()
+    results = {
+        "legacy": measure(legacy_build, presentation_data, args.iterations),
+        "deck_builder": measure(builder.build, presentation_data, args.iterations),
+    }
+
+    for name, result in results.items():
+        print(
+            f"{name:>12}: mean {result['mean_ms']:.1f} ms, median {result['median_ms']:.1f} ms, "
+            f"min {result['min_ms']:.1f} ms, peak alloc {result['peak_alloc_kb']:.0f} KiB"
+        )
+    speedup = results["legacy"]["median_ms"] / results["deck_builder"]["median_ms"]
+    print(f"speedup (median): {speedup:.2f}x")
+    write_results("deck_builder", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
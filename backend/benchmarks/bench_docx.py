@@ -0,0 +1,135 @@
+"""Micro-benchmark: streaming lxml DOCX extraction against the python-docx object model.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_docx --pages 10 100 1000 --iterations 3 --output results/docx.json
+
+Documents are generated directly as WordprocessingML: per page a heading,
+about 40 paragraphs and a small table. "python-docx" is the previous
+implementation (body paragraphs only, so it also reports fewer characters);
+"lxml" is FileService.extract_text_from_docx. Peak memory is measured in a
+fresh process per run, as the growth of peak RSS during one extraction
+(Linux only: it reads and resets VmHWM through /proc).
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+import zipfile
+from typing import Optional
+from xml.sax.saxutils import escape
+
+from benchmarks.bench_extraction import page_lines
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+def _paragraph(text: str) -> str:
+    return f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>"
+
+def make_large_docx(path: str, pages: int):
+    """A python-docx template whose document.xml is replaced by a generated body"""
+    from docx import Document
+
+    template = path + ".template"
+    Document().save(template)
+    body = []
+    for page in range(1, pages + 1):
+        body.append(_paragraph(f"Page {page}"))
+        body.extend(_paragraph(line) for line in page_lines(page))
+        rows = "".join(
+            "<w:tr>" + "".join(f"<w:tc>{_paragraph(f'Cell {page}.{row}.{column}')}</w:tc>" for column in range(4)) + "</w:tr>"
+            for row in range(3)
+        )
+        body.append(f"<w:tbl>{rows}</w:tbl>")
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:document xmlns:w="{W_NAMESPACE}"><w:body>'
+        + "".join(body)
+        + "<w:sectPr/></w:body></w:document>"
+    )
+
+    with zipfile.ZipFile(template) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = document.encode("utf-8") if item.filename == "word/document.xml" else source.read(item.filename)
+            target.writestr(item.filename, data)
+    os.remove(template)
+
+def extract_python_docx(file_path: str) -> str:
+    from docx import Document
+
+    doc = Document(file_path)
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
+
+def extract_lxml(file_path: str) -> str:
+    from app.services.file_service import file_service
+
+    return file_service.extract_text_from_docx(file_path)
+
+IMPLEMENTATIONS = {"python-docx": extract_python_docx, "lxml": extract_lxml}
+
+def _peak_rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    raise OSError("VmHWM not reported")
+
+def _peak_memory_child(name: str, file_path: str) -> int:
+    """Peak RSS growth in KB while extracting once, in a process that has only imported the libraries"""
+    import docx  # noqa: F401
+    import lxml.etree  # noqa: F401
+    from app.services import docx_extractor, file_service  # noqa: F401
+
+    logging.disable(logging.INFO)
+    # The peak carries over from the (larger) parent process; reset it to the current RSS
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = _peak_rss_kb()
+    IMPLEMENTATIONS[name](file_path)
+    return _peak_rss_kb() - before
+
+def peak_memory_mb(name: str, file_path: str) -> Optional[float]:
+    if not os.path.exists("/proc/self/clear_refs"):
+        return None
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_peak_memory_child, (name, file_path)) / 1024
+
+def measure(extract, file_path: str, iterations: int) -> dict:
+    extract(file_path)  # warm-up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        text = extract(file_path)
+        timings.append(time.perf_counter() - started)
+    result = summarize(timings)
+    result["file_bytes"] = os.path.getsize(file_path)
+    result["chars"] = len(text)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the per-process peak memory runs")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    workdir = isolate_environment()
+    logging.disable(logging.INFO)
+
+    results = {}
+    for pages in args.pages:
+        file_path = os.path.join(workdir, f"large_{pages}.docx")
+        make_large_docx(file_path, pages)
+        for name, extract in IMPLEMENTATIONS.items():
+            result = measure(extract, file_path, args.iterations)
+            if not args.no_memory:
+                result["peak_memory_mb"] = peak_memory_mb(name, file_path)
+            results[f"{pages}p/{name}"] = result
+
+    print_table(results, ["file_bytes", "chars", "p50_ms", "p95_ms", "peak_memory_mb"])
+    write_results("docx", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
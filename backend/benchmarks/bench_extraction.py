@@ -0,0 +1,104 @@
+"""Micro-benchmark: FileService text extraction on generated PDF, DOCX and TXT files.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_extraction --pages 1 10 50 200 --iterations 5 --output results/extraction.json
+
+Each size is a number of pages of about 40 lines; DOCX and TXT files carry
+the same text as the PDF of that size.
+"""
+import argparse
+import logging
+import os
+import time
+
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+
+LINES_PER_PAGE = 40
+
+def page_lines(page: int):
+    return [f"Page {page} line {line} lorem ipsum dolor sit amet consectetur adipiscing" for line in range(LINES_PER_PAGE)]
+
+def make_pdf(path: str, pages: int):
+    """Minimal multi-page PDF with one text stream per page (no extra dependencies)"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(pages))}] /Count {pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        body = "BT /F1 10 Tf 50 750 Td 12 TL " + " ".join(f"({line}) '" for line in page_lines(i + 1)) + " ET"
+        stream = body.encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+def make_docx(path: str, pages: int):
+    from docx import Document
+
+    doc = Document()
+    for page in range(1, pages + 1):
+        doc.add_heading(f"Page {page}", level=2)
+        for line in page_lines(page):
+            doc.add_paragraph(line)
+    doc.save(path)
+
+def make_txt(path: str, pages: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for page in range(1, pages + 1):
+            f.write("\n".join(page_lines(page)) + "\n")
+
+GENERATORS = {"pdf": make_pdf, "docx": make_docx, "txt": make_txt}
+
+def measure(extract, file_path: str, iterations: int) -> dict:
+    extract(file_path)  # warm-up (also starts the PDF process pool)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        text = extract(file_path)
+        timings.append(time.perf_counter() - started)
+    result = summarize(timings)
+    result["file_bytes"] = os.path.getsize(file_path)
+    result["chars"] = len(text)
+    result["mb_per_second"] = result["file_bytes"] / 1024 / 1024 / (result["p50_ms"] / 1000)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument("--pages", nargs="+", type=int, default=[1, 10, 50, 200])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    workdir = isolate_environment()
+    logging.disable(logging.INFO)
+    from app.services.file_service import file_service
+
+    results = {}
+    for file_format in args.formats:
+        for pages in args.pages:
+            file_path = os.path.join(workdir, f"sample_{pages}.{file_format}")
+            GENERATORS[file_format](file_path, pages)
+            results[f"{file_format}/{pages}p"] = measure(file_service.extract_text, file_path, args.iterations)
+
+    print_table(results, ["file_bytes", "p50_ms", "p95_ms", "mb_per_second"])
+    write_results("extraction", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
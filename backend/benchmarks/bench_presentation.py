@@ -0,0 +1,57 @@
+"""Micro-benchmark: PresentationService.create_presentation, cold and cached.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_presentation --slides 5 10 20 --iterations 20 --output results/presentation.json
+
+"cold" renders distinct decks (a cache miss every time); "cached" repeats the
+same deck, which is answered from the content-addressed cache.
+"""
+import argparse
+import logging
+import time
+
+from benchmarks.bench_deck_builder import sample_presentation
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+
+def measure(create, slide_count: int, iterations: int, distinct: bool) -> dict:
+    presentation_data = sample_presentation(slide_count)
+    # Warm-up; for the cached case this also puts the deck in the cache
+    create(presentation_data=presentation_data if not distinct else dict(presentation_data, title="warm-up"), filename="bench")
+
+    timings = []
+    for iteration in range(iterations):
+        data = dict(presentation_data, title=f"Deck {slide_count}-{iteration}") if distinct else presentation_data
+        started = time.perf_counter()
+        deck = create(presentation_data=data, filename="bench")
+        timings.append(time.perf_counter() - started)
+    result = summarize(timings)
+    result["deck_bytes"] = deck.size
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", nargs="+", type=int, default=[5, 10, 20])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--no-persist", action="store_true", help="keep decks in memory only")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    isolate_environment()
+    logging.disable(logging.INFO)
+    from app.core.config import settings
+    from app.services.presentation_service import presentation_service
+
+    settings.PRESENTATION_PERSIST_TO_DISK = not args.no_persist
+    results = {}
+    for slide_count in args.slides:
+        for mode, distinct in (("cold", True), ("cached", False)):
+            results[f"{slide_count} slides/{mode}"] = measure(
+                presentation_service.create_presentation, slide_count, args.iterations, distinct
+            )
+
+    print_table(results, ["deck_bytes", "p50_ms", "p95_ms", "p99_ms"])
+    write_results("presentation", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
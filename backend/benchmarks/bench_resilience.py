@@ -0,0 +1,149 @@
+"""Fault-injection benchmark: LLMClient timeouts, retries, hedging and circuit breaker.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_resilience --requests 400 --concurrency 8 --output results/resilience.json
+
+Three scenarios, each against the offline fake model with injected faults:
+
+- "hedging": a slow tail (``--slow-rate`` of calls take ``--slow-latency``
+  longer), with hedged requests off and on; compare p50/p99.
+- "retries": ``--failure-rate`` of calls fail with a 503, with retries off
+  and on; compare the success rate.
+- "circuit": the upstream fails every call, then recovers; reports how
+  fast calls fail once the circuit is open and how long recovery takes.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+from benchmarks.fake_gemini import FakeGeminiModel
+
+ENDPOINT = "transform_text"
+
+async def run_calls(client, requests: int, concurrency: int) -> dict:
+    """Send requests prompts through the client; latency summary of successes plus the success rate"""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    failures = 0
+
+    async def one(number: int):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.generate(f"Benchmark prompt {number}", endpoint=ENDPOINT)
+            except Exception:
+                failures += 1
+                return
+            timings.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(number) for number in range(requests)))
+    result = summarize(timings)
+    result["success_rate"] = (requests - failures) / requests
+    return result
+
+async def hedging(args, settings, LLMClient) -> dict:
+    results = {}
+    for enabled in (False, True):
+        settings.LLM_HEDGE_ENABLED = enabled
+        model = FakeGeminiModel(
+            latency=args.latency, jitter=args.latency / 4, seed=1,
+            slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+        )
+        client = LLMClient(model)
+        # Warm-up, so the client has latency samples to pick a hedge delay from
+        await run_calls(client, 50, args.concurrency)
+        model.calls = 0
+        result = await run_calls(client, args.requests, args.concurrency)
+        result["model_calls"] = model.calls
+        results[f"hedging/{'on' if enabled else 'off'}"] = result
+    settings.LLM_HEDGE_ENABLED = False
+    return results
+
+async def retries(args, settings, LLMClient) -> dict:
+    results = {}
+    max_retries = settings.LLM_MAX_RETRIES
+    # Never let the breaker open here; it is measured on its own below
+    settings.LLM_CIRCUIT_FAILURE_THRESHOLD = args.requests * 10
+    for retries_allowed in (0, max_retries):
+        settings.LLM_MAX_RETRIES = retries_allowed
+        model = FakeGeminiModel(latency=args.latency, jitter=args.latency / 4, seed=2, failure_rate=args.failure_rate)
+        result = await run_calls(LLMClient(model), args.requests, args.concurrency)
+        result["model_calls"] = model.calls
+        results[f"retries/{retries_allowed}"] = result
+    settings.LLM_MAX_RETRIES = max_retries
+    return results
+
+async def circuit(args, settings, LLMClient) -> dict:
+    settings.LLM_MAX_RETRIES = 0
+    settings.LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+    settings.LLM_CIRCUIT_RESET_SECONDS = args.reset_seconds
+    model = FakeGeminiModel(latency=args.latency, jitter=0, seed=3, failure_rate=1.0)
+    client = LLMClient(model)
+
+    # Failing upstream: the first calls pay the full latency, the rest fail fast
+    outage = await run_calls(client, args.requests, 1)
+    failing = {"model_calls": model.calls, "circuit": client.breaker.state}
+    fast = []
+    for number in range(50):
+        started = time.perf_counter()
+        try:
+            await client.generate(f"Fail fast {number}", endpoint=ENDPOINT)
+        except Exception:
+            pass
+        fast.append(time.perf_counter() - started)
+    failing.update({f"fail_fast_{key}": value for key, value in summarize(fast).items() if key != "count"})
+    failing["success_rate"] = outage["success_rate"]
+
+    # Upstream recovers: measure until the first call succeeds again
+    model.failure_rate = 0.0
+    started = time.perf_counter()
+    while True:
+        try:
+            await client.generate("Recovery probe", endpoint=ENDPOINT)
+            break
+        except Exception:
+            await asyncio.sleep(0.05)
+    recovery = {"recovery_ms": (time.perf_counter() - started) * 1000, "circuit": client.breaker.state}
+    return {"circuit/outage": failing, "circuit/recovery": recovery}
+
+async def run(args) -> dict:
+    from app.core.config import settings
+    from app.services.llm_client import LLMClient
+
+    settings.LLM_RETRY_BASE_DELAY_SECONDS = args.retry_delay
+    settings.LLM_HEDGE_MIN_DELAY_SECONDS = 0.0
+    results = {}
+    results.update(await hedging(args, settings, LLMClient))
+    results.update(await retries(args, settings, LLMClient))
+    results.update(await circuit(args, settings, LLMClient))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="base model latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.03, help="fraction of calls in the slow tail")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="extra seconds for slow calls")
+    parser.add_argument("--failure-rate", type=float, default=0.2, help="fraction of calls failing with a 503")
+    parser.add_argument("--retry-delay", type=float, default=0.05, help="base retry backoff in seconds")
+    parser.add_argument("--reset-seconds", type=float, default=1.0, help="circuit breaker reset timeout")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    isolate_environment()
+    logging.disable(logging.WARNING)
+    results = asyncio.run(run(args))
+
+    print_table(
+        results,
+        ["success_rate", "model_calls", "p50_ms", "p99_ms", "fail_fast_p50_ms", "recovery_ms", "circuit"],
+    )
+    write_results("resilience", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
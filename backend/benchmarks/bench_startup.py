@@ -0,0 +1,70 @@
+"""Startup benchmark: time to import the app in a fresh interpreter.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup --iterations 10 --output results/startup.json
+
+Each iteration starts a new Python process that imports ``main`` and runs
+the startup hook, so the numbers reflect a worker's cold start. --importtime
+additionally lists the slowest imports (cumulative) of one run.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+
+PROBE = """
+import time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+import asyncio
+asyncio.run(main.start_background_workers())
+print(imported, time.perf_counter() - started)
+"""
+
+def run_probe(env: dict) -> tuple:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True,
+    )
+    imported, started = completed.stdout.split()[-2:]
+    return float(imported), float(started)
+
+def slowest_imports(env: dict, count: int) -> list:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], env=env, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            modules.append((int(parts[1]) / 1000, parts[2].strip()))
+    return [{"module": name, "cumulative_ms": ms} for ms, name in sorted(modules, reverse=True)[:count]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    isolate_environment()
+    results = {}
+    # Without an API key the app must still start; Gemini is only needed on first use
+    for case, api_key in (("with_api_key", "benchmark"), ("without_api_key", "")):
+        env = dict(os.environ, GEMINI_API_KEY=api_key, PRELOAD_LIBRARIES="false")
+        timings = [run_probe(env) for _ in range(args.iterations)]
+        results[f"{case}/import"] = summarize([imported for imported, _ in timings])
+        results[f"{case}/startup"] = summarize([started for _, started in timings])
+
+    print_table(results, ["count", "p50_ms", "p95_ms", "min_ms"])
+    if args.importtime:
+        results["slowest_imports"] = slowest_imports(dict(os.environ), args.importtime)
+        for entry in results["slowest_imports"]:
+            print(f"{entry['cumulative_ms']:>10.1f} ms  {entry['module']}")
+    write_results("startup", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Micro-benchmark: first upload of a document against repeat uploads of the same bytes.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_upload_dedup --pages 50 --repeats 20 --output results/upload_dedup.json
+
+Each document is uploaded once ("first": stored, extracted and indexed in
+the background) and then --repeats more times under other filenames
+("repeat": served from the shared blob and extraction). Latency is measured
+from the upload request until /file-status reports the file ready.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from benchmarks.bench_extraction import make_docx, make_pdf
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+
+MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+async def upload_until_ready(client, filename: str, content: bytes, media_type: str) -> tuple:
+    """Seconds until the upload is ready, and whether it was a cache hit"""
+    started = time.perf_counter()
+    response = await client.post("/api/v1/upload-file", files={"file": (filename, content, media_type)})
+    response.raise_for_status()
+    body = response.json()
+    status = body["status"]
+    while status not in ("ready", "failed"):
+        await asyncio.sleep(0.002)
+        status = (await client.get(f"/api/v1/file-status/{body['file_id']}")).json()["status"]
+    if status != "ready":
+        raise RuntimeError(f"{filename} failed to ingest")
+    return time.perf_counter() - started, body["cache_hit"]
+
+async def run(args, workdir: str) -> dict:
+    import httpx
+    from main import app, start_background_workers, stop_background_workers
+
+    await start_background_workers()
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for extension, make in ((".pdf", make_pdf), (".docx", make_docx)):
+                path = os.path.join(workdir, f"document_{args.pages}{extension}")
+                make(path, args.pages)
+                with open(path, "rb") as f:
+                    content = f.read()
+
+                first, _ = await upload_until_ready(client, f"first{extension}", content, MEDIA_TYPES[extension])
+                repeats, hits = [], 0
+                for number in range(args.repeats):
+                    seconds, hit = await upload_until_ready(
+                        client, f"repeat_{number}{extension}", content, MEDIA_TYPES[extension]
+                    )
+                    repeats.append(seconds)
+                    hits += hit
+
+                name = extension.lstrip(".")
+                results[f"{name}/first"] = summarize([first])
+                results[f"{name}/first"]["file_bytes"] = len(content)
+                results[f"{name}/repeat"] = summarize(repeats)
+                results[f"{name}/repeat"]["hit_rate"] = hits / args.repeats
+                results[f"{name}/repeat"]["stored_blobs"] = sum(
+                    1 for filename in os.listdir(os.path.join(workdir, "uploads")) if filename.endswith(extension)
+                )
+    finally:
+        await stop_background_workers()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    workdir = isolate_environment()
+    logging.disable(logging.INFO)
+    results = asyncio.run(run(args, workdir))
+
+    print_table(results, ["file_bytes", "stored_blobs", "hit_rate", "p50_ms", "p95_ms"])
+    write_results("upload_dedup", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
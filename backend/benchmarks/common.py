@@ -0,0 +1,89 @@
+"""Shared helpers for the benchmark scripts: isolated environment, statistics and JSON results."""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+def isolate_environment(workdir: Optional[str] = None) -> str:
+    """Point uploads and local state at a scratch directory.
+
+    Must run before anything under ``app`` is imported, since settings are
+    read from the environment at import time.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="textiq-bench-")
+    os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+    os.environ["DATA_DIR"] = os.path.join(workdir, "data")
+    # Background garbage collection would only add noise
+    os.environ.setdefault("GC_INTERVAL_SECONDS", "0")
+    # The fake model replaces the real one; the key only has to be non-empty
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    return workdir
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ordered = sorted(seconds)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "min_ms": ordered[0] * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def write_results(benchmark: str, parameters: dict, results: dict, output: Optional[str]) -> dict:
+    """Wrap results with run metadata and write them as JSON (when output is given)"""
+    document = {
+        "benchmark": benchmark,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": parameters,
+        "results": results,
+    }
+    if output:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {output}")
+    return document
+
+def print_table(rows: Dict[str, Dict[str, float]], columns: List[str]):
+    """Print one row per benchmark case with the given result columns"""
+    width = max(len(name) for name in rows) if rows else 10
+    widths = [max(10, len(column)) for column in columns]
+    print(f"{'':<{width}}  " + "  ".join(f"{column:>{w}}" for column, w in zip(columns, widths)))
+    for name, row in rows.items():
+        cells = []
+        for column, w in zip(columns, widths):
+            value = row.get(column)
+            cells.append(f"{value:>{w}.2f}" if isinstance(value, float) else f"{str(value):>{w}}")
+        print(f"{name:<{width}}  " + "  ".join(cells))
@@ -0,0 +1,60 @@
+"""Compare two benchmark result files and flag regressions.
+
+Run from the backend directory:
+
+    python -m benchmarks.compare results/baseline.json results/current.json --threshold 10
+
+Latency metrics (``*_ms``) regress when they grow, throughput metrics
+(``requests_per_second``, ``mb_per_second``) when they shrink. Exits with
+status 1 if any metric moved the wrong way by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = ("requests_per_second", "mb_per_second")
+
+def is_compared(metric: str) -> bool:
+    return metric.endswith("_ms") or metric in HIGHER_IS_BETTER
+
+def compare(baseline: dict, current: dict, threshold: float):
+    """Yield (case, metric, before, after, change %, regressed) for metrics in both files"""
+    for case, before_metrics in baseline["results"].items():
+        after_metrics = current["results"].get(case)
+        if not isinstance(before_metrics, dict) or not isinstance(after_metrics, dict):
+            continue
+        for metric, before in before_metrics.items():
+            after = after_metrics.get(metric)
+            if not is_compared(metric) or not isinstance(after, (int, float)) or not before:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            yield case, metric, before, after, change, worse > threshold
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    if baseline.get("benchmark") != current.get("benchmark"):
+        sys.exit(f"Cannot compare {baseline.get('benchmark')} results with {current.get('benchmark')} results")
+
+    print(f"{baseline.get('git_commit')} -> {current.get('git_commit')} ({baseline['benchmark']})")
+    regressions = 0
+    for case, metric, before, after, change, regressed in compare(baseline, current, args.threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{case:<24} {metric:<20} {before:>10.2f} -> {after:>10.2f} ({change:+.1f}%){flag}")
+
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {args.threshold:.0f}%")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Offline stand-in for the Gemini model, for load tests and benchmarks.
+
+The fake answers every prompt GeminiService builds with a well-formed
+response of the expected shape, after a simulated latency of
+
+    latency + uniform(-jitter, +jitter) + output_tokens / tokens_per_second
+
+Streaming responses are emitted in chunks spread over the same time.
+
+Faults can be injected per call: ``failure_rate`` raises a 503-coded error
+(as google.api_core does), ``slow_rate`` adds ``slow_latency`` to model a
+long tail, and ``hang_rate`` never answers, to exercise timeouts.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from typing import List, Optional
+
+OUTLINE_PROMPT = re.compile(r"Plan a presentation with exactly (\d+) slides")
+SLIDE_PROMPT = re.compile(r"You are writing slide (\d+) of the presentation \"(.*)\"")
+SINGLE_CALL_PROMPT = re.compile(r"Convert the following text into a structured presentation with (\d+) slides")
+PACKED_PROMPT = re.compile(r"Respond with ONLY a JSON array of (\d+) strings")
+BATCH_QA_PROMPT = re.compile(r"answer each of the (\d+) numbered questions")
+
+FILLER_WORDS = (
+    "the report finds that revenue grew steadily while costs remained under control "
+    "across every region and the outlook for the coming quarter is broadly positive"
+).split()
+
+class FakeUpstreamError(Exception):
+    """Stands in for google.api_core's ServiceUnavailable"""
+    code = 503
+
+class _Response:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeGeminiModel:
+    """Implements the subset of ``genai.GenerativeModel`` that LLMClient uses"""
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        tokens_per_second: float = 0.0,
+        output_tokens: int = 150,
+        chunk_tokens: int = 20,
+        seed: Optional[int] = None,
+        failure_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 2.0,
+        hang_rate: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.chunk_tokens = chunk_tokens
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.hang_rate = hang_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    def _words(self, count: int) -> str:
+        return " ".join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(count))
+
+    def _bullets(self, slide: int) -> List[str]:
+        return [f"Point {item} of slide {slide}: {self._words(8)}" for item in range(1, 5)]
+
+    def respond(self, prompt: str) -> str:
+        """Response text for a prompt, shaped like the real model's answer"""
+        match = OUTLINE_PROMPT.search(prompt)
+        if match:
+            return json.dumps({
+                "title": "Benchmark Presentation",
+                "slides": [
+                    {"title": f"Topic {number}", "summary": f"What topic {number} covers"}
+                    for number in range(1, int(match.group(1)) + 1)
+                ],
+            })
+
+        match = SLIDE_PROMPT.search(prompt)
+        if match:
+            slide = int(match.group(1))
+            return json.dumps({"content": self._bullets(slide), "speaker_notes": self._words(40)})
+
+        match = SINGLE_CALL_PROMPT.search(prompt)
+        if match:
+            return json.dumps({
+                "title": "Benchmark Presentation",
+                "slides": [
+                    {
+                        "slide_number": number,
+                        "title": f"Topic {number}",
+                        "content": self._bullets(number),
+                        "speaker_notes": self._words(40),
+                    }
+                    for number in range(1, int(match.group(1)) + 1)
+                ],
+            })
+
+        match = BATCH_QA_PROMPT.search(prompt)
+        if match:
+            return json.dumps([
+                {"id": number, "answer": self._words(self.output_tokens // 3)}
+                for number in range(1, int(match.group(1)) + 1)
+            ])
+
+        match = PACKED_PROMPT.search(prompt)
+        if match:
+            return json.dumps([self._words(20) for _ in range(int(match.group(1)))])
+
+        return self._words(self.output_tokens)
+
+    def _delay(self, text: str) -> float:
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if self.tokens_per_second > 0:
+            # Roughly one token per word, as the token estimator counts ASCII text
+            delay += len(text.split()) / self.tokens_per_second
+        if self._random.random() < self.slow_rate:
+            delay += self.slow_latency
+        if self._random.random() < self.hang_rate:
+            delay = 3600.0
+        return max(0.0, delay)
+
+    def _maybe_fail(self):
+        if self._random.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeUpstreamError("503 The model is overloaded. Please try again later.")
+
+    def _chunks(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [
+            " ".join(words[start:start + self.chunk_tokens]) + (" " if start + self.chunk_tokens < len(words) else "")
+            for start in range(0, len(words), self.chunk_tokens)
+        ]
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, generation_config=None):
+        self.calls += 1
+        text = self.respond(prompt)
+        delay = self._delay(text)
+        if not stream:
+            await asyncio.sleep(delay)
+            self._maybe_fail()
+            return _Response(text)
+
+        self._maybe_fail()
+        chunks = self._chunks(text)
+
+        async def iterate():
+            for chunk in chunks:
+                await asyncio.sleep(delay / len(chunks))
+                yield _Response(chunk)
+        return iterate()
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config=None):
+        """Blocking variant, for code paths that run the model in a thread"""
+        self.calls += 1
+        text = self.respond(prompt)
+        delay = self._delay(text)
+        if not stream:
+            time.sleep(delay)
+            self._maybe_fail()
+            return _Response(text)
+
+        self._maybe_fail()
+        chunks = self._chunks(text)
+
+        def iterate():
+            for chunk in chunks:
+                time.sleep(delay / len(chunks))
+                yield _Response(chunk)
+        return iterate()
+
+def install_fake_model(model: FakeGeminiModel, use_cache: bool = False) -> FakeGeminiModel:
+    """Swap GeminiService's model for the fake (the response cache is off unless use_cache)"""
+    from app.services.gemini_service import gemini_service
+    from app.services.llm_client import LLMClient
+
+    gemini_service.model = model
+    gemini_service.client = LLMClient(model, cache=gemini_service._create_cache() if use_cache else None)
+    return model
@@ -0,0 +1,152 @@
+"""Load test: drive the API in-process against an offline fake Gemini model.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --requests 200 --concurrency 20 --output results/load.json
+
+Each scenario sends --requests requests with at most --concurrency in flight
+and reports latency percentiles and requests/sec. Requests go through the
+full ASGI stack (routing, validation, middleware) without a network hop.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.common import isolate_environment, print_table, summarize, write_results
+
+SCENARIOS = ("transform", "ask", "upload", "presentation")
+
+PARAGRAPH = (
+    "Quarterly revenue rose eight percent on strong subscription renewals, while operating costs "
+    "stayed flat thanks to the consolidation of two data centres. The board approved a new "
+    "hiring plan for the support organisation and asked for a review of regional pricing. "
+)
+
+def document(request_number: int, paragraphs: int) -> str:
+    """Distinct text per request, so no cache can serve it"""
+    return f"Report {request_number}. " + PARAGRAPH * paragraphs
+
+async def run_scenario(
+    send: Callable[[int], Awaitable[bool]],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: List[float] = []
+    errors = 0
+
+    async def one(request_number: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await send(request_number)
+            except Exception:
+                ok = False
+            if ok:
+                timings.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(number) for number in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    result = summarize(timings)
+    result["errors"] = errors
+    result["requests_per_second"] = len(timings) / elapsed if elapsed else 0.0
+    return result
+
+def scenario_senders(client, args) -> Dict[str, Callable[[int], Awaitable[bool]]]:
+    async def transform(number: int) -> bool:
+        response = await client.post("/api/v1/transform-text", json={
+            "text": document(number, args.paragraphs),
+            "tone": "formal",
+        })
+        return response.status_code == 200
+
+    async def ask(number: int) -> bool:
+        response = await client.post("/api/v1/ask-question", json={
+            "text": document(number, args.paragraphs),
+            "question": f"What did the board approve in report {number}?",
+        })
+        return response.status_code == 200
+
+    async def upload(number: int) -> bool:
+        # Upload, then poll until the background pipeline has extracted and indexed it
+        content = document(number, args.paragraphs * 10).encode("utf-8")
+        response = await client.post(
+            "/api/v1/upload-file",
+            files={"file": (f"report_{number}.txt", io.BytesIO(content), "text/plain")},
+        )
+        if response.status_code != 200:
+            return False
+        file_id = response.json()["file_id"]
+        while True:
+            status = (await client.get(f"/api/v1/file-status/{file_id}")).json()["status"]
+            if status in ("ready", "failed"):
+                return status == "ready"
+            await asyncio.sleep(0.005)
+
+    async def presentation(number: int) -> bool:
+        response = await client.post("/api/v1/generate-presentation", json={
+            "text": document(number, args.paragraphs),
+            "slide_count": args.slides,
+        })
+        return response.status_code == 200
+
+    return {"transform": transform, "ask": ask, "upload": upload, "presentation": presentation}
+
+async def run(args) -> dict:
+    import httpx
+    from benchmarks.fake_gemini import FakeGeminiModel, install_fake_model
+    from main import app, start_background_workers, stop_background_workers
+
+    install_fake_model(FakeGeminiModel(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+    ))
+    # ASGITransport does not send lifespan events, so start the workers by hand
+    await start_background_workers()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            senders = scenario_senders(client, args)
+            results = {}
+            for name in args.scenarios:
+                # A few untimed requests first, so imports and caches are warm
+                await run_scenario(senders[name], min(args.concurrency, 5), args.concurrency)
+                results[name] = await run_scenario(senders[name], args.requests, args.concurrency)
+            return results
+    finally:
+        await stop_background_workers()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="+/- uniform jitter (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="fake output rate; 0 = instant")
+    parser.add_argument("--paragraphs", type=int, default=5, help="size of generated input texts")
+    parser.add_argument("--slides", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    isolate_environment()
+    # Per-request INFO logs would dominate the measurement
+    logging.disable(logging.INFO)
+
+    results = asyncio.run(run(args))
+    print_table(results, ["count", "errors", "p50_ms", "p95_ms", "p99_ms", "requests_per_second"])
+    write_results("load_test", vars(args), results, args.output)
+
+if __name__ == "__main__":
+    main()
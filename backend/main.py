@@ -1,11 +1,34 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Startup time is measured from here, so it includes importing the app itself
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import logging
+import math
 import os
 from dotenv import load_dotenv
 
 from app.api.routes import text_transform, qa, presentation, file_upload
 from app.core.config import settings
+from app.core.upload_limit import UploadSizeLimitMiddleware
+from app.core.metrics import (
+    APP_STARTUP_SECONDS, CONTENT_TYPE, LLM_CIRCUIT_OPEN, LLM_IN_FLIGHT, LLM_QUEUED, MetricsMiddleware, render_metrics
+)
+from app.services.gemini_service import gemini_service
+from app.services.file_service import file_service
+from app.services.ingestion_service import ingestion_service
+from app.services.cleanup_service import cleanup_service
+from app.services.presentation_job_service import presentation_job_service
+from app.services.resilience import UpstreamUnavailableError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +40,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Refuse uploads whose declared size is over the limit before their body is read
+# (added first so it sits inside CORS, and browsers can read the 413)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +53,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency and status counts (outermost, so it sees every response)
+app.add_middleware(MetricsMiddleware)
+
+# Gemini concurrency gauges are read from the client at scrape time (0 until its first use)
+LLM_IN_FLIGHT.set_function(lambda: gemini_service.client.stats()["in_flight"] if gemini_service.is_initialized else 0)
+LLM_QUEUED.set_function(lambda: gemini_service.client.stats()["queued"] if gemini_service.is_initialized else 0)
+LLM_CIRCUIT_OPEN.set_function(lambda: int(gemini_service.is_initialized and gemini_service.client.breaker.is_open))
+
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailableError):
+    """The circuit breaker is open: tell clients when to come back instead of returning a 500"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
 # Create upload directory if it doesn't exist
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
@@ -38,6 +82,37 @@ app.include_router(qa.router, prefix="/api/v1", tags=["qa"])
 app.include_router(presentation.router, prefix="/api/v1", tags=["presentation"])
 app.include_router(file_upload.router, prefix="/api/v1", tags=["file-upload"])
 
+def preload_libraries():
+    """Import the heavy libraries services load on demand, so first requests don't pay for it"""
+    started = time.perf_counter()
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+    from app.services import deck_builder  # noqa: F401
+    if settings.GEMINI_API_KEY:
+        import google.generativeai  # noqa: F401
+    logger.info(f"Preloaded libraries in {time.perf_counter() - started:.2f}s")
+
+@app.on_event("startup")
+async def start_background_workers():
+    ingestion_service.start()
+    cleanup_service.start()
+    presentation_job_service.start()
+
+    startup_seconds = time.perf_counter() - IMPORT_STARTED
+    APP_STARTUP_SECONDS.set(startup_seconds)
+    logger.info(f"Application started in {startup_seconds:.2f}s")
+
+    if settings.PRELOAD_LIBRARIES:
+        # Runs off the event loop; requests are served meanwhile
+        app.state.preload = asyncio.get_running_loop().run_in_executor(None, preload_libraries)
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await ingestion_service.stop()
+    await asyncio.to_thread(file_service.shutdown)
+    await cleanup_service.stop()
+    await presentation_job_service.stop()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to TextIQ API", "version": "1.0.0"}
@@ -46,6 +121,25 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text-format metrics"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+@app.get("/health/llm")
+async def llm_health():
+    """Queue depth and in-flight counters of the LLM client"""
+    if not gemini_service.is_initialized:
+        # Reading stats would build the model (and fail without an API key)
+        return {
+            "initialized": False,
+            "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+            "queued": 0,
+            "in_flight": 0,
+            "endpoints": {},
+        }
+    return {"initialized": True, **gemini_service.client.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
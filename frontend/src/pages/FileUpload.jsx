@@ -37,8 +37,12 @@ const FileUpload = () => {
         // You could update a progress bar here
       });
 
+      const status = await fileUploadAPI.waitUntilReady(response.file_id);
+
       const newFile = {
         ...response,
+        status: status.status,
+        extracted_text: status.extracted_text,
         originalName: file.name,
         uploadTime: new Date().toLocaleString(),
       };
@@ -47,7 +51,7 @@ const FileUpload = () => {
       toast.success(`${file.name} uploaded successfully!`);
     } catch (error) {
       console.error('Upload failed:', error);
-      toast.error(error.response?.data?.detail || `Failed to upload ${file.name}`);
+      toast.error(error.response?.data?.detail || error.message || `Failed to upload ${file.name}`);
     } finally {
       setIsUploading(false);
     }
@@ -9,6 +9,7 @@ const PresentationGenerator = () => {
   const [slideCount, setSlideCount] = useState(5);
   const [includeSpeakerNotes, setIncludeSpeakerNotes] = useState(true);
   const [isLoading, setIsLoading] = useState(false);
+  const [jobStage, setJobStage] = useState(null);
   const [generatedPresentation, setGeneratedPresentation] = useState(null);
 
   const handleGenerate = async () => {
@@ -19,20 +20,24 @@ const PresentationGenerator = () => {
 
     setIsLoading(true);
     try {
-      const response = await presentationAPI.generatePresentation(
+      const job = await presentationAPI.submitPresentationJob(
         inputText,
         title || null,
         slideCount,
         includeSpeakerNotes
       );
+      const response = await presentationAPI.waitForPresentationJob(job.job_id, (update) =>
+        setJobStage(update.status)
+      );
 
       setGeneratedPresentation(response);
       toast.success('Presentation generated successfully!');
     } catch (error) {
       console.error('Presentation generation failed:', error);
-      toast.error(error.response?.data?.detail || 'Failed to generate presentation');
+      toast.error(error.response?.data?.detail || error.message || 'Failed to generate presentation');
     } finally {
       setIsLoading(false);
+      setJobStage(null);
     }
   };
 
@@ -180,7 +185,7 @@ const PresentationGenerator = () => {
                 ) : (
                   <Presentation className="h-4 w-4" />
                 )}
-                <span>{isLoading ? 'Generating...' : 'Generate Presentation'}</span>
+                <span>{isLoading ? `Generating${jobStage ? ` (${jobStage})` : ''}...` : 'Generate Presentation'}</span>
               </button>
               
               <button
@@ -12,6 +12,25 @@ const QAPage = () => {
   const [selectedFileId, setSelectedFileId] = useState('');
   const [uploadedFiles, setUploadedFiles] = useState([]);
   const [isUploading, setIsUploading] = useState(false);
+  // Server-side conversation for the current context: { id, source }
+  const [session, setSession] = useState(null);
+
+  const endSession = (current) => {
+    if (current) {
+      qaAPI.deleteSession(current.id).catch(() => {});
+    }
+  };
+
+  const startSession = async (source) => {
+    endSession(session);
+    const created = await qaAPI.createSession(
+      selectedFileId ? '' : contextText,
+      selectedFileId || null
+    );
+    const next = { id: created.session_id, source };
+    setSession(next);
+    return next;
+  };
 
   const handleAskQuestion = async () => {
     if (!question.trim()) {
@@ -36,15 +55,22 @@ const QAPage = () => {
     setQuestion(''); // Clear input immediately
 
     try {
-      // If a file is selected, use empty string for text and pass the file ID
-      // The backend will use the file content stored for that ID
-      const textToSend = selectedFileId ? '' : contextText;
-
-      const response = await qaAPI.askQuestion(
-        textToSend,
-        currentQuestion,
-        selectedFileId || null
-      );
+      // Follow-up questions reuse the session as long as the context is unchanged;
+      // the backend keeps the file's (or text's) content and the conversation history
+      const source = selectedFileId ? `file:${selectedFileId}` : `text:${contextText}`;
+      let current = session && session.source === source ? session : await startSession(source);
+
+      let response;
+      try {
+        response = await qaAPI.askInSession(current.id, currentQuestion);
+      } catch (error) {
+        if (error.response?.status !== 404) {
+          throw error;
+        }
+        // Session expired on the server; start over with the same context
+        current = await startSession(source);
+        response = await qaAPI.askInSession(current.id, currentQuestion);
+      }
 
       const newConversation = {
         id: Date.now(),
@@ -83,6 +109,8 @@ const QAPage = () => {
   };
 
   const clearConversations = () => {
+    endSession(session);
+    setSession(null);
     setConversations([]);
     toast.success('Conversation history cleared');
   };
@@ -97,32 +125,20 @@ const QAPage = () => {
     setIsUploading(true);
     try {
       const response = await fileUploadAPI.uploadFile(file);
+      const status = await fileUploadAPI.waitUntilReady(response.file_id);
       const newFile = {
         ...response,
+        status: status.status,
+        extracted_text: status.extracted_text,
         originalName: file.name,
         uploadTime: new Date().toLocaleString(),
       };
       setUploadedFiles(prev => [newFile, ...prev]);
 
-      // Store the extracted text for Q&A
-      if (response.extracted_text && response.file_id) {
-        try {
-          await fetch('http://localhost:8000/api/v1/store-file-content/' + response.file_id, {
-            method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ text: response.extracted_text })
-          });
-        } catch (storeError) {
-          console.warn('Failed to store file content for Q&A:', storeError);
-        }
-      }
-
       toast.success(`${file.name} uploaded and ready for Q&A!`);
     } catch (error) {
       console.error('Upload failed:', error);
-      toast.error(error.response?.data?.detail || `Failed to upload ${file.name}`);
+      toast.error(error.response?.data?.detail || error.message || `Failed to upload ${file.name}`);
     } finally {
       setIsUploading(false);
     }
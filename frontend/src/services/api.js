@@ -31,6 +31,50 @@ api.interceptors.response.use(
   }
 );
 
+// Stream a POST endpoint that answers with Server-Sent Events.
+// Calls onToken for every partial chunk and resolves with the final payload.
+const streamSSE = async (path, body, onToken) => {
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+
+      if (event === 'token') {
+        onToken?.(data.text);
+      } else if (event === 'done') {
+        return data;
+      } else if (event === 'error') {
+        throw new Error(data.message);
+      }
+    }
+  }
+
+  throw new Error('Stream ended unexpectedly');
+};
+
 // Text transformation API
 export const textTransformAPI = {
   transformText: async (text, tone, additionalInstructions = null) => {
@@ -42,6 +86,13 @@ export const textTransformAPI = {
     return response.data;
   },
 
+  transformTextStream: (text, tone, additionalInstructions = null, onToken = null) =>
+    streamSSE('/transform-text/stream', {
+      text,
+      tone,
+      additional_instructions: additionalInstructions,
+    }, onToken),
+
   getSupportedTones: async () => {
     const response = await api.get('/supported-tones');
     return response.data;
@@ -59,10 +110,45 @@ export const qaAPI = {
     return response.data;
   },
 
+  askQuestionStream: (text, question, fileId = null, onToken = null) =>
+    streamSSE('/ask-question/stream', {
+      text,
+      question,
+      file_id: fileId,
+    }, onToken),
+
+  askQuestions: async (text, questions, fileId = null) => {
+    const response = await api.post('/ask-question/batch', {
+      text,
+      questions,
+      file_id: fileId,
+    });
+    return response.data;
+  },
+
   getFileContent: async (fileId) => {
     const response = await api.get(`/file-content/${fileId}`);
     return response.data;
   },
+
+  // Conversations: the server keeps the context and a compacted history
+  createSession: async (text, fileId = null) => {
+    const response = await api.post('/qa-sessions', {
+      text,
+      file_id: fileId,
+    });
+    return response.data;
+  },
+
+  askInSession: async (sessionId, question) => {
+    const response = await api.post(`/qa-sessions/${sessionId}/questions`, { question });
+    return response.data;
+  },
+
+  deleteSession: async (sessionId) => {
+    const response = await api.delete(`/qa-sessions/${sessionId}`);
+    return response.data;
+  },
 };
 
 // Presentation API
@@ -77,6 +163,34 @@ export const presentationAPI = {
     return response.data;
   },
 
+  // Queue generation in the background; resolves with the job (including job_id) immediately.
+  submitPresentationJob: async (text, title = null, slideCount = 5, includeSpeakerNotes = true) => {
+    const response = await api.post('/presentation-jobs', {
+      text,
+      title,
+      slide_count: slideCount,
+      include_speaker_notes: includeSpeakerNotes,
+    });
+    return response.data;
+  },
+
+  getPresentationJob: async (jobId) => {
+    const response = await api.get(`/presentation-jobs/${jobId}`);
+    return response.data;
+  },
+
+  // Poll a presentation job until the deck is rendered.
+  // Resolves with the final job (file_path, slide_count, title, download_url) or throws on failure.
+  waitForPresentationJob: async (jobId, onProgress = null, intervalMs = 1000) => {
+    while (true) {
+      const job = await presentationAPI.getPresentationJob(jobId);
+      onProgress?.(job);
+      if (job.status === 'ready') return job;
+      if (job.status === 'failed') throw new Error(job.error || 'Presentation generation failed');
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   downloadPresentation: async (filename) => {
     const response = await api.get(`/download-presentation/${filename}`, {
       responseType: 'blob',
@@ -105,6 +219,23 @@ export const fileUploadAPI = {
     return response.data;
   },
 
+  getFileStatus: async (fileId) => {
+    const response = await api.get(`/file-status/${fileId}`);
+    return response.data;
+  },
+
+  // Poll /file-status until background extraction finishes.
+  // Resolves with the final status (including the text preview) or throws on failure.
+  waitUntilReady: async (fileId, onProgress = null, intervalMs = 1000) => {
+    while (true) {
+      const status = await fileUploadAPI.getFileStatus(fileId);
+      onProgress?.(status);
+      if (status.status === 'ready') return status;
+      if (status.status === 'failed') throw new Error(status.error || 'Text extraction failed');
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   getFileInfo: async (fileId) => {
     const response = await api.get(`/file-info/${fileId}`);
     return response.data;